@@ -1,13 +1,35 @@
 
 import sys
+from time import perf_counter
+#the startup is measured from here, see main
+started = perf_counter()
 from os import path
-from PyQt5 import QtCore, QtGui, QtWidgets, uic
-from compound import Compound
+import argparse
+import zlib
+from PyQt5 import QtCore, QtGui, QtWidgets
+from compound import Compound, count_formulas
+from mass_engine import compile_ion, compile_descriptor, descriptor_name, descriptor_names
+from ion_types import ion_library, charge_carriers, parse_ion, header_ion, ion_name, read_library
+from dirty_cells import DirtyCells
+from calculation import CalculationThread
+from table_loader import TableLoadThread
+from annotation import AnnotationThread
+from table_project import read_project, write_project
+from parallel import default_chunk_size, worker_count
+from table_model import MassTableModel
+from table_csv import HeaderItem, default_header_items, decode_header, header_row
+from mz_lookup import MassIndex, parse_tolerance
+from formula_search import parse_limits
+from formula_thread import FormulaSearchThread
+from isotope_view import IsotopeThread, PeakTableModel
+from oligomers import enumerate_oligomers, oligomer_names
+from builder import build_compounds
+import numpy as np
 import re
 import csv
 from time import strftime
-from time import time
-#from profilehooks import profile
+from os import environ
+from profiling import Profiler, profile_variable
 
 #function for auto-py-to-exe
 def resource_path(relative_path):
@@ -20,33 +42,75 @@ def resource_path(relative_path):
 
     return path.join(base_path, relative_path)
 
+#set up a widget from a form of view/, like uic.loadUi
+#the forms compiled by compile_ui.py are used while their .ui file is unchanged, uic is only imported for a changed form
+def load_ui(widget, file_name):
+    name = path.splitext(path.basename(file_name))[0]
+    try:
+        import ui_forms
+        with open(file_name, 'rb') as file:
+            unchanged = ui_forms.ui_checksums.get(name) == zlib.crc32(file.read().replace(b'\r\n', b'\n'))
+    except (ImportError, OSError):
+        unchanged = False
+    if unchanged:
+        ui = getattr(ui_forms, 'Ui_' + name)()
+        ui.setupUi(widget)
+        widget.__dict__.update(ui.__dict__)
+    else:
+        from PyQt5 import uic
+        uic.loadUi(file_name, widget)
+
 class MainWindow(QtWidgets.QMainWindow):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
         #load UI from main.ui
-        uic.loadUi(resource_path("view/main.ui"), self)
+        load_ui(self, resource_path("view/main.ui"))
 
         #default header items
-        self.header_items = [HeaderItem('name'),
-                HeaderItem('compound'),
-                HeaderItem('neutral', charge = 0),
-                HeaderItem('[M-H]-', charge= -1),
-                HeaderItem('[M+H]+',  charge= 1),
-                HeaderItem('[M+Na]+', adduct = 'Na', charge= 1),
-                HeaderItem('[M+K]+', adduct = 'K', charge= 1)]
+        self.header_items = default_header_items()
 
 
         #default mass precision
         self.mass_precision = 4
 
-        #search matches
+        #table data, the example compounds at start
+        self.model = MassTableModel(self.header_items, self.mass_precision)
+        self.model.set_compounds(['MurNAc', 'GlcNAc', ''], ['C11H19NO8', 'C8H15NO6', ''])
+        self.t1.setModel(self.model)
+        self.edit_triggers = self.t1.editTriggers()
+
+        #search matches as (row, column) in table order, the next one is shown on return
         self.search_term = ''
-        self.matches = []
+        self.matches = np.zeros((0, 2), dtype=np.int64)
+        self.match_position = 0
+
+        #search while typing, after a short pause
+        self.search_timer = QtCore.QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(150)
+        self.search_timer.timeout.connect(self.search)
 
         #default elimination product
         self.elimination_product = 'H2O'
 
+        #per phase timing of calculate, open, save, undo, find and the builder, also turned on with MASSCALC_PROFILE=1
+        self.profiler = Profiler(environ.get(profile_variable, '') not in ('', '0'))
+        self.calculation_phase = None
+        self.calculated_cells = 0
+        self.loading_phase = None
+
+        #ion types offered for new columns, extended by ion_types.txt
+        self.ion_library = list(ion_library)
+        if path.exists(resource_path('ion_types.txt')):
+            try:
+                self.ion_library += read_library(resource_path('ion_types.txt'))
+            except (OSError, UnicodeDecodeError, ValueError) as error:
+                print('ion_types.txt is not read:', error)
+
+        #dialogs that keep no table state, built when they are first opened, see dialog
+        self.dialogs = {}
+
         #path to csv file
         self.save_path = ''
 
@@ -56,12 +120,14 @@ class MainWindow(QtWidgets.QMainWindow):
         #set UI Actions
         self.set_actions()
 
-        #undo and redo list will be empty at start 
+        #undo and redo list will be empty at start, each step only holds the cells it changed
         self.undo_list = [] 
         self.redo_list = []
+        self.undo_limit = 500
 
-        #check why table contents necessary!
-        self.table_content = [[self.t1.item(r,c).text() for c in range(self.t1.columnCount())] for r in range(self.t1.rowCount())]
+        #most oligomers and builder combinations added at once
+        self.oligomer_limit = 1000000
+        self.builder_limit = 1000000
 
         #counter for undos
         self.undo_index = 0
@@ -76,11 +142,24 @@ class MainWindow(QtWidgets.QMainWindow):
         #temp cells to put in copy and cut cells before paste
         self.temp_cells = []
 
-        #current state of the table 
-        self.saved = [[self.t1.item(r,c).text() for c in range(self.t1.columnCount())] for r in range(self.t1.rowCount())] 
+        #undo step of the saved table, the table is modified if another step is current
+        self.saved = self.current_step()
         
-        #set a list of table items changed (only compound section)
-        self.compounds_changed = [0,1]
+        #mass cells that need a calculation, the example rows at start
+        self.dirty = DirtyCells()
+        self.dirty.formula_changed(0)
+        self.dirty.formula_changed(1)
+
+        #running calculation thread, worker processes (None is one per core) and rows per chunk
+        self.calculation = None
+        #the calculation of a file that was just opened is not an undo step
+        self.calculation_opens_file = False
+        #thread that reads an opened file
+        self.loading = None
+        self.workers = None
+        self.chunk_size = default_chunk_size
+        #thread that annotates a peak list file
+        self.annotation = None
 
         #self.inputBuilderCalculation.setText('2+1')
         #for i in range(0,100):
@@ -115,6 +194,12 @@ class MainWindow(QtWidgets.QMainWindow):
         for field in (self.inputNewColumnName, self.inputNewColumnModify, self.inputNewColumnCharge, self.inputNewColumnAdduct, self.inputBuilderName, self.inputBuilderCalculation, self.inputSearch):
             field.setStyleSheet('border-radius:4px;  color:#555555; border:2px solid #FFFFFF;')
         
+        #ion types of the library are completed in the adduct field
+        completer = QtWidgets.QCompleter(self.ion_library, self)
+        completer.setCaseSensitivity(QtCore.Qt.CaseInsensitive)
+        self.inputNewColumnAdduct.setCompleter(completer)
+        self.inputNewColumnAdduct.setToolTip('An adduct like Na, NH4 or Cl that is taken as often as the charge, or an ion like [2M+H]+ or [M+H+Na]2+')
+
         #dark grey text color in lblNewColumn and lblBuilder lblFind
         for label in (self.lblFind, self.lblNewColumn,  self.lblBuilder):
             label.setStyleSheet('color:#555555;')
@@ -122,7 +207,10 @@ class MainWindow(QtWidgets.QMainWindow):
         #set up and style Headers
         header = self.t1.horizontalHeader()
         header.setStyleSheet('border-radius:5px;')
-        header.setSectionResizeMode(QtWidgets.QHeaderView.ResizeToContents)
+        #resizing to contents on every change would measure rows on each batch of a calculation
+        header.setSectionResizeMode(QtWidgets.QHeaderView.Interactive)
+        #column widths are measured on the visible rows and 200 others, not on 1000 like by default
+        header.setResizeContentsPrecision(200)
         header.setMinimumSectionSize(120)
         header.setSectionsMovable(True)
 
@@ -130,16 +218,15 @@ class MainWindow(QtWidgets.QMainWindow):
         self.t1.setFont(QtGui.QFont ("Consolas", 12))
         self.t1.setStyleSheet('selection-background-color: #7289DA')
 
-        #update table and header
+        #update header
         self.update_header()
-        self.update_table()
 
         #Progress Bar
         self.progressBar.hide()
 
     #connect buttons with functions
     def set_actions(self):
-        self.btnCalculate.clicked.connect(self.calculate)
+        self.btnCalculate.clicked.connect(self.calculate_clicked)
         self.btnClearBuilder.clicked.connect(self.clear_builder)
         self.btnClearColumn.clicked.connect(self.clear_add_column)
         self.btnAddColumn.clicked.connect(self.add_column)
@@ -161,28 +248,45 @@ class MainWindow(QtWidgets.QMainWindow):
         self.actionDelete_Last_Row.triggered.connect(self.delete_last_row)
         self.actionMass_Precision.triggered.connect(self.get_mass_precision)
         self.actionElimination_Product.triggered.connect(self.get_elimination_product)
+        self.actionParallel_Calculation.triggered.connect(self.get_parallel_calculation)
         self.actionHelp.triggered.connect(self.display_help)
         self.actionAbout_Mass_Calculator.triggered.connect(self.about)
+        self.actionMatch_Masses.triggered.connect(self.match_masses)
+        self.actionFind_Formula.triggered.connect(self.find_formula)
+        self.actionOligomers.triggered.connect(self.add_oligomers)
+        self.actionIsotope_Pattern.triggered.connect(self.isotope_pattern)
+        self.actionAnnotate_Peaks.triggered.connect(self.annotate_peaks)
+        self.actionAdd_Descriptor_Column.triggered.connect(self.add_descriptor_column)
+        self.actionProfiling.setChecked(self.profiler.enabled)
+        self.actionProfiling.toggled.connect(self.set_profiling)
+        self.actionExport_Profile.triggered.connect(self.export_profile)
         self.resizeEvent = self.resize_table
         self.WindowStateChange = self.resize_table
         self.actionRedo.setDisabled(True)
         self.actionUndo.setDisabled(True)
         self.actionSave.setDisabled(True)
-        self.t1.itemChanged.connect(self.table_changed)
+        self.model.cellEdited.connect(self.table_changed)
         self.t1.doubleClicked.connect(self.table_double_clicked)
         self.inputSearch.returnPressed.connect(self.find)
+        self.inputSearch.textChanged.connect(self.search_timer.start)
 
 
     #exit the app and check if save necessary 
     def exit(self):
-        if self.saved == [[self.t1.item(r,c).text() for c in range(self.t1.columnCount())] for r in range(self.t1.rowCount())]:
+        self.stop_loading()
+        self.stop_annotation()
+        self.stop_calculation()
+        if not self.is_modified():
             sys.exit(app)
         else:
             self.exit_save()     
 
     #catch close event
     def closeEvent(self, event):
-        if self.saved == [[self.t1.item(r,c).text() for c in range(self.t1.columnCount())] for r in range(self.t1.rowCount())]:
+        self.stop_loading()
+        self.stop_annotation()
+        self.stop_calculation()
+        if not self.is_modified():
             event.accept()
             sys.exit(app)
         else:
@@ -210,132 +314,114 @@ class MainWindow(QtWidgets.QMainWindow):
             sys.exit(app)
 
     #Undo/Redo Functionality
+    #all changes of the table since the last step become a new step
+    #without changes no step is added, only the first step of a history is empty
     def add_undo(self, btn_text):
+        with self.profiler.phase('add_undo'):
+            changes = self.model.take_changes()
+        if not changes and self.undo_list:
+            return
         self.actionUndo.setEnabled(True)
-        self.table_content = [[self.t1.item(r,c).text() for c in range(self.t1.columnCount())] for r in range(self.t1.rowCount())]
         self.redo_list = []
-        header_items = self.header_items[:]
-        self.undo_list.append((self.table_content, header_items, btn_text, self.undo_index))
-        if len(self.undo_list) > 10:
-            self.undo_list = self.undo_list[-10::]
+        self.undo_list.append((changes, btn_text, self.undo_index))
+        if len(self.undo_list) > self.undo_limit:
+            self.undo_list = self.undo_list[-self.undo_limit::]
         self.undo_index += 1
         self.actionRedo.setDisabled(True)
         self.actionSave.setEnabled(True)
 
-    #restore Table back to last undo
+    #id of the current undo step, changes since the last step are not part of it
+    def current_step(self):
+        return self.undo_list[-1][2] if self.undo_list else None
+
+    #the table is modified if it has changes that are not in the saved undo step
+    def is_modified(self):
+        return bool(self.model.changes) or self.current_step() != self.saved
+
+    #revert the changes of the last step
     def undo(self):
         if len(self.undo_list) > 1:
-            self.t1.blockSignals(True)
             redo = self.undo_list.pop()
             self.redo_list.append(redo)
-            undo = self.undo_list[-1]
-            
-            self.t1.clear()
-            
-            new_table = undo[0]
-            self.header_items = undo[1]
-            self.update_header()
-            
-            self.t1.setRowCount(len(new_table))
-            self.t1.setColumnCount(len(undo[1]))
-            self.t1.blockSignals(True)
-            for r in range(len(new_table)):
-                for c in range(len(new_table[0])):
-                    item = QtWidgets.QTableWidgetItem()
-                    item.setText(new_table[r][c])
-                    if c > 1:
-                        item.setTextAlignment(QtCore.Qt.AlignRight)
-                    self.t1.setItem(r,c,item)
-            self.t1.blockSignals(False)
-            self.update_table()
+            self.model.undo_changes(redo[0])
+            self.header_items = list(self.model.header_items)
+            self.mass_precision = self.model.round_by
+            self.update_title()
             self.undo_done = True
             self.actionRedo.setEnabled(True)
-            self.t1.blockSignals(False)
             if len(self.undo_list) == 1:
                 self.actionUndo.setDisabled(True)
-            for i in range(0, self.t1.rowCount()):
-                if self.t1.item(i,1).text() != '' and self.t1.item(i,2).text() == '':
-                    self.compounds_changed.append(i)
+            self.changes_replayed(reversed(redo[0]), True)
 
-    #restore table back to last redo       
+    #apply the changes of the last undone step again
     def redo(self):
         if len(self.redo_list) > 0 and self.undo_done:
-            self.t1.blockSignals(True)
             redo = self.redo_list.pop()
             self.undo_list.append(redo)
-            self.t1.clear()
-            new_table = redo[0]
-            self.t1.setRowCount(len(new_table))
-            self.t1.setColumnCount(len(new_table[0]))
-            for r in range(len(new_table)):
-                for c in range(len(new_table[0])):
-                    item = QtWidgets.QTableWidgetItem()
-                    item.setText(new_table[r][c])
-                    if c > 1:
-                        item.setTextAlignment(QtCore.Qt.AlignRight)
-                    self.t1.setItem(r,c,item)
-            self.header_items = redo[1]
-            self.update_header()
-            self.update_table()
+            self.model.redo_changes(redo[0])
+            self.header_items = list(self.model.header_items)
+            self.mass_precision = self.model.round_by
+            self.update_title()
             self.undo_done = True
-            self.t1.blockSignals(False)
             self.actionUndo.setEnabled(True)
             if len(self.redo_list) == 0:
                 self.actionRedo.setDisabled(True)
+            self.changes_replayed(redo[0], False)
+
+    #cells replaced by an undo or redo need a new calculation, the changes come in the order they were replayed
+    #rows of insert and remove records move the dirty rows like inserting and removing rows in the table does
+    def changes_replayed(self, changes, undone):
+        for change in changes:
+            kind = change[0]
+            if kind == 'cells':
+                self.dirty.formulas_changed(change[2])
+            elif kind == 'invalid':
+                self.dirty.formulas_changed(change[1])
+            elif kind in ('insert', 'remove'):
+                row, count = change[1], change[2]
+                if (kind == 'insert') == undone:
+                    self.dirty.rows_removed(row, count)
+                else:
+                    self.dirty.rows_inserted(row, count)
+                    self.dirty.formulas_changed(range(row, row + count))
+            elif kind == 'header':
+                before, after = (change[3], change[1]) if undone else (change[1], change[3])
+                for header in after:
+                    if not any(header is item for item in before):
+                        self.dirty.header_changed(header)
 
     #Table related Functions
     #if something in table changed check if data is unsaved
-    def table_changed(self, item):
+    def table_changed(self, row, column):
         
-        column = item.column()
-        row = item.row() +1
-        row_count = self.t1.rowCount()
+        row = row +1
+        row_count = self.model.rowCount()
 
         if row == row_count:
-            self.t1.insertRow(row)
+            self.model.insertRows(row, 1)
 
         if column == 1:
-            self.compounds_changed.append(row-1)
+            self.dirty.formula_changed(row-1)
+            if self.calculation is not None:
+                self.calculate()
 
-        self.update_table()
-        if self.saved == [[self.t1.item(r,c).text() for c in range(self.t1.columnCount())] for r in range(self.t1.rowCount())]:
+        self.update_title()
+        self.add_undo('Edit Table')
+
+    #mark unsaved changes in the window title
+    def update_title(self):
+        if not self.is_modified():
             self.setWindowTitle('Exact Mass Calculator   -   ' + self.save_path.split('/')[-1])
         elif self.save_path == '':
             self.setWindowTitle('Exact Mass Calculator   -   *')
         else:
             self.setWindowTitle('Exact Mass Calculator   -   ' + self.save_path.split('/')[-1]+'*')
             self.actionSave.setEnabled(True)
-        self.add_undo('Edit Table')
 
-    #dont want empty cells in table, put empty item into each cell
-    def update_table(self):
-        self.t1.blockSignals(True)
-        for i in range(self.t1.rowCount()):
-            for j in range(len(self.header_items)):
-                if not self.t1.item(i,j):
-                    item = QtWidgets.QTableWidgetItem()
-                    if j > 2:
-                        item.setTextAlignment(QtCore.Qt.AlignRight)
-                    self.t1.setItem(i, j, item)
-        self.t1.blockSignals(False)
-
-    #update each header item, font, style
+    #give the header items to the table, columns of removed header items are dropped
     def update_header(self):
-        self.t1.blockSignals(True)
-        fnt = QtGui.QFont()
-        fnt.setPointSize(14)
-        fnt.setBold(True)
-        fnt.setFamily("Consolas")  
-        header_count = len(self.header_items)
-        self.t1.setColumnCount(header_count)
-        for i in range(0, len(self.header_items)):
-            item = QtWidgets.QTableWidgetItem(self.header_items[i].name)
-            item.setFont(fnt)
-            item.setForeground(QtGui.QBrush(QtGui.QColor(85, 85, 85)))
-            self.t1.setHorizontalHeaderItem(i, item)
-            
-        self.update_table()
-        self.t1.blockSignals(False)
+        self.model.set_header_items(self.header_items)
+        self.t1.resizeColumnsToContents()
     
     #change the size of table after window size has been changed
     def resize_table(self, event):
@@ -375,52 +461,30 @@ class MainWindow(QtWidgets.QMainWindow):
                     else:
                         charge = int(charge_polarity.group()+charge_amount.group())
                 
-                if self.inputNewColumnAdduct.text() != '' and self.inputNewColumnAdduct.text() in ['K', 'Na', 'Li'] and charge > 0:
-                    adduct = self.inputNewColumnAdduct.text()
-                elif self.inputNewColumnAdduct.text() not in ['K', 'Na', 'Li','']:
+                #an ion like [2M+H]+ has its own charge, an adduct like Na or Cl without a charge has the charge it carries
+                adduct = self.inputNewColumnAdduct.text().strip()
+                if adduct.startswith('['):
+                    try:
+                        charge = parse_ion(adduct)[2]
+                    except ValueError:
+                        self.inputNewColumnAdduct.setStyleSheet('border-radius:4px; color:#f04747; border:2px solid #FFFFFF')
+                        return
+                elif adduct != '' and self.inputNewColumnCharge.text() == '':
+                    charge = charge_carriers.get(adduct, 1)
+                elif adduct != '' and charge == 0:
                     self.inputNewColumnAdduct.setStyleSheet('border-radius:4px; color:#f04747; border:2px solid #FFFFFF')
+                    self.inputNewColumnCharge.setStyleSheet('border-radius:4px; color:#f04747; border:2px solid #FFFFFF')
                     return
-                elif self.inputNewColumnAdduct.text() in ['K', 'Na', 'Li'] and charge <= 0:
+                header = HeaderItem('', add = add, delete = delete, adduct = adduct, charge = charge)
+                if compile_ion(header) is None:
                     self.inputNewColumnAdduct.setStyleSheet('border-radius:4px; color:#f04747; border:2px solid #FFFFFF')
-                    self.inputNewColumnCharge.setStyleSheet('border-radius:4px; color:#f04747; border:2px solid #FFFFFF')
                     return
 
-
-                
-                if self.inputNewColumnName.text() == '':
-                    if charge == 1:
-                        charge_display = ''
-                    elif charge == -1:
-                        charge_display = '-'
-                    else:
-                        charge_display = charge
-                    if len(add) > 0:
-                        name_add = '+'+add
-                    else:
-                        name_add = ''
-                    if len(delete) > 0:
-                        name_delete = '-'+delete
-                    else:
-                        name_delete = ''
-
-                    if adduct != '':
-                        name = f'[M{name_add}{name_delete}+{charge_display}{adduct}]{charge_display}+'
-                    elif charge == 0:
-                        name = f'[M{name_add}{name_delete}]'
-                    elif charge >= 1:
-                        polarity = charge_polarity.group()
-                        name = f'[M{name_add}{name_delete}{polarity}{charge_display}H]{charge_display}{polarity}'
-                    elif charge <= -1:
-                        polarity = charge_polarity.group()
-                        name = f'[M{name_add}{name_delete}{charge_display}H]{str(charge_display)[1:]}{polarity}'
-                else:
-                    name = self.inputNewColumnName.text()
-                
-                self.header_items.append(HeaderItem(name, add = add, delete = delete, adduct = adduct, charge = charge))
+                header.name = self.inputNewColumnName.text() or ion_name(*header_ion(header))
+                self.header_items.append(header)
                 
                 self.update_header()
-                for i in range(0, self.t1.rowCount()):
-                    self.compounds_changed.append(i)
+                self.dirty.header_changed(self.header_items[-1])
                 self.add_undo('Add Column')
                 
             except:
@@ -430,11 +494,25 @@ class MainWindow(QtWidgets.QMainWindow):
             print('New retention time will be added')
             self.header_items.append(HeaderItem(name=self.inputNewColumnName.text(), rt = 'yes'))
             self.update_header()
-            for i in range(0, self.t1.rowCount()):
-                item = QtWidgets.QTableWidgetItem()
-                item.setText('')
-                item.setTextAlignment(QtCore.Qt.AlignRight)
-                self.t1.setItem(i, self.t1.columnCount()-1, item)
+            self.add_undo('Add Column')
+
+    #add a column with a descriptor of the compounds, like the mass defect, the Kendrick mass defect or the RDBE
+    #the name of the new column field is used if it is filled, see mass_engine for the descriptors
+    def add_descriptor_column(self):
+        items = ['md', 'km:CH2', 'kmd:CH2', 'rdbe', 'h/c', 'o/c', 'n/c']
+        descriptor, ok = QtWidgets.QInputDialog.getItem(self, 'Add Descriptor Column', 'Descriptor ('+', '.join(descriptor_names)+', a base like kmd:CF2)', items, 2, True)
+        descriptor = descriptor.strip()
+        if not ok or not descriptor:
+            return
+        try:
+            compile_descriptor(descriptor)
+        except ValueError as error:
+            self.statusBar().showMessage(str(error))
+            return
+        self.header_items.append(HeaderItem(self.inputNewColumnName.text() or descriptor_name(descriptor), charge = 0, descriptor = descriptor))
+        self.update_header()
+        self.dirty.header_changed(self.header_items[-1])
+        self.add_undo('Add Column')
 
     #clears the input fields in add column    
     def clear_add_column(self):
@@ -448,26 +526,21 @@ class MainWindow(QtWidgets.QMainWindow):
 
     #add a row to the table, default at the end or if row is selected below it
     def add_row(self):       
-        self.t1.blockSignals(True)
         indexes = self.t1.selectionModel().selectedRows()
         if indexes:
             row_pos = indexes[-1].row() + 1
         else:
-            row_pos = self.t1.rowCount()
-        self.t1.insertRow(row_pos)
-        self.update_table()
-        for i in range(2, len(self.header_items)):
-            
-            self.t1.item(row_pos, i).setFlags(QtCore.Qt.ItemIsEnabled)
-            
+            row_pos = self.model.rowCount()
+        self.model.insertRows(row_pos, 1)
+        self.dirty.rows_inserted(row_pos)
         self.add_undo('Add Row')
-        self.t1.blockSignals(False)
     
     #deletes the last row
     def delete_last_row(self):
-        row_pos = self.t1.rowCount()
+        row_pos = self.model.rowCount()
         if row_pos > 0:
-            self.t1.removeRow(row_pos-1)
+            self.model.removeRows(row_pos-1, 1)
+            self.dirty.row_removed(row_pos-1)
             self.add_undo('Delete Last Row')
 
     #deletes selected columns or rows
@@ -478,23 +551,24 @@ class MainWindow(QtWidgets.QMainWindow):
         columns = self.t1.selectionModel().selectedColumns()
         columns.sort()
         for r in rows[::-1]:
-            self.t1.removeRow(r.row())
+            self.model.removeRows(r.row(), 1)
+            self.dirty.row_removed(r.row())
         columns = self.t1.selectionModel().selectedColumns()
         columns.sort()
-        for c in columns[::-1]:
-            if c.column() > 2:
-                self.t1.removeColumn(c.column())
-                del self.header_items[c.column()]
+        if any(c.column() > 2 for c in columns):
+            for c in columns[::-1]:
+                if c.column() > 2:
+                    del self.header_items[c.column()]
+            self.update_header()
         #if len(rows) > 0 or len(columns) > 0:
         
-        indexes = [index for index in self.t1.selectedIndexes()]
-        self.t1.blockSignals(True)
+        indexes = self.t1.selectionModel().selectedIndexes()
         for index in indexes:
             row = index.row()
             column = index.column()
-            self.t1.item(row, column).setText('')
-            self.t1.item(row,column).setForeground(QtGui.QBrush(QtGui.QColor(0, 0, 0)))
-        self.t1.blockSignals(False)
+            self.model.set_text(row, column, '')
+            if column == 1:
+                self.dirty.formula_changed(row)
         if len(rows) > 0 or len(columns) > 0 or len(indexes) > 0:
             self.add_undo('Delete')
     
@@ -505,7 +579,7 @@ class MainWindow(QtWidgets.QMainWindow):
         start_column = indexes[0].column()
         #indexes = indexes[1:]
         for index in indexes:
-            text = self.t1.item(index.row(), index.column()).text()
+            text = self.model.text(index.row(), index.column())
             row = index.row() - start_row
             col = index.column() - start_column
             cells.append((row, col, text))
@@ -514,14 +588,14 @@ class MainWindow(QtWidgets.QMainWindow):
     def table_double_clicked(self, mi):
         row = mi.row()
         column = mi.column()
-        if self.t1.item(row, column).text() != '':
+        if self.model.text(row, column) != '':
             cb = QtWidgets.QApplication.clipboard()
             cb.clear(mode=cb.Clipboard )
-            cb.setText(self.t1.item(row, column).text(), mode=cb.Clipboard)
+            cb.setText(self.model.text(row, column), mode=cb.Clipboard)
 
     #copy cells into temp_cells without deleting selected cells
     def copy_cells(self):
-        indexes = [index for index in self.t1.selectedIndexes()]
+        indexes = self.t1.selectionModel().selectedIndexes()
         if len(indexes) == 0:
             return
         self.temp_cells = self.cells_from_indexes(indexes)
@@ -529,31 +603,31 @@ class MainWindow(QtWidgets.QMainWindow):
     
     #copy cells into temp_cells and delete selected cells
     def cut_cells(self):
-        indexes = [index for index in self.t1.selectedIndexes()]
+        indexes = self.t1.selectionModel().selectedIndexes()
         if len(indexes) == 0:
             return
         self.temp_cells = self.cells_from_indexes(indexes)
-        self.t1.blockSignals(True)
         for index in indexes:
             row = index.row()
             column = index.column()
-            self.t1.item(row, column).setText('')
-            self.compounds_changed.append(row)
-        self.t1.blockSignals(False)
+            self.model.set_text(row, column, '')
+            if column == 1:
+                self.dirty.formula_changed(row)
         self.add_undo('Cut')
         self.actionPaste.setEnabled(True)
 
     #put cells from temp_cells into table beginning from new selected cell
     def paste_cells(self):
         try:
-            start_cell = [index for index in self.t1.selectedIndexes()][0]
+            start_cell = self.t1.selectionModel().selectedIndexes()[0]
             start_row = start_cell.row()
             start_column = start_cell.column()
-            self.t1.blockSignals(True)
             for cell in self.temp_cells:
-                self.t1.item(start_row + cell[0], start_column + cell[1]).setText(cell[2])
-                self.compounds_changed.append(start_row + cell[0])
-            self.t1.blockSignals(False)
+                if start_row + cell[0] >= self.model.rowCount() or start_column + cell[1] >= self.model.columnCount():
+                    continue
+                self.model.set_text(start_row + cell[0], start_column + cell[1], cell[2])
+                if start_column + cell[1] == 1:
+                    self.dirty.formula_changed(start_row + cell[0])
             self.temp_cells = []
             self.add_undo('Paste')
             self.actionPaste.setDisabled(True)
@@ -561,195 +635,274 @@ class MainWindow(QtWidgets.QMainWindow):
             return
 
     #Calculate the Masses in Table
+    #only cells whose formula or header item changed are calculated, on a worker thread
+    #a running calculation is restarted with the cells that are still missing
     def calculate(self):
-        t0 = time()
-        self.t1.blockSignals(True)
+        if self.calculation is not None:
+            self.calculation.cancel()
+        #a restarted calculation is measured from the first start
+        if self.calculation_phase is None:
+            self.calculation_phase = self.profiler.begin('calculate')
+            self.calculated_cells = 0
+        start = self.profiler.begin('calculate.start')
+        self.dirty.expand(self.model.rowCount())
+        columns = [j for j in range(2, len(self.header_items)) if self.header_items[j].rt == 'no']
+        rows = self.dirty.changed_rows(self.model.rowCount())
+        new_columns = [j for j in columns if self.dirty.is_header_changed(self.header_items[j])]
+        formulas = self.model.column_texts(1)
+        self.t1.clearSelection()
+
+        #rows with a changed formula need every column
+        jobs = []
+        if rows and columns:
+            jobs.append((rows, [formulas[i] for i in rows], columns, [self.header_items[j] for j in columns]))
+
+        #new columns need every other row with a formula
+        if new_columns:
+            calculated = set(rows)
+            others = [i for i in range(self.model.rowCount()) if i not in calculated and formulas[i] != '']
+            jobs.append((others, [formulas[i] for i in others], new_columns, [self.header_items[j] for j in new_columns]))
+
+        self.calculation = CalculationThread(jobs, self.chunk_size, self.workers, parent=self)
+        self.calculation.finished.connect(self.calculation.deleteLater)
+        self.calculation_layout = self.model.layout_version
+        self.calculation_headers = [self.header_items[j] for j in new_columns]
+        self.calculation.batchReady.connect(self.put_masses)
+        self.calculation.progress.connect(self.progressBar.setValue)
+        self.calculation.failed.connect(self.calculation_failed)
+        self.calculation.finished.connect(self.calculation_finished)
+        self.progressBar.setValue(0)
         self.progressBar.show()
-        counter = 0
-        num_calcs = len(set(self.compounds_changed))
-        index = 1
+        self.btnCalculate.setText('Cancel')
+        self.btnCalculate.setStyleSheet('background-color:#f04747; border-radius:4px; color:#FFFFFF')
+        self.profiler.end(start)
+        self.calculation.start()
+
+    #put a batch of results into the table if it still belongs to the current calculation
+    def put_masses(self, batch):
+        if self.sender() is not self.calculation:
+            return
+        #rows or columns moved, the rest of the results would land in the wrong cells
+        if self.model.layout_version != self.calculation_layout:
+            self.calculate()
+            return
+        rows, formulas, columns, result = batch
+        #formulas edited during the calculation are calculated again by the restart
+        current = self.model.columns[1]
+        keep = [k for k, (i, formula) in enumerate(zip(rows, formulas)) if current[i] == formula]
+        numerators, states, divisors, invalid = result
+        with self.profiler.phase('calculate.put_cells', len(keep) * len(columns)):
+            self.model.put_masses([rows[k] for k in keep], columns, (numerators[keep], states[keep], divisors, invalid[keep]))
+        self.calculated_cells += len(keep) * len(columns)
+        if len(columns) == len([h for h in self.header_items[2:] if h.rt == 'no']):
+            self.dirty.rows_calculated(rows[k] for k in keep)
+
+    #new columns only count as calculated if every job finished, the cells of a failed calculation stay dirty
+    def calculation_finished(self):
+        if self.sender() is not self.calculation:
+            return
+        if self.calculation.complete:
+            self.dirty.headers_calculated(self.calculation_headers)
+        self.calculation_done()
+
+    def calculation_failed(self, message):
+        if self.sender() is self.calculation:
+            self.statusBar().showMessage('Calculation failed: '+message)
+
+    #stop a running calculation and wait for its thread, e.g. before the app exits
+    def stop_calculation(self):
+        if self.calculation is not None:
+            self.calculation.cancel()
+            self.calculation.wait()
+            self.calculation_done()
+
+    #the calculate button cancels a running calculation, the masses calculated so far are kept
+    def calculate_clicked(self):
+        if self.calculation is not None:
+            self.calculation.cancel()
+            self.calculation_done()
+        else:
+            self.calculate()
 
-        for i in set(self.compounds_changed):
-            
-            counter = int((index/num_calcs)*100)
-            index += 1
-            
-            error = False
-            if self.t1.item(i,1).text():
-                comp = Compound(self.t1.item(i,1).text())
-                item = self.t1.item(i,1).setForeground(QtGui.QBrush(QtGui.QColor(0, 0, 0)))
-                if not comp.check_formula():
-                    item = self.t1.item(i,1).setForeground(QtGui.QBrush(QtGui.QColor(240, 71, 71)))
-                    for j in range(2, len(self.header_items)):
-                        item = QtWidgets.QTableWidgetItem()
-                        item.setText('')
-                        self.t1.setItem(i,j,item)
-                    error = True
-                self.t1.clearSelection()
-                for j in range(2, len(self.header_items)):
-                    if self.header_items[j].rt == 'no':
-                        if error == True:
-                            break
-                        
-                        new_comp = Compound(self.t1.item(i,1).text(),
-                                            charge = int(self.header_items[j].charge),
-                                            adduct = self.header_items[j].adduct).del_elements(self.header_items[j].delete).add_elements(self.header_items[j].add)
-                        if new_comp.elements == 'invalid formula':
-                            item = QtWidgets.QTableWidgetItem()
-                            item.setText('N/A')
-                            item.setTextAlignment(QtCore.Qt.AlignCenter)
-                        else:
-                            item = QtWidgets.QTableWidgetItem()
-                            try:
-                                item.setText(str(new_comp.calc_mass(round_by=self.mass_precision)))
-                            except:
-                                item.setText('---')
-                            item.setTextAlignment(QtCore.Qt.AlignRight)
-
-                        item.setFlags(QtCore.Qt.ItemIsEnabled)
-                        self.t1.setItem(i,j,item) #setItem very slow
-            else:
-                for j in range(2, len(self.header_items)):
-                    self.t1.item(i,j).setText('')
-            self.progressBar.setValue(counter)
-        self.t1.blockSignals(False)
-        self.update_table()
-        self.add_undo('Calculate')
-        self.compounds_changed = []
+    def calculation_done(self):
+        self.calculation = None
+        #masses of an opened file belong to the file unless the table was changed meanwhile
+        if self.calculation_opens_file and len(self.undo_list) == 1:
+            self.model.take_changes()
+        else:
+            self.add_undo('Calculate')
+        self.calculation_opens_file = False
         self.progressBar.setValue(0)
         self.progressBar.hide()
-    
+        self.btnCalculate.setText('Calculate')
+        self.btnCalculate.setStyleSheet('background-color:#43B581; border-radius:4px; color:#FFFFFF')
+        self.t1.resizeColumnsToContents()
+        self.profiler.end(self.calculation_phase, self.calculated_cells)
+        self.calculation_phase = None
+        if self.profiler.enabled:
+            self.show_status('', 'calculate')
+
+    #turn profiling on or off, turning it on starts a new profile
+    def set_profiling(self, enabled):
+        self.calculation_phase = None
+        self.loading_phase = None
+        self.profiler.set_enabled(enabled)
+        self.statusBar().showMessage('Profiling on, the time of every operation is shown here' if enabled else 'Profiling off')
+
+    #save the profile as json with time, calls, cells/s and peak memory per phase or as cProfile statistics
+    def export_profile(self):
+        if not self.profiler.enabled:
+            self.statusBar().showMessage('Turn on Settings > Profiling first')
+            return
+        options = QtWidgets.QFileDialog.Options()
+        options |= QtWidgets.QFileDialog.DontUseNativeDialog
+        fileName, selected = QtWidgets.QFileDialog.getSaveFileName(self,"Export Profile","profile.json","Phases (*.json);;cProfile Statistics (*.prof)", options=options)
+        if fileName and not fileName.endswith(('.json', '.prof')):
+            fileName += '.prof' if selected.startswith('cProfile') else '.json'
+        if fileName:
+            try:
+                self.profiler.export(fileName)
+                self.statusBar().showMessage('Exported Profile as '+fileName)
+            except OSError as error:
+                self.statusBar().showMessage('Could not export the profile: '+str(error))
+
+    #status bar message with the profile of the last run of an operation when profiling is on
+    def show_status(self, message, phase=None):
+        summary = self.profiler.summary(phase) if phase is not None else ''
+        self.statusBar().showMessage('    '.join(text for text in (message, summary) if text))
+
+    #a dialog of the class, it is built when it is first opened and kept for the next time
+    def dialog(self, dialog_class):
+        if dialog_class not in self.dialogs:
+            self.dialogs[dialog_class] = dialog_class()
+        w = self.dialogs[dialog_class]
+        w.move(self.geometry().x()+250, self.geometry().y()+150)
+        return w
+
     #open window to set mass precision and update accordingly
     def get_mass_precision(self):
-        def show_warning_text(x):
-            if not x.text().isnumeric():
-                x.setStyleSheet('border-radius:5px; background-color:#FFFFFF; color:#f04747; border:2px solid #FFFFFF')
-            else:
-                x.setStyleSheet('border-radius:5px; background-color:#FFFFFF; color:#555555; border:2px solid #FFFFFF')
-            fnt = QtGui.QFont()
-            fnt.setPointSize(12)
-            fnt.setBold(True)
-            fnt.setFamily("Arial")
-            x.setFont(fnt)
-
-        w = MassPrecisionDialog()
+        w = self.dialog(MassPrecisionDialog)
         w.lineEdit.setText(str(self.mass_precision))
-        w.lineEdit.textChanged.connect(lambda x: show_warning_text(x = w.lineEdit))
         try:
             if w.lineEdit.textChanged != self.mass_precision:
-                self.mass_precision = w.getResults()
-                for i in range(0, self.t1.rowCount()):
-                    self.compounds_changed.append(i)
-                self.calculate()
+                mass_precision = w.getResults()
+                if mass_precision != self.mass_precision:
+                    self.mass_precision = mass_precision
+                    self.model.set_precision(self.mass_precision)
+                    self.add_undo('Mass Precision')
         except ValueError:
             self.mass_precision = self.mass_precision
 
     #Compound Builder Functions
     #take input from compound builder, calculate new compound and put it in table
+    #ranges like 1..10 or 3*1..5 give a series of compounds, see builder.py for the expressions
     def add_complex_compound(self):
         self.inputBuilderCalculation.setStyleSheet('border-radius:5px; background-color:#FFFFFF; color:#555555; border:2px solid #FFFFFF')
-        
-        to_add = []
-        to_del = []
-        compounds = self.inputBuilderCalculation.text()
-        if re.search(r'[^\+\-\*0-9]', compounds):
-            self.inputBuilderCalculation.setStyleSheet('border-radius:4px; color:#f04747; border:2px solid #FFFFFF')
-
-        plus = [m.group(2) for m in re.finditer(r'(\+|^)([\d]+\*[\d]+|[\d]+)', compounds)]
-        minus = [m.group(1) for m in re.finditer(r'\-([\d]+\*[\d]+|[\d]+)', compounds)]
-
-        if len(plus) + len(minus) == 0:
+        expression = self.inputBuilderCalculation.text()
+        if not expression.strip():
             return
-
-        auto_name = ''
+        phase = self.profiler.begin('builder')
         try:
-            for item in plus:
-                if '*' in item:
-                    i, j = item.split('*')
-                    temp = Compound(self.t1.item(int(i)-1,1).text()).multiply(int(j))
-                    auto_name += '+'+str(j)+'('+self.t1.item(int(i)-1,0).text()+')'
-                    
-                else:
-                    temp = Compound(self.t1.item(int(item)-1,1).text())
-                    auto_name += '+'+'('+self.t1.item(int(item)-1,0).text()+')'
-                to_add.append(temp)
-                if temp.formula == '':
-                    self.inputBuilderCalculation.setStyleSheet('border-radius:4px; color:#f04747; border:2px solid #FFFFFF')
-                    return
-            
-            for item in minus:
-                if '*' in item:
-                    
-                    i, j = item.split('*')
-                    temp = Compound(self.t1.item(int(i)-1,1).text()).multiply(int(j))
-                    auto_name += '-'+str(j)+'('+self.t1.item(int(i)-1,0).text()+')'
-                else:
-                    temp = Compound(self.t1.item(int(item)-1,1).text())
-                    auto_name += '-'+'('+self.t1.item(int(item)-1,0).text()+')'
-                to_del.append(temp)
-                if temp.formula == '':
-                    self.inputBuilderCalculation.setStyleSheet('border-radius:4px; color:#f04747; border:2px solid #FFFFFF')
-                    return
-                 
-        except AttributeError:
-            print('Attribute Error, None Type object has no attribute (index!)')
+            with self.profiler.phase('builder.compile'):
+                names, compositions, skipped = build_compounds(expression, self.model.column_texts(0), self.model.column_texts(1), self.elimination_product, self.builder_limit)
+        except ValueError as error:
+            self.profiler.end(phase)
+            self.inputBuilderCalculation.setStyleSheet('border-radius:4px; color:#f04747; border:2px solid #FFFFFF')
+            self.statusBar().showMessage(str(error))
+            return
+        if not names:
+            self.profiler.end(phase)
             self.inputBuilderCalculation.setStyleSheet('border-radius:4px; color:#f04747; border:2px solid #FFFFFF')
-     
+            self.statusBar().showMessage('No compound can be built, there are not enough atoms to subtract or eliminate')
+            return
+
+        #a given name is used for a single compound and put in front of the built names of a series
+        name = self.inputBuilderName.text()
+        if name and len(names) == 1:
+            names = [name]
+        elif name:
+            names = [name + ' ' + text for text in names]
+        with self.profiler.phase('builder.insert'):
+            self.insert_compounds(list(zip(names, count_formulas(compositions))), 'Add Compound')
+        self.profiler.end(phase, 2 * len(names))
+        message = str(len(names)) + (' compound' if len(names) == 1 else ' compounds') + ' added'
+        if skipped:
+            message += ', ' + str(skipped) + ' left out without enough atoms to subtract or eliminate'
+        self.show_status(message, 'builder')
+
+    #put a list of (name, formula) into the table after the last filled row
+    def insert_compounds(self, compounds, btn_text='Add Compounds'):
+        index = self.model.rowCount()
+        while index > 0 and self.model.text(index-1,0) == '' and self.model.text(index-1,1) == '':
+            index -= 1
+        self.model.setRowCount(max(self.model.rowCount(), index + len(compounds) + 1))
+        rows = range(index, index + len(compounds))
+        self.model.set_texts(0, rows, [name for name, formula in compounds])
+        self.model.set_texts(1, rows, [formula for name, formula in compounds])
+        for row in rows:
+            self.dirty.formula_changed(row)
+        self.add_undo(btn_text)
+
+    #open window to search formulas for a measured mass
+    def find_formula(self):
+        w = FormulaSearchDialog()
+        w.exec_()
 
+    #open window to enumerate the oligomers of building block rows and add them as new rows
+    #one elimination product is lost per linkage, every composition is added once
+    def add_oligomers(self):
+        w = self.dialog(OligomerDialog)
+        rows = sorted(set(index.row() for index in self.t1.selectionModel().selectedIndexes()))
+        w.lineEdit.setText(','.join(str(row+1) for row in rows))
         try:
-            compound = Compound(to_add.pop().formula)
-        except IndexError:
+            result = w.getResults()
+        except ValueError:
+            self.statusBar().showMessage('Building blocks are row numbers like 1,2,5-7 and units are numbers of at least 1')
             return
-        for c in to_add:
-            compound = compound.add_compound(c, elimination=self.elimination_product)
-        for c in to_del:
-            try:
-                compound = compound.del_compound(c, elimination=self.elimination_product)
-            except:
-                self.inputBuilderCalculation.setStyleSheet('border-radius:5px; background-color:#FFFFFF; color:#f04747; border:2px solid #FFFFFF')
+        if result is None:
+            return
+        rows, min_units, max_units = result
+        blocks = []
+        names = []
+        for row in rows:
+            if not 0 <= row < self.model.rowCount():
+                self.statusBar().showMessage('Row '+str(row+1)+' is not in the table')
                 return
-
-        for i in range(self.t1.rowCount()):
-            if self.t1.item(i,0).text() == '' and self.t1.item(i,1).text() == '':
-                index = i
-                break
-            elif i == self.t1.rowCount()-1:
-                index = i+1
-                self.t1.insertRow(index)
-                self.update_table()
-
-        if index == self.t1.rowCount() -1:
-            self.t1.insertRow(index+1)
-
-        compound.name = self.inputBuilderName.text()
-        self.update_table()
-        self.t1.blockSignals(True)
-        if compound.name != '':
-            self.t1.item(index,0).setText(compound.name)
-        else:
-            self.t1.item(index,0).setText(auto_name[1:])
-        self.t1.item(index,1).setText(compound.formula)
-        self.compounds_changed.append(index)
-        self.t1.blockSignals(False)
-        self.add_undo('Add Compound')
+            compound = Compound(self.model.text(row, 1))
+            if compound.formula == '' or not compound.check_formula():
+                self.statusBar().showMessage('Row '+str(row+1)+' has no valid formula')
+                return
+            blocks.append(compound.composition.counts)
+            names.append(self.model.text(row, 0) or compound.formula)
+        compounds = []
+        QtWidgets.QApplication.setOverrideCursor(QtCore.Qt.WaitCursor)
+        try:
+            for units, counts in enumerate_oligomers(blocks, max_units, self.elimination_product, min_units, self.oligomer_limit):
+                compounds.extend(zip(oligomer_names(units, names), count_formulas(counts)))
+            if compounds:
+                self.insert_compounds(compounds, 'Add Oligomers')
+        except ValueError:
+            self.statusBar().showMessage('Invalid elimination product '+self.elimination_product)
+            return
+        finally:
+            QtWidgets.QApplication.restoreOverrideCursor()
+        message = 'Added '+str(len(compounds))+' oligomers'
+        if len(compounds) == self.oligomer_limit:
+            message += ', stopped at the limit of '+str(self.oligomer_limit)
+        self.statusBar().showMessage(message)
+
+    #open window with the isotope patterns of the selected rows, or all rows
+    def isotope_pattern(self):
+        rows = sorted(set(index.row() for index in self.t1.selectionModel().selectedIndexes()))
+        if not rows:
+            rows = range(self.model.rowCount())
+        w = IsotopeDialog([r for r in rows if self.model.text(r,1) != ''])
+        w.exec_()
 
     #open window to set option for elimination product and update it accordingly
     def get_elimination_product(self):
-        def show_warning_text(x):
-            comp = Compound(x.text())
-            if not comp.check_formula():
-                x.setStyleSheet('border-radius:5px; background-color:#FFFFFF; color:#f04747; border:2px solid #FFFFFF')
-            else:
-                x.setStyleSheet('border-radius:5px; background-color:#FFFFFF; color:#555555; border:2px solid #FFFFFF')
-            fnt = QtGui.QFont()
-            fnt.setPointSize(12)
-            fnt.setBold(True)
-            fnt.setFamily("Arial")
-            x.setFont(fnt)
-
-        w = EliminationProductDialog()
+        w = self.dialog(EliminationProductDialog)
         w.lineEdit.setText(str(self.elimination_product))
-        w.lineEdit.textChanged.connect(lambda x: show_warning_text(x = w.lineEdit))
         result = w.getResults()
         comp = Compound(w.lineEdit.text())
         if comp.check_formula():
@@ -757,6 +910,16 @@ class MainWindow(QtWidgets.QMainWindow):
         else:
             self.elimination_product = self.elimination_product
     
+    #open window to set the worker processes and chunk size of the calculation
+    def get_parallel_calculation(self):
+        w = self.dialog(ParallelDialog)
+        w.lineEdit.setText(str(self.workers or worker_count()))
+        w.lineEdit_2.setText(str(self.chunk_size))
+        try:
+            self.workers, self.chunk_size = w.getResults()
+        except ValueError:
+            pass
+
     #clear input fields for compound builder
     def clear_builder(self):
         self.inputBuilderName.setText('')
@@ -766,7 +929,7 @@ class MainWindow(QtWidgets.QMainWindow):
     #Save and Open Files
     #spawn open file dialog and select csv file, fill table with contents of that file
     def open_csv(self):
-        if self.saved != [[self.t1.item(r,c).text() for c in range(self.t1.columnCount())] for r in range(self.t1.rowCount())]:
+        if self.is_modified():
             msgBox = QtWidgets.QMessageBox()
             msgBox.setWindowIcon(QtGui.QIcon(resource_path('atom.png')))
             msgBox.setWindowTitle('Save?')
@@ -780,58 +943,133 @@ class MainWindow(QtWidgets.QMainWindow):
                 pass
         options = QtWidgets.QFileDialog.Options()
         options |= QtWidgets.QFileDialog.DontUseNativeDialog
-        fileName, _ = QtWidgets.QFileDialog.getOpenFileName(self,"Open", "","CSV Files (*.csv)", options=options)
-        if fileName:
+        fileName, _ = QtWidgets.QFileDialog.getOpenFileName(self,"Open", "","Tables (*.csv *.mcp);;CSV Files (*.csv);;Project Files (*.mcp)", options=options)
+        self.open_table(fileName)
+
+    #open a csv or project file without asking, csv rows are read in the background
+    def open_table(self, fileName):
+        if fileName.endswith('.mcp'):
+            self.open_project(fileName)
+        elif fileName:
+            self.stop_loading()
+            self.stop_calculation()
+            self.loading_phase = self.profiler.begin('open')
             self.save_path = fileName
+            self.model.set_compounds([], [])
             
+            #only the header is read here, the rows are read in chunks by a TableLoadThread
             with open(fileName, 'r', encoding = 'utf-8') as csvfile:
                 reader = csv.reader(csvfile, delimiter = ',')
                 
                 while len(self.header_items) > 3:
                     self.header_items.pop()
-                headers = next(reader)
+                headers = next(reader, [])
                 for i in range(3, len(headers)):
-                    content = headers[i].split('#')
-                    try:
-                        self.header_items.append(HeaderItem(content[0], add=content[1], delete=content[2], adduct=content[3], charge=content[4], rt = content[5]))
-                    except IndexError:
-                        self.header_items.append(HeaderItem(content[0], add=content[1], delete=content[2], adduct=content[3], charge=content[4], rt = 'no'))
-                
-                self.update_header()
-                self.update_table()
-                self.t1.setRowCount(0)
-                row_count = 0
-                for row in reader:
-                    count = self.t1.rowCount()
-                    self.t1.insertRow(count)
-                    for column in range(len(row)):
-                        item = QtWidgets.QTableWidgetItem()
-                        item.setText(row[column])
-                        if column > 1 and self.header_items[column].rt == 'no':
-                            item.setFlags(QtCore.Qt.ItemIsEnabled)
-                        try:
-                            float(row[column])
-                            item.setTextAlignment(QtCore.Qt.AlignRight)
-                        except ValueError:
-                            item.setTextAlignment(QtCore.Qt.AlignLeft)
-                        if self.header_items[column].rt == 'yes':
-                            item.setTextAlignment(QtCore.Qt.AlignRight)
-                            #item.setBackground(QtGui.QColor(255,0,0))
-                        self.t1.setItem(row_count,column,item)
-                    row_count += 1
+                    self.header_items.append(decode_header(headers[i]))
                 
-                self.setWindowTitle('Exact Mass Calculator   -   ' + fileName.split('/')[-1])
-                
-                self.update_table()
-                self.saved = [[self.t1.item(r,c).text() for c in range(self.t1.columnCount())] for r in range(self.t1.rowCount())]
-                self.table_content = [[self.t1.item(r,c).text() for c in range(self.t1.columnCount())] for r in range(self.t1.rowCount())]
-                self.undo_list = []
-                self.compounds_changed = []
-                self.calculate()
-                self.add_undo('')
-                self.actionUndo.setDisabled(True)
-                self.actionRedo.setDisabled(True)
-                self.actionSave.setDisabled(True)
+            self.update_header()
+            self.model.set_compounds([], [])
+            self.setWindowTitle('Exact Mass Calculator   -   ' + fileName.split('/')[-1])
+            
+            self.dirty.clear()
+            self.new_history()
+
+            #the table can be scrolled but not edited while it is loading
+            self.t1.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+            self.loading = TableLoadThread(fileName, self.header_items, self.chunk_size, parent=self)
+            self.loading_headers = list(self.header_items)
+            self.loading.finished.connect(self.loading.deleteLater)
+            self.loading.chunkReady.connect(self.put_loaded_rows)
+            self.loading.failed.connect(self.loading_failed)
+            self.loading.finished.connect(self.loading_finished)
+            self.statusBar().showMessage('Loading '+fileName)
+            self.loading.start()
+
+    #open a project file, the masses are stored exactly, so nothing is calculated
+    def open_project(self, fileName):
+        self.stop_loading()
+        self.stop_calculation()
+        phase = self.profiler.begin('open')
+        try:
+            with self.profiler.phase('open.read'):
+                header_items, columns, invalid, (indices, counts), round_by = read_project(fileName)
+        except (OSError, ValueError, KeyError) as error:
+            self.profiler.end(phase)
+            self.statusBar().showMessage('Could not open '+fileName+': '+str(error))
+            return
+        self.save_path = fileName
+        self.model.set_compounds([], [])
+        self.header_items[3:] = header_items[3:]
+        self.update_header()
+        self.mass_precision = round_by
+        self.model.show_precision(round_by)
+        with self.profiler.phase('open.put_rows'):
+            self.model.append_rows(columns[0], columns[1], dict(enumerate(columns)))
+            self.model.put_invalid(np.arange(len(invalid)), invalid)
+        #a copy, so the file is not mapped any more and can be saved again
+        self.model.search_index.set_element_counts(indices, np.array(counts))
+        self.t1.resizeColumnsToContents()
+        self.setWindowTitle('Exact Mass Calculator   -   ' + fileName.split('/')[-1])
+        self.dirty.clear()
+        self.new_history()
+        self.profiler.end(phase, self.model.rowCount() * self.model.columnCount())
+        self.show_status('Opened '+fileName+'    '+str(self.model.rowCount())+' rows', 'open')
+
+    #an opened file starts a new undo history with the file as saved step
+    def new_history(self):
+        self.model.take_changes()
+        self.undo_list = []
+        self.redo_list = []
+        self.add_undo('')
+        self.saved = self.current_step()
+        self.actionUndo.setDisabled(True)
+        self.actionRedo.setDisabled(True)
+        self.actionSave.setDisabled(True)
+
+    #append a chunk of the file that is loading, rows without stored masses are calculated when the file is read
+    def put_loaded_rows(self, chunk):
+        if self.sender() is not self.loading:
+            return
+        #the stored masses belong to the columns of the file
+        if [id(header) for header in self.model.header_items] != [id(header) for header in self.loading_headers]:
+            self.stop_loading()
+            self.statusBar().showMessage('Loading stopped, the columns have been changed')
+            return
+        names, formulas, cells, calculate = chunk
+        start = self.model.rowCount()
+        with self.profiler.phase('open.put_rows', len(names) * self.model.columnCount()):
+            self.model.append_rows(names, formulas, cells)
+        for i in np.flatnonzero(calculate):
+            self.dirty.formula_changed(start + int(i))
+        self.statusBar().showMessage('Loading '+self.save_path+'    '+str(self.model.rowCount())+' rows')
+
+    def loading_failed(self, message):
+        if self.sender() is self.loading:
+            self.loading_done()
+            self.statusBar().showMessage('Loading failed: '+message)
+
+    def loading_finished(self):
+        if self.sender() is not self.loading:
+            return
+        self.loading_done()
+        self.show_status('Opened '+self.save_path+'    '+str(self.model.rowCount())+' rows', 'open')
+        if self.dirty:
+            self.calculation_opens_file = True
+            self.calculate()
+
+    #stop reading a file, the rows read so far stay in the table
+    def stop_loading(self):
+        if self.loading is not None:
+            self.loading.cancel()
+            self.loading.wait()
+            self.loading_done()
+
+    def loading_done(self):
+        self.loading = None
+        self.t1.setEditTriggers(self.edit_triggers)
+        self.t1.resizeColumnsToContents()
+        self.profiler.end(self.loading_phase, self.model.rowCount() * self.model.columnCount())
+        self.loading_phase = None
 
     #save file if it has been saved before
     def save_csv(self):
@@ -843,105 +1081,154 @@ class MainWindow(QtWidgets.QMainWindow):
                 fileName, _ = QtWidgets.QFileDialog.getSaveFileName(self,"Save as","","CSV Files (*.csv)", options=options)
                 self.save_path = fileName
             try:
-                with open(fileName, 'w', newline = '', encoding = 'utf-8') as csvfile:
-                    writer = csv.writer(csvfile, delimiter = ',')
-                    headers = ['name', 'compound', 'neutral']
-                    for column in range(3, self.t1.columnCount()):
-                        header = self.header_items[column]
-                        content = header.name+'#'+header.add+'#'+header.delete+'#'+header.adduct+'#'+str(header.charge)+'#'+header.rt
-                        headers.append(content)
-                    writer.writerow(headers)
-                    for row in range(self.t1.rowCount()):
-                        rowdata = []
-                        for column in range(self.t1.columnCount()):
-                            item = self.t1.item(row, column)
-                            if item is not None:
-                                rowdata.append(item.text())
-                            else:
-                                rowdata.append('')
-                        writer.writerow(rowdata)
+                self.write_table(fileName)
                 self.setWindowTitle('Exact Mass Calculator   -   ' + fileName.split('/')[-1])
-                self.statusBar().showMessage('Saved File as '+fileName +strftime('    %H:%M'))
-                self.saved = [[self.t1.item(r,c).text() for c in range(self.t1.columnCount())] for r in range(self.t1.rowCount())]
+                self.show_status('Saved File as '+fileName +strftime('    %H:%M'), 'save')
+                self.saved = self.current_step()
                 self.actionSave.setDisabled(True)
             except FileNotFoundError:
                 print('File Path Not Found')
 
+    #write the table as csv or, for the .mcp extension, as project file
+    def write_table(self, fileName):
+        with self.profiler.phase('save', self.model.rowCount() * self.model.columnCount()):
+            if fileName.endswith('.mcp'):
+                write_project(fileName, self.header_items, self.model.table_columns(), self.model.invalid, self.model.search_index.element_counts(), self.mass_precision)
+                return
+            with open(fileName, 'w', newline = '', encoding = 'utf-8') as csvfile:
+                writer = csv.writer(csvfile, delimiter = ',')
+                writer.writerow(header_row(self.header_items))
+                writer.writerows(self.model.rows())
+
     #select a new file to save content to and save it
     def save_as_csv(self):
         options = QtWidgets.QFileDialog.Options()
         options |= QtWidgets.QFileDialog.DontUseNativeDialog
-        fileName, _ = QtWidgets.QFileDialog.getSaveFileName(self,"Save as","untitled.csv","CSV Files (*.csv)", options=options)
-        if not fileName.endswith('.csv'):
-            fileName += '.csv'
-        self.save_path = fileName
+        fileName, selected = QtWidgets.QFileDialog.getSaveFileName(self,"Save as","untitled.csv","CSV Files (*.csv);;Project Files (*.mcp)", options=options)
+        if fileName and not fileName.endswith(('.csv', '.mcp')):
+            fileName += '.mcp' if selected.startswith('Project') else '.csv'
         if fileName:
-            with open(fileName, 'w', newline = '', encoding='utf-8') as csvfile:
-                    writer = csv.writer(csvfile, delimiter = ',')
-                    headers = ['name', 'compound', 'neutral']
-                    for column in range(3, self.t1.columnCount()):
-                        header = self.header_items[column]
-                        content = header.name+'#'+header.add+'#'+header.delete+'#'+header.adduct+'#'+str(header.charge)+'#'+header.rt
-                        headers.append(content)
-                    writer.writerow(headers)
-                    for row in range(self.t1.rowCount()):
-                        rowdata = []
-                        for column in range(self.t1.columnCount()):
-                            item = self.t1.item(row, column)
-                            if item is not None:
-                                rowdata.append(item.text())
-                            else:
-                                rowdata.append('')
-                        writer.writerow(rowdata)
+            self.save_path = fileName
+            self.write_table(fileName)
             self.setWindowTitle('Exact Mass Calculator   -   ' + fileName.split('/')[-1])
-            self.statusBar().showMessage('Saved File as '+fileName +strftime('    %H:%M'))
-            self.saved = [[self.t1.item(r,c).text() for c in range(self.t1.columnCount())] for r in range(self.t1.rowCount())]
+            self.show_status('Saved File as '+fileName +strftime('    %H:%M'), 'save')
+            self.saved = self.current_step()
             self.actionSave.setDisabled(True)
 
     #Find Items in Table
-    def find(self): 
-        
-        if self.inputSearch.text() != self.search_term and self.inputSearch.text() != '':
-            self.search_term = self.inputSearch.text()
-            self.matches = []
-            self.t1.blockSignals(True)
-            for row in range(self.t1.rowCount()):
-                for column in range(self.t1.columnCount()):
-                    self.t1.item(row, column).setBackground(QtGui.QColor(255,255,255))
-                    if self.inputSearch.text().lower() in self.t1.item(row, column).text().lower():
-                            self.t1.item(row, column).setBackground(QtGui.QColor(255, 191, 0))
-                            self.matches.append((row, column))
-
-
-            self.matches.reverse()
-            try:
-                match = self.matches.pop()
-                self.t1.scrollToItem(self.t1.item(match[0], match[1]))
-                self.inputSearch.setStyleSheet('border-radius:4px;  color:#555555; border:2px solid #FFFFFF;')
-            except IndexError:
-                self.inputSearch.setStyleSheet('border-radius:4px;  color:#f04747; border:2px solid #FFFFFF;')
-            
+    #the search term can be text, /regex/, m/z 301.1±5ppm, m/z 300-302, formula contains N2 or name contains text
+    def search(self):
+        self.search_timer.stop()
+        self.search_term = self.inputSearch.text()
+        if self.search_term.strip() == '':
+            self.model.set_highlighted({})
+            self.matches = np.zeros((0, 2), dtype=np.int64)
+            self.inputSearch.setStyleSheet('border-radius:4px;  color:#555555; border:2px solid #FFFFFF;')
+            return
+        try:
+            with self.profiler.phase('find', self.model.rowCount() * self.model.columnCount()):
+                found = self.model.search_index.search(self.search_term)
+        except ValueError as error:
+            self.model.set_highlighted({})
+            self.matches = np.zeros((0, 2), dtype=np.int64)
+            self.inputSearch.setStyleSheet('border-radius:4px;  color:#f04747; border:2px solid #FFFFFF;')
+            self.statusBar().showMessage(str(error))
+            return
+        self.model.set_highlighted(found)
+        rows = np.concatenate([rows for rows in found.values()] + [np.zeros(0, dtype=np.int64)])
+        columns = np.concatenate([np.full(len(rows), column) for column, rows in found.items()] + [np.zeros(0, dtype=np.int64)])
+        order = np.lexsort((columns, rows))
+        self.matches = np.column_stack([rows[order], columns[order]])
+        self.match_position = 0
+        if self.profiler.enabled:
+            self.show_status(str(len(self.matches))+' matches', 'find')
+        if len(self.matches):
+            self.inputSearch.setStyleSheet('border-radius:4px;  color:#555555; border:2px solid #FFFFFF;')
+            self.show_next_match()
         else:
-            if len(self.matches) > 0:
-                match = self.matches.pop()
-                self.t1.scrollToItem(self.t1.item(match[0], match[1]))
+            self.inputSearch.setStyleSheet('border-radius:4px;  color:#f04747; border:2px solid #FFFFFF;')
 
-        self.t1.blockSignals(False)
+    def show_next_match(self):
+        if self.match_position < len(self.matches):
+            row, column = self.matches[self.match_position]
+            self.t1.scrollTo(self.model.index(int(row), int(column)))
+            self.match_position += 1
+
+    def find(self):
+        if self.inputSearch.text() != self.search_term or self.search_timer.isActive():
+            self.search()
+        else:
+            self.show_next_match()
 
     #clear input field for search 
     def clear_find(self):
-        self.t1.blockSignals(True)
-        for row in range(self.t1.rowCount()):
-            for column in range(self.t1.columnCount()):
-                self.t1.item(row, column).setBackground(QtGui.QColor(255,255,255))
-                self.inputSearch.setText('')
-        self.matches = []
-        self.search_term = ''
-        self.t1.blockSignals(False)
+        self.inputSearch.setText('')
+        self.search()
+
+    #Match observed m/z values against all ion columns
+    #build a sorted index over all calculable cells of the ion columns
+    def mass_index(self):
+        columns = [j for j in range(2, len(self.header_items)) if self.header_items[j].rt == 'no']
+        formulas = self.model.column_texts(1)
+        return MassIndex.from_formulas(formulas, [self.header_items[j] for j in columns], columns)
+
+    def match_masses(self):
+        w = self.dialog(MatchDialog)
+        w.clear_hits()
+        w.exec_()
+
+    #annotate the peaks of an mzML, MGF or csv file with the ion columns of the table and write them to a csv file
+    #the file is read on a worker thread, the action cancels a running annotation
+    def annotate_peaks(self):
+        if self.annotation is not None:
+            self.stop_annotation()
+            self.statusBar().showMessage('Annotation cancelled')
+            return
+        options = QtWidgets.QFileDialog.Options()
+        options |= QtWidgets.QFileDialog.DontUseNativeDialog
+        peak_file, _ = QtWidgets.QFileDialog.getOpenFileName(self,"Annotate Peak List", "","Peak Lists (*.mzML *.mgf *.csv);;All Files (*)", options=options)
+        if not peak_file:
+            return
+        tolerance, ok = QtWidgets.QInputDialog.getText(self, 'Annotate Peak List', 'Tolerance', text='5 ppm')
+        if not ok:
+            return
+        try:
+            ppm, mda = parse_tolerance(tolerance)
+        except ValueError as error:
+            self.statusBar().showMessage(str(error))
+            return
+        output_file, _ = QtWidgets.QFileDialog.getSaveFileName(self,"Save Annotation", path.splitext(peak_file)[0]+'_annotated.csv', "CSV Files (*.csv)", options=options)
+        if not output_file:
+            return
+        columns = [j for j in range(2, len(self.header_items)) if self.header_items[j].rt == 'no']
+        #the thread gets copies of the names and formulas, the table can be edited while it runs
+        self.annotation = AnnotationThread(peak_file, output_file, list(self.model.column_texts(0)), list(self.model.column_texts(1)),
+                                           [self.header_items[j] for j in columns], ppm, mda, self.mass_precision, parent=self)
+        self.annotation.progress.connect(lambda peaks: self.statusBar().showMessage('Annotating '+path.basename(peak_file)+': '+str(peaks)+' peaks'))
+        self.annotation.done.connect(lambda result: self.statusBar().showMessage(f'{result[0]} peaks, {result[1]} annotations written to {path.basename(output_file)} in {result[2]:.1f} s'))
+        self.annotation.failed.connect(lambda message: self.statusBar().showMessage('Could not annotate '+path.basename(peak_file)+': '+message))
+        self.annotation.finished.connect(self.annotation.deleteLater)
+        self.annotation.finished.connect(self.annotation_finished)
+        self.annotation.start()
+
+    def annotation_finished(self):
+        if self.sender() is self.annotation:
+            self.annotation = None
+
+    def stop_annotation(self):
+        if self.annotation is not None:
+            self.annotation.cancel()
+            self.annotation.wait()
+            self.annotation = None
+
+    #select a cell and scroll to it
+    def show_cell(self, row, column):
+        self.t1.setCurrentIndex(self.model.index(row, column))
+        self.t1.scrollTo(self.model.index(row, column))
 
     #Display Help/Error Dialogs
     def display_help(self):
-        w = HelpDialog()
+        w = self.dialog(HelpDialog)
         w.exec_()
 
     #display about App Window
@@ -956,10 +1243,11 @@ class MainWindow(QtWidgets.QMainWindow):
 class MassPrecisionDialog(QtWidgets.QDialog):
     def __init__(self):
         super(MassPrecisionDialog, self).__init__()
-        uic.loadUi(resource_path("view/mass_precision_dialog.ui"), self)
+        load_ui(self, resource_path("view/mass_precision_dialog.ui"))
         self.setWindowIcon(QtGui.QIcon(resource_path('atom.png')))
         self.setWindowTitle('Mass Precision')
         self.setUI()
+        self.lineEdit.textChanged.connect(self.show_warning_text)
 
     def setUI(self):
         self.line.setStyleSheet('background-color:#FFFFFF; border-radius:1px;')
@@ -971,7 +1259,17 @@ class MassPrecisionDialog(QtWidgets.QDialog):
         x = win.geometry().x()
         y = win.geometry().y()
         self.move(x+250,y+150)
-        
+
+    def show_warning_text(self):
+        if not self.lineEdit.text().isnumeric():
+            self.lineEdit.setStyleSheet('border-radius:5px; background-color:#FFFFFF; color:#f04747; border:2px solid #FFFFFF')
+        else:
+            self.lineEdit.setStyleSheet('border-radius:5px; background-color:#FFFFFF; color:#555555; border:2px solid #FFFFFF')
+        fnt = QtGui.QFont()
+        fnt.setPointSize(12)
+        fnt.setBold(True)
+        fnt.setFamily("Arial")
+        self.lineEdit.setFont(fnt)
 
     def getResults(self):
         if self.exec_() == QtWidgets.QDialog.Accepted:
@@ -983,10 +1281,11 @@ class MassPrecisionDialog(QtWidgets.QDialog):
 class EliminationProductDialog(QtWidgets.QDialog):
     def __init__(self):
         super(EliminationProductDialog, self).__init__()
-        uic.loadUi(resource_path("view/elimination_product_dialog.ui"), self)
+        load_ui(self, resource_path("view/elimination_product_dialog.ui"))
         self.setWindowIcon(QtGui.QIcon(resource_path('atom.png')))
         self.setWindowTitle('Elimination Product')
         self.setUI()
+        self.lineEdit.textChanged.connect(self.show_warning_text)
 
     def setUI(self):
         self.line.setStyleSheet('background-color:#FFFFFF; border-radius:1px;')
@@ -1000,6 +1299,17 @@ class EliminationProductDialog(QtWidgets.QDialog):
         y = win.geometry().y()
         self.move(x+250,y+150)
 
+    def show_warning_text(self):
+        if not Compound(self.lineEdit.text()).check_formula():
+            self.lineEdit.setStyleSheet('border-radius:5px; background-color:#FFFFFF; color:#f04747; border:2px solid #FFFFFF')
+        else:
+            self.lineEdit.setStyleSheet('border-radius:5px; background-color:#FFFFFF; color:#555555; border:2px solid #FFFFFF')
+        fnt = QtGui.QFont()
+        fnt.setPointSize(12)
+        fnt.setBold(True)
+        fnt.setFamily("Arial")
+        self.lineEdit.setFont(fnt)
+
     def getResults(self):
         if self.exec_() == QtWidgets.QDialog.Accepted:
             elimination_product = self.lineEdit.text()
@@ -1007,10 +1317,78 @@ class EliminationProductDialog(QtWidgets.QDialog):
         else:
             return win.elimination_product
 
+class ParallelDialog(QtWidgets.QDialog):
+    def __init__(self):
+        super(ParallelDialog, self).__init__()
+        load_ui(self, resource_path("view/parallel_dialog.ui"))
+        self.setWindowIcon(QtGui.QIcon(resource_path('atom.png')))
+        self.setWindowTitle('Parallel Calculation')
+        self.setUI()
+
+    def setUI(self):
+        self.line.setStyleSheet('background-color:#FFFFFF; border-radius:1px;')
+        for button in self.buttonBox.buttons():
+            button.setStyleSheet('width:80px; height: 40px; background-color:#7289DA; border-radius:4px; color:#FFFFFF; height: 32px;')
+        for label in (self.label, self.label_2):
+            label.setStyleSheet('color:#555555;')
+        for field in (self.lineEdit, self.lineEdit_2):
+            field.setStyleSheet('border-radius:4px; background-color:#EEEEEE; color:#555555; border:2px solid #FFFFFF')
+        self.setWindowFlags(QtCore.Qt.WindowCloseButtonHint)
+        x = win.geometry().x()
+        y = win.geometry().y()
+        self.move(x+250,y+150)
+
+    #workers and chunk size, both at least 1
+    def getResults(self):
+        if self.exec_() == QtWidgets.QDialog.Accepted:
+            workers = int(self.lineEdit.text())
+            chunk_size = int(self.lineEdit_2.text())
+            if workers < 1 or chunk_size < 1:
+                raise ValueError('Workers and chunk size must be at least 1')
+            return workers, chunk_size
+        else:
+            return win.workers, win.chunk_size
+
+class OligomerDialog(QtWidgets.QDialog):
+    def __init__(self):
+        super(OligomerDialog, self).__init__()
+        load_ui(self, resource_path("view/oligomer_dialog.ui"))
+        self.setWindowIcon(QtGui.QIcon(resource_path('atom.png')))
+        self.setWindowTitle('Oligomers')
+        self.setUI()
+
+    def setUI(self):
+        self.line.setStyleSheet('background-color:#FFFFFF; border-radius:1px;')
+        for button in self.buttonBox.buttons():
+            button.setStyleSheet('width:80px; height: 40px; background-color:#7289DA; border-radius:4px; color:#FFFFFF; height: 32px;')
+        for label in (self.label, self.label_2, self.label_3):
+            label.setStyleSheet('color:#555555;')
+        for field in (self.lineEdit, self.lineEdit_2, self.lineEdit_3):
+            field.setStyleSheet('border-radius:4px; background-color:#EEEEEE; color:#555555; border:2px solid #FFFFFF')
+        self.setWindowFlags(QtCore.Qt.WindowCloseButtonHint)
+        x = win.geometry().x()
+        y = win.geometry().y()
+        self.move(x+250,y+150)
+
+    #building block rows (from 0), min and max units, None if cancelled
+    def getResults(self):
+        if self.exec_() == QtWidgets.QDialog.Accepted:
+            rows = []
+            for part in self.lineEdit.text().replace(' ', '').split(','):
+                first, _, last = part.partition('-')
+                rows.extend(range(int(first) - 1, int(last or first)))
+            min_units = int(self.lineEdit_2.text())
+            max_units = int(self.lineEdit_3.text())
+            if not rows or min_units < 1 or max_units < min_units:
+                raise ValueError('Invalid building blocks or units')
+            return sorted(set(rows)), min_units, max_units
+        else:
+            return None
+
 class HelpDialog(QtWidgets.QDialog):
     def __init__(self):
         super(HelpDialog, self).__init__()
-        uic.loadUi(resource_path("view/help_dialog.ui"), self)
+        load_ui(self, resource_path("view/help_dialog.ui"))
         self.setWindowIcon(QtGui.QIcon(resource_path('atom.png')))
         self.setWindowTitle('Help')
         self.setUI()
@@ -1022,20 +1400,293 @@ class HelpDialog(QtWidgets.QDialog):
         y = win.geometry().y()
         self.move(x+250,y+150)
 
-class HeaderItem():
-    def __init__(self, name, add='', delete ='', adduct = '', charge='', rt = 'no'):
-        self.name = name 
-        self.add = add
-        self.delete = delete
-        self.adduct = adduct
-        self.charge = charge
-        self.rt = rt
-        
+class MatchDialog(QtWidgets.QDialog):
+    def __init__(self):
+        super(MatchDialog, self).__init__()
+        load_ui(self, resource_path("view/match_dialog.ui"))
+        self.setWindowIcon(QtGui.QIcon(resource_path('atom.png')))
+        self.setWindowTitle('Match m/z')
+        self.hits = []
+        self.setUI()
+        self.btnMatch.clicked.connect(self.match)
+        self.tableHits.doubleClicked.connect(self.show_hit)
+
+    def setUI(self):
+        self.line.setStyleSheet('background-color:#FFFFFF; border-radius:1px;')
+        self.btnMatch.setStyleSheet('background-color:#ffbf00; border-radius:4px; color:#FFFFFF')
+        for label in (self.label, self.label_2):
+            label.setStyleSheet('color:#555555;')
+        for field in (self.inputMasses, self.inputTolerance):
+            field.setStyleSheet('border-radius:4px; background-color:#EEEEEE; color:#555555; border:2px solid #FFFFFF')
+        self.tableHits.setColumnCount(6)
+        self.tableHits.setHorizontalHeaderLabels(['observed', 'name', 'compound', 'ion', 'm/z', 'ppm'])
+        self.tableHits.setFont(QtGui.QFont ("Consolas", 10))
+        self.setWindowFlags(QtCore.Qt.WindowCloseButtonHint)
+        x = win.geometry().x()
+        y = win.geometry().y()
+        self.move(x+250,y+150)
 
-app = QtWidgets.QApplication(sys.argv)
-win = MainWindow()
-win.show()
-app.exec_()
+    #look up all observed masses and list the hits, best hit per observed mass first
+    def match(self):
+        self.inputMasses.setStyleSheet('border-radius:4px; background-color:#EEEEEE; color:#555555; border:2px solid #FFFFFF')
+        self.inputTolerance.setStyleSheet('border-radius:4px; background-color:#EEEEEE; color:#555555; border:2px solid #FFFFFF')
+        try:
+            observed = [float(m) for m in re.split(r'[\s,;]+', self.inputMasses.toPlainText().strip()) if m]
+        except ValueError:
+            self.inputMasses.setStyleSheet('border-radius:4px; background-color:#EEEEEE; color:#f04747; border:2px solid #FFFFFF')
+            return
+        try:
+            ppm, mda = parse_tolerance(self.inputTolerance.text())
+        except ValueError:
+            self.inputTolerance.setStyleSheet('border-radius:4px; background-color:#EEEEEE; color:#f04747; border:2px solid #FFFFFF')
+            return
+
+        hits = win.mass_index().query(observed, ppm=ppm, mda=mda)
+        self.hits = hits[np.lexsort((np.abs(hits['ppm']), hits['query']))]
+        self.tableHits.setRowCount(len(self.hits))
+        for r, hit in enumerate(self.hits):
+            row = int(hit['row'])
+            column = int(hit['column'])
+            texts = [str(observed[hit['query']]),
+                    win.model.text(row,0),
+                    win.model.text(row,1),
+                    win.header_items[column].name,
+                    f"{hit['mz']:.{win.mass_precision}f}",
+                    f"{hit['ppm']:.2f}"]
+            for c, text in enumerate(texts):
+                item = QtWidgets.QTableWidgetItem(text)
+                if c in (0, 4, 5):
+                    item.setTextAlignment(QtCore.Qt.AlignRight)
+                self.tableHits.setItem(r, c, item)
+        self.tableHits.resizeColumnsToContents()
+
+    #the hits of the last time the dialog was open point to rows of another table
+    def clear_hits(self):
+        self.hits = []
+        self.tableHits.setRowCount(0)
+
+    def show_hit(self, mi):
+        hit = self.hits[mi.row()]
+        win.show_cell(int(hit['row']), int(hit['column']))
+
+class FormulaSearchDialog(QtWidgets.QDialog):
+    def __init__(self):
+        super(FormulaSearchDialog, self).__init__()
+        load_ui(self, resource_path("view/formula_search_dialog.ui"))
+        self.setWindowIcon(QtGui.QIcon(resource_path('atom.png')))
+        self.setWindowTitle('Find Formula')
+        self.candidates = []
+        self.max_candidates = 500
+        self.search_thread = None
+        self.ions = [header for header in win.header_items[2:] if header.rt == 'no' and not header.descriptor]
+        self.setUI()
+        self.btnSearch.clicked.connect(self.search)
+        self.btnAdd.clicked.connect(self.add_to_table)
+
+    def setUI(self):
+        self.line.setStyleSheet('background-color:#FFFFFF; border-radius:1px;')
+        self.btnSearch.setStyleSheet('background-color:#ffbf00; border-radius:4px; color:#FFFFFF')
+        self.btnAdd.setStyleSheet('background-color:#43B581; border-radius:4px; color:#FFFFFF')
+        for label in (self.label, self.label_2, self.label_3, self.label_4):
+            label.setStyleSheet('color:#555555;')
+        for field in (self.inputMz, self.inputTolerance, self.inputElements):
+            field.setStyleSheet('border-radius:4px; background-color:#EEEEEE; color:#555555; border:2px solid #FFFFFF')
+        self.comboIon.addItems([header.name for header in self.ions])
+        self.tableCandidates.setColumnCount(4)
+        self.tableCandidates.setHorizontalHeaderLabels(['compound', 'm/z', 'ppm', 'RDBE'])
+        self.tableCandidates.setFont(QtGui.QFont ("Consolas", 10))
+        self.setWindowFlags(QtCore.Qt.WindowCloseButtonHint)
+        x = win.geometry().x()
+        y = win.geometry().y()
+        self.move(x+250,y+150)
+
+    #search formulas on all cores on a worker thread, the best candidates are shown when it is done
+    def search(self):
+        if self.search_thread is not None:
+            return
+        fields = (self.inputMz, self.inputTolerance, self.inputElements)
+        for field in fields:
+            field.setStyleSheet('border-radius:4px; background-color:#EEEEEE; color:#555555; border:2px solid #FFFFFF')
+        try:
+            observed = float(self.inputMz.text())
+        except ValueError:
+            self.inputMz.setStyleSheet('border-radius:4px; background-color:#EEEEEE; color:#f04747; border:2px solid #FFFFFF')
+            return
+        try:
+            ppm, mda = parse_tolerance(self.inputTolerance.text())
+        except ValueError:
+            self.inputTolerance.setStyleSheet('border-radius:4px; background-color:#EEEEEE; color:#f04747; border:2px solid #FFFFFF')
+            return
+        try:
+            limits = parse_limits(self.inputElements.text())
+            ion = self.ions[self.comboIon.currentIndex()]
+        except (ValueError, IndexError):
+            self.search_failed()
+            return
+        self.btnSearch.setEnabled(False)
+        self.search_thread = FormulaSearchThread(observed, ion, ppm, mda, limits, self.max_candidates, parent=self)
+        self.search_thread.done.connect(self.show_candidates)
+        self.search_thread.failed.connect(self.search_failed)
+        self.search_thread.finished.connect(self.search_finished)
+        self.search_thread.start()
+
+    def search_failed(self, message=''):
+        self.inputElements.setStyleSheet('border-radius:4px; background-color:#EEEEEE; color:#f04747; border:2px solid #FFFFFF')
+
+    def search_finished(self):
+        self.search_thread.deleteLater()
+        self.search_thread = None
+        self.btnSearch.setEnabled(True)
+
+    def show_candidates(self, candidates):
+        self.candidates = candidates
+        self.observed = self.search_thread.observed
+        self.ion_name = self.search_thread.ion.name
+        self.tableCandidates.setRowCount(len(self.candidates))
+        for r, candidate in enumerate(self.candidates):
+            texts = [candidate.formula, f'{candidate.mz:.{win.mass_precision}f}', f'{candidate.ppm:.2f}', f'{candidate.rdbe:g}']
+            for c, text in enumerate(texts):
+                item = QtWidgets.QTableWidgetItem(text)
+                if c > 0:
+                    item.setTextAlignment(QtCore.Qt.AlignRight)
+                self.tableCandidates.setItem(r, c, item)
+        self.tableCandidates.resizeColumnsToContents()
+
+    #a running search is finished before the dialog is closed, the search can not be cancelled
+    def done(self, result):
+        if self.search_thread is not None:
+            self.search_thread.wait()
+        super(FormulaSearchDialog, self).done(result)
+
+    #add the selected candidates, or all if none is selected, as new rows
+    def add_to_table(self):
+        rows = sorted(set(index.row() for index in self.tableCandidates.selectedIndexes()))
+        if not rows:
+            rows = range(len(self.candidates))
+        compounds = [(f'{self.observed} {self.ion_name} {self.candidates[r].ppm:.2f} ppm', self.candidates[r].formula) for r in rows]
+        if compounds:
+            win.insert_compounds(compounds, 'Add Formulas')
+
+class IsotopeDialog(QtWidgets.QDialog):
+    def __init__(self, rows):
+        super(IsotopeDialog, self).__init__()
+        load_ui(self, resource_path("view/isotope_dialog.ui"))
+        self.setWindowIcon(QtGui.QIcon(resource_path('atom.png')))
+        self.setWindowTitle('Isotope Pattern')
+        self.names = [win.model.text(r,0) for r in rows]
+        self.formulas = [win.model.text(r,1) for r in rows]
+        self.ions = [header for header in win.header_items[2:] if header.rt == 'no' and not header.descriptor]
+        self.peaks = PeakTableModel(self.names, self.formulas, self.ions, round_by=win.mass_precision, parent=self)
+        self.thread = None
+        self.setUI()
+        self.btnCalculate.clicked.connect(self.calculate)
+        self.btnExport.clicked.connect(self.export)
+        self.calculate()
+
+    def setUI(self):
+        self.line.setStyleSheet('background-color:#FFFFFF; border-radius:1px;')
+        self.btnCalculate.setStyleSheet('background-color:#43B581; border-radius:4px; color:#FFFFFF')
+        self.btnExport.setStyleSheet('background-color:#7289DA; border-radius:4px; color:#FFFFFF')
+        for label in (self.label, self.label_2):
+            label.setStyleSheet('color:#555555;')
+        self.inputThreshold.setStyleSheet('border-radius:4px; background-color:#EEEEEE; color:#555555; border:2px solid #FFFFFF')
+        self.comboMode.addItems(['aggregated', 'fine'])
+        self.tablePeaks.setModel(self.peaks)
+        self.tablePeaks.setFont(QtGui.QFont ("Consolas", 10))
+        self.setWindowFlags(QtCore.Qt.WindowCloseButtonHint)
+        x = win.geometry().x()
+        y = win.geometry().y()
+        self.move(x+250,y+150)
+
+    #patterns of all rows and ion columns on a worker thread, a running calculation is cancelled
+    def calculate(self):
+        self.stop()
+        self.inputThreshold.setStyleSheet('border-radius:4px; background-color:#EEEEEE; color:#555555; border:2px solid #FFFFFF')
+        try:
+            threshold = float(self.inputThreshold.text()) / 100
+        except ValueError:
+            self.inputThreshold.setStyleSheet('border-radius:4px; background-color:#EEEEEE; color:#f04747; border:2px solid #FFFFFF')
+            return
+        self.btnExport.setEnabled(False)
+        self.thread = IsotopeThread(self.formulas, self.ions, self.comboMode.currentText(), threshold, parent=self)
+        self.thread.progress.connect(lambda percent: self.setWindowTitle('Isotope Pattern '+str(percent)+'%'))
+        self.thread.done.connect(self.show_peaks)
+        self.thread.failed.connect(lambda message: self.setWindowTitle('Isotope Pattern: '+message))
+        self.thread.finished.connect(self.thread_finished)
+        self.thread.start()
+
+    def show_peaks(self, peaks):
+        self.peaks.beginResetModel()
+        self.peaks.peaks = peaks
+        self.peaks.endResetModel()
+        self.setWindowTitle('Isotope Pattern')
+        self.btnExport.setEnabled(True)
+        #the widths are measured on the first 1000 rows, the precision of the header
+        self.tablePeaks.resizeColumnsToContents()
+
+    def thread_finished(self):
+        if self.sender() is self.thread:
+            self.thread = None
+
+    def stop(self):
+        if self.thread is not None:
+            self.thread.cancel()
+            self.thread.wait()
+            self.thread = None
+
+    def done(self, result):
+        self.stop()
+        super(IsotopeDialog, self).done(result)
+
+    def export(self):
+        options = QtWidgets.QFileDialog.Options()
+        options |= QtWidgets.QFileDialog.DontUseNativeDialog
+        fileName, _ = QtWidgets.QFileDialog.getSaveFileName(self,"Export","isotopes.csv","CSV Files (*.csv)", options=options)
+        if fileName:
+            with open(fileName, 'w', newline = '', encoding = 'utf-8') as csvfile:
+                writer = csv.writer(csvfile, delimiter = ',')
+                writer.writerow(['name', 'compound', 'ion', 'peak', 'm/z', 'intensity'])
+                writer.writerows(self.peaks.csv_rows())
+
+#the application and the main window, the dialogs find the window here
+app = None
+win = None
+
+#start the program, with --measure-startup it prints the seconds until the window is shown and quits
+#the exit code is 1 if the startup took longer than --startup-budget seconds
+def main(argv=None):
+    global app, win
+    #worker processes of the windows executable start here, multiprocessing is not needed otherwise
+    if getattr(sys, 'frozen', False):
+        from multiprocessing import freeze_support
+        freeze_support()
+    argv = sys.argv if argv is None else argv
+    parser = argparse.ArgumentParser(prog='MassCalculator.py', description='Exact Mass Calculator')
+    parser.add_argument('--measure-startup', action='store_true', help='print the startup time in seconds and quit')
+    parser.add_argument('--startup-budget', type=float, default=None, metavar='SECONDS', help='with --measure-startup, exit with 1 if the startup took longer')
+    #the remaining arguments are left to Qt
+    args, qt_arguments = parser.parse_known_args(argv[1:])
+    app = QtWidgets.QApplication(argv[:1] + qt_arguments)
+    win = MainWindow()
+    win.show()
+    if not args.measure_startup:
+        return app.exec_()
+
+    seconds = []
+    #runs when the events of showing the window are processed
+    def measured():
+        seconds.append(perf_counter() - started)
+        app.quit()
+    QtCore.QTimer.singleShot(0, measured)
+    app.exec_()
+    print(f'startup {seconds[0]:.3f} s')
+    if args.startup_budget is not None and seconds[0] > args.startup_budget:
+        print(f'startup is over the budget of {args.startup_budget:.3f} s', file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
 
 #TODO
 
@@ -0,0 +1,42 @@
+import threading
+from time import perf_counter
+from PyQt5 import QtCore
+from peak_lists import annotate_file
+
+#annotates a peak list file on a worker thread, the table is copied before and never touched here
+#the annotation is written while the file is read, so a cancelled run leaves the rows written so far
+class AnnotationThread(QtCore.QThread):
+    #peaks read so far, at most five times per second
+    progress = QtCore.pyqtSignal(int)
+    #(peaks, annotation rows, seconds)
+    done = QtCore.pyqtSignal(object)
+    failed = QtCore.pyqtSignal(str)
+
+    def __init__(self, peak_file, output_file, names, formulas, ion_definitions, ppm=None, mda=None, round_by=4, parent=None):
+        super(AnnotationThread, self).__init__(parent)
+        self.peak_file = peak_file
+        self.output_file = output_file
+        self.names = names
+        self.formulas = formulas
+        self.ion_definitions = ion_definitions
+        self.ppm = ppm
+        self.mda = mda
+        self.round_by = round_by
+        self.cancelled = threading.Event()
+        self.reported = 0.0
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def report(self, peaks):
+        if perf_counter() - self.reported > 0.2:
+            self.reported = perf_counter()
+            self.progress.emit(peaks)
+        return self.cancelled.is_set()
+
+    def run(self):
+        try:
+            self.done.emit(annotate_file(self.peak_file, self.output_file, self.names, self.formulas, self.ion_definitions,
+                                         self.ppm, self.mda, round_by=self.round_by, progress=self.report))
+        except (OSError, UnicodeDecodeError, ValueError, SyntaxError) as error:
+            self.failed.emit(str(error))
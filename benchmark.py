@@ -0,0 +1,247 @@
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from statistics import median
+from time import perf_counter
+import numpy as np
+
+#widgets are created without a screen, so the benchmarks also run on a server
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from compound import Compound, get_element_dict, parse_formula
+from mass_engine import count_matrix, mass_states
+from table_csv import HeaderItem, default_header_items
+from builder import build_compounds
+
+#benchmarks of the formula parser, the mass engine, the builder and the table operations of the GUI
+#every case runs on a synthetic compound library of each size, the same seed gives the same library
+#results are written as json and two result files can be compared to find regressions between versions
+#  python benchmark.py --sizes 1000 10000 --output new.json
+#  python benchmark.py --compare old.json new.json
+default_sizes = [1000, 10000, 100000, 1000000]
+#cases that work on single compounds use at most this many of them
+sample_size = 10000
+
+#names and formulas of random compounds with C, H, N, O, P and S, every formula is valid
+def compound_library(rows, seed=0):
+    generator = random.Random(seed)
+    formulas = []
+    for i in range(rows):
+        formula = f'C{generator.randint(1, 60)}H{generator.randint(2, 120)}'
+        for element, high in (('N', 8), ('O', 25), ('P', 3), ('S', 3)):
+            count = generator.randint(0, high)
+            if count:
+                formula += element + (str(count) if count > 1 else '')
+        formulas.append(formula)
+    return [f'compound {i}' for i in range(rows)], formulas
+
+#run function repeat times, setup runs before every run and is not measured, its result is passed to function
+def measure(function, repeat, setup=None):
+    times = []
+    for run in range(repeat):
+        argument = setup() if setup is not None else None
+        start = perf_counter()
+        function(argument)
+        times.append(perf_counter() - start)
+    return times
+
+def engine_cases(names, formulas):
+    sample = formulas[:sample_size]
+    header_items = default_header_items()[2:]
+    descriptors = [HeaderItem(descriptor, charge=0, descriptor=descriptor) for descriptor in ('md', 'kmd:CH2', 'rdbe', 'h/c', 'o/c', 'n/c')]
+    compounds = [Compound(formula, charge=1) for formula in sample]
+    #a sum of two ranges has about as many combinations as the table has rows
+    side = max(1, int(len(formulas) ** 0.5))
+
+    def parse(argument):
+        parse_formula.cache_clear()
+        for formula in sample:
+            get_element_dict(formula)
+
+    def count(argument):
+        parse_formula.cache_clear()
+        count_matrix(formulas)
+
+    def calc_mass(argument):
+        for compound in compounds:
+            compound.calc_mass()
+
+    return [('get_element_dict', len(sample), parse, None),
+            ('count_matrix', len(formulas), count, None),
+            ('calc_mass', len(sample), calc_mass, None),
+            ('mass_states', len(formulas), lambda argument: mass_states(formulas, header_items), None),
+            ('descriptors', len(formulas), lambda argument: mass_states(formulas, descriptors), None),
+            ('builder', side * side, lambda argument: build_compounds(f'1..{side}+1..{side}', names, formulas), None)]
+
+#cases of the main window, the window is shared and every case leaves a calculated table
+def gui_cases(names, formulas, directory):
+    from PyQt5 import QtWidgets
+    import MassCalculator
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+    if getattr(MassCalculator, 'win', None) is None:
+        MassCalculator.app = app
+        MassCalculator.win = MassCalculator.MainWindow()
+    win = MassCalculator.win
+    csv_path = os.path.join(directory, f'table{len(formulas)}.csv')
+    project_path = os.path.join(directory, f'table{len(formulas)}.mcp')
+
+    def wait():
+        while win.loading is not None or win.calculation is not None:
+            app.processEvents()
+
+    def fill():
+        win.stop_loading()
+        win.stop_calculation()
+        win.model.set_compounds(names, formulas)
+        win.dirty.all_changed()
+
+    def calculate(argument):
+        win.calculate()
+        wait()
+
+    #the library is only calculated again if the table holds something else
+    def calculated():
+        wait()
+        if not win.dirty and win.model.column_texts(1)[:len(formulas)] == formulas and win.model.rowCount() <= len(formulas) + 1:
+            return
+        fill()
+        calculate(None)
+
+    def saved(path):
+        if not os.path.exists(path):
+            calculated()
+            win.write_table(path)
+
+    def open_table(path):
+        win.open_table(path)
+        wait()
+
+    #a change of every formula, undone and done again
+    def edited():
+        calculated()
+        win.model.set_texts(1, range(len(formulas)), formulas[1:] + formulas[:1])
+        win.add_undo('Benchmark')
+
+    def undo_redo(argument):
+        win.undo()
+        win.redo()
+
+    def find(queries):
+        for query in queries:
+            win.model.search_index.search(query)
+
+    queries = ['compound 12', 'm/z 500.1±5ppm', 'formula contains N2P', '/compound 1[0-9]+5$/']
+
+    def indexed():
+        calculated()
+        find(queries)
+        return queries
+
+    def unindexed():
+        calculated()
+        win.model.search_index.reset()
+        return queries
+
+    rows = len(formulas)
+    return [('calculate', rows, calculate, fill),
+            ('save_csv', rows, lambda argument: win.write_table(csv_path), calculated),
+            ('open_csv', rows, lambda argument: open_table(csv_path), lambda: saved(csv_path)),
+            ('save_project', rows, lambda argument: win.write_table(project_path), calculated),
+            ('open_project', rows, lambda argument: open_table(project_path), lambda: saved(project_path)),
+            ('undo_redo', rows, undo_redo, edited),
+            ('find_first', rows, find, unindexed),
+            ('find', rows, find, indexed)]
+
+#start of the program until its window is shown, in a new process like a user starts it
+def startup_case():
+    program = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'MassCalculator.py')
+
+    def start(argument):
+        subprocess.run([sys.executable, program, '--measure-startup'], capture_output=True, check=True)
+
+    return [('startup', 1, start, None)]
+
+def git_version():
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(sizes, repeat=3, seed=0, gui=True, cases=None):
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        #the startup does not depend on the size of a library, it is run once with 0 rows
+        for name, items, function, setup in (startup_case() if gui else []):
+            if cases and name not in cases:
+                continue
+            times = measure(function, repeat, setup)
+            results.append({'case': name, 'rows': 0, 'items': items, 'best': min(times), 'median': median(times), 'times': times})
+            print(f'{name:<18}{0:>9} rows  {min(times):10.4f} s', file=sys.stderr)
+        for size in sizes:
+            names, formulas = compound_library(size, seed)
+            selected = engine_cases(names, formulas) + (gui_cases(names, formulas, directory) if gui else [])
+            for name, items, function, setup in selected:
+                if cases and name not in cases:
+                    continue
+                times = measure(function, repeat, setup)
+                results.append({'case': name, 'rows': size, 'items': items, 'best': min(times), 'median': median(times), 'times': times})
+                print(f'{name:<18}{size:>9} rows  {min(times):10.4f} s  {items / max(min(times), 1e-9):12.0f} items/s', file=sys.stderr)
+    return {'version': git_version(),
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'seed': seed,
+            'repeat': repeat,
+            'results': results}
+
+#best times of two result files side by side, returns the cases that are slower than threshold times the old time
+def compare(old, new, threshold=1.2):
+    old_times = {(result['case'], result['rows']): result['best'] for result in old['results']}
+    slower = []
+    print(f'{"case":<18}{"rows":>9}{old.get("version") or "old":>14}{new.get("version") or "new":>14}{"ratio":>8}')
+    for result in new['results']:
+        key = (result['case'], result['rows'])
+        if key not in old_times:
+            continue
+        ratio = result['best'] / max(old_times[key], 1e-9)
+        print(f'{key[0]:<18}{key[1]:>9}{old_times[key]:14.4f}{result["best"]:14.4f}{ratio:8.2f}' + ('  slower' if ratio > threshold else ''))
+        if ratio > threshold:
+            slower.append(key)
+    return slower
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='benchmark.py', description='Benchmarks of the Exact Mass Calculator')
+    parser.add_argument('--sizes', type=int, nargs='+', default=default_sizes, help='rows of the compound libraries (default 1000 10000 100000 1000000)')
+    parser.add_argument('--repeat', type=int, default=3, help='runs of every case, the best and the median are kept (default 3)')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the compound libraries (default 0)')
+    parser.add_argument('--cases', nargs='+', default=None, help='run only these cases')
+    parser.add_argument('--no-gui', action='store_true', help='leave out the cases of the main window')
+    parser.add_argument('--output', default=None, help='json file to write the results to (default stdout)')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='compare two result files instead of running')
+    parser.add_argument('--threshold', type=float, default=1.2, help='ratio of the best times that counts as slower (default 1.2)')
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0], 'r', encoding = 'utf-8') as old, open(args.compare[1], 'r', encoding = 'utf-8') as new:
+            slower = compare(json.load(old), json.load(new), args.threshold)
+        return 1 if slower else 0
+
+    results = run(args.sizes, args.repeat, args.seed, not args.no_gui, args.cases)
+    if args.output:
+        with open(args.output, 'w', encoding = 'utf-8') as file:
+            json.dump(results, file, indent=1)
+    else:
+        json.dump(results, sys.stdout, indent=1)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
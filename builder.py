@@ -0,0 +1,178 @@
+import re
+from itertools import product
+import numpy as np
+from compound import elements, parse_formula
+from mass_engine import count_matrix
+
+#expressions of the compound builder
+#  1+2*3-4     row 1 plus 3 times row 2 minus row 4, one elimination product is lost per linkage
+#  1..50       every row from 1 to 50, one compound each
+#  3*1..10     row 3 one to ten times
+#  GlcNAc      the first row with this name, 'Name with spaces' in quotes
+#  (1+2)*3     three linked copies of rows 1 and 2
+#every range gives a series, an expression with several ranges gives every combination of them
+
+class ExpressionError(ValueError):
+    def __init__(self, expression, position, message):
+        self.expression = expression
+        self.position = position
+        super().__init__(f'{message} at position {position} of {expression!r}')
+
+token_pattern = re.compile(r'\s*(?:(\d+)\s*\.\.\s*(\d+)|(\d+)|([A-Za-z_][A-Za-z0-9_]*)|\'([^\']*)\'|"([^"]*)"|([-+*()]))')
+
+def tokenize(expression):
+    tokens = []
+    position = 0
+    while expression[position:].strip():
+        match = token_pattern.match(expression, position)
+        if not match:
+            raise ExpressionError(expression, position, 'Unexpected character')
+        start = match.start(match.lastindex)
+        if match[1]:
+            tokens.append(('range', (int(match[1]), int(match[2])), start))
+        elif match[3]:
+            tokens.append(('range', (int(match[3]), int(match[3])), start))
+        elif match[7]:
+            tokens.append((match[7], None, start))
+        else:
+            tokens.append(('name', match[4] or match[5] or match[6] or '', start))
+        position = match.end()
+    tokens.append(('end', None, len(expression)))
+    return tokens
+
+#compile an expression to a tree of tuples, ranges are (first, last) and rows are numbered from 1 like in the table
+#  ('rows', first, last)  ('named', name)  ('add', left, right)  ('sub', left, right)  ('mul', operand, first, last)  ('group', operand)
+def compile_expression(expression):
+    tokens = tokenize(expression)
+    position = 0
+
+    def peek():
+        return tokens[position][0]
+
+    def take(kind):
+        nonlocal position
+        token = tokens[position]
+        if token[0] != kind:
+            raise ExpressionError(expression, token[2], f'Expected {kind}')
+        position += 1
+        return token
+
+    def parse_sum():
+        node = parse_product()
+        while peek() in ('+', '-'):
+            operator = take(peek())[0]
+            node = ('add' if operator == '+' else 'sub', node, parse_product())
+        return node
+
+    def parse_product():
+        node = parse_operand()
+        while peek() == '*':
+            take('*')
+            token = take('range')
+            first, last = token[1]
+            if min(first, last) < 1:
+                raise ExpressionError(expression, token[2], 'Counts start at 1')
+            node = ('mul', node, first, last)
+        return node
+
+    def parse_operand():
+        if peek() == '(':
+            take('(')
+            node = parse_sum()
+            take(')')
+            return ('group', node)
+        if peek() == 'name':
+            return ('named', take('name')[1])
+        token = take('range')
+        first, last = token[1]
+        if min(first, last) < 1:
+            raise ExpressionError(expression, token[2], 'Rows start at 1')
+        return ('rows', first, last)
+
+    tree = parse_sum()
+    take('end')
+    return tree
+
+def span(first, last):
+    return range(first, last + 1) if first <= last else range(first, last - 1, -1)
+
+#row numbers (from 0) of all rows and names in a tree, names are looked up in the name column
+def referenced_rows(tree, names):
+    rows = set()
+    kind = tree[0]
+    if kind == 'rows':
+        rows.update(row - 1 for row in span(tree[1], tree[2]))
+    elif kind == 'named':
+        if tree[1] not in names:
+            raise ValueError(f'No row is named {tree[1]!r}')
+        rows.add(names.index(tree[1]))
+    elif kind in ('add', 'sub'):
+        rows |= referenced_rows(tree[1], names) | referenced_rows(tree[2], names)
+    else:
+        rows |= referenced_rows(tree[1], names)
+    return rows
+
+#evaluate a tree for every combination of its ranges at once
+#returns the raw sum of the blocks (combinations x elements), the net number of units and the names of the combinations
+#the composition of a combination is the raw sum minus (units - 1) elimination products
+def evaluate(tree, blocks, names):
+    kind = tree[0]
+    if kind == 'rows':
+        rows = [row - 1 for row in span(tree[1], tree[2])]
+        return blocks[rows], np.ones(len(rows), dtype=np.int64), ['(' + names[row] + ')' for row in rows]
+    if kind == 'named':
+        row = names.index(tree[1])
+        return blocks[[row]], np.ones(1, dtype=np.int64), ['(' + names[row] + ')']
+    if kind == 'group':
+        raw, units, texts = evaluate(tree[1], blocks, names)
+        if tree[1][0] in ('add', 'sub'):
+            texts = ['(' + text + ')' for text in texts]
+        return raw, units, texts
+    if kind == 'mul':
+        raw, units, texts = evaluate(tree[1], blocks, names)
+        counts = np.array(span(tree[2], tree[3]), dtype=np.int64)
+        return ((raw[:, None, :] * counts[None, :, None]).reshape(-1, raw.shape[1]),
+                (units[:, None] * counts[None, :]).ravel(),
+                [(str(count) if count != 1 else '') + text for text, count in product(texts, counts.tolist())])
+    left = evaluate(tree[1], blocks, names)
+    right = evaluate(tree[2], blocks, names)
+    sign, operator = (1, '+') if kind == 'add' else (-1, '-')
+    return ((left[0][:, None, :] + sign * right[0][None, :, :]).reshape(-1, left[0].shape[1]),
+            (left[1][:, None] + sign * right[1][None, :]).ravel(),
+            [a + operator + b for a, b in product(left[2], right[2])])
+
+#number of combinations of a tree without evaluating it
+def combinations(tree):
+    kind = tree[0]
+    if kind == 'rows':
+        return len(span(tree[1], tree[2]))
+    if kind == 'named':
+        return 1
+    if kind == 'group':
+        return combinations(tree[1])
+    if kind == 'mul':
+        return combinations(tree[1]) * len(span(tree[2], tree[3]))
+    return combinations(tree[1]) * combinations(tree[2])
+
+#build all compounds of an expression from the name and formula columns of a table
+#returns the names, element counts of the possible compounds and the number of combinations that were left out
+#a combination is left out if an elimination or subtraction would need more atoms than there are
+def build_compounds(expression, names, formulas, elimination='H2O', limit=1000000):
+    tree = compile_expression(expression) if isinstance(expression, str) else expression
+    if combinations(tree) > limit:
+        raise ValueError(f'The expression has more than {limit} combinations')
+    rows = sorted(referenced_rows(tree, names))
+    for row in rows:
+        if row >= len(formulas):
+            raise ValueError(f'Row {row + 1} is not in the table')
+    counts, valid = count_matrix([formulas[row] for row in rows])
+    for row, ok in zip(rows, valid):
+        if not ok or formulas[row] == '':
+            raise ValueError(f'Row {row + 1} has no valid formula')
+    blocks = np.zeros((max(rows) + 1, len(elements)), dtype=np.int64)
+    blocks[rows] = counts
+    raw, units, texts = evaluate(tree, blocks, names)
+    loss = parse_formula(elimination or '').counts.astype(np.int64)
+    compositions = raw - (units - 1)[:, None] * loss
+    possible = (compositions >= 0).all(axis=1) & compositions.any(axis=1)
+    return [text for text, ok in zip(texts, possible) if ok], compositions[possible], int((~possible).sum())
@@ -0,0 +1,53 @@
+import threading
+from PyQt5 import QtCore
+from parallel import map_chunks, states_chunk, chunked, default_chunk_size
+
+#calculates masses on a worker thread and sends the results back in batches of rows
+#with more than one worker the batches are calculated by a process pool and still arrive in row order
+#a job is (rows, formulas, columns, ion definitions), the table itself is never touched here
+class CalculationThread(QtCore.QThread):
+    #(rows, formulas, columns, result of mass_states)
+    batchReady = QtCore.pyqtSignal(object)
+    #percent of all rows, at most once per percent
+    progress = QtCore.pyqtSignal(int)
+    #a worker failed, e.g. a process of the pool was killed, the jobs are not complete
+    failed = QtCore.pyqtSignal(str)
+
+    def __init__(self, jobs, chunk_size=default_chunk_size, workers=None, parent=None):
+        super(CalculationThread, self).__init__(parent)
+        self.jobs = jobs
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.cancelled = threading.Event()
+        #True once every job is calculated
+        self.complete = False
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def run(self):
+        try:
+            self.run_jobs()
+        except Exception as error:
+            self.failed.emit(str(error) or type(error).__name__)
+
+    def run_jobs(self):
+        total = sum(len(rows) for rows, formulas, columns, ions in self.jobs)
+        done = 0
+        percent = -1
+        for rows, formulas, columns, ions in self.jobs:
+            #a process pool only pays off for more than one chunk
+            workers = self.workers if len(rows) > self.chunk_size else 1
+            results = map_chunks(states_chunk, chunked(formulas, self.chunk_size), (ions,), workers)
+            for k, result in enumerate(results):
+                if self.cancelled.is_set():
+                    results.close()
+                    return
+                start = k * self.chunk_size
+                batch_rows = rows[start:start + self.chunk_size]
+                self.batchReady.emit((batch_rows, formulas[start:start + self.chunk_size], columns, result))
+                done += len(batch_rows)
+                if done * 100 // total != percent:
+                    percent = done * 100 // total
+                    self.progress.emit(percent)
+        self.complete = True
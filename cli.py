@@ -0,0 +1,109 @@
+import argparse
+import csv
+import sys
+from itertools import islice
+from time import perf_counter
+from parallel import map_chunks, table_chunk, chunked, default_chunk_size
+from table_csv import read_table, header_row
+from isotopes import table_patterns, pattern_rows
+from server import serve, default_port
+from peak_lists import annotate_file
+from mz_lookup import parse_tolerance
+
+#calculate all mass columns of a csv table without starting the GUI
+#chunks of rows are calculated by a pool of worker processes and written in their original order
+def batch(input_path, output_path, round_by=4, chunk_size=default_chunk_size, workers=None):
+    t0 = perf_counter()
+    row_count = 0
+    with open(input_path, 'r', encoding = 'utf-8') as infile, open(output_path, 'w', newline = '', encoding = 'utf-8') as outfile:
+        header_items, reader = read_table(infile)
+        writer = csv.writer(outfile, delimiter = ',')
+        writer.writerow(header_row(header_items))
+        columns = [j for j in range(2, len(header_items)) if header_items[j].rt == 'no']
+        ion_definitions = [header_items[j] for j in columns]
+        context = (ion_definitions, columns, len(header_items), round_by)
+        for count, text in map_chunks(table_chunk, chunked(reader, chunk_size), context, workers):
+            outfile.write(text)
+            row_count += count
+    return row_count, perf_counter() - t0
+
+#write the isotope pattern of every row and ion column, one peak per line
+def isotopes(input_path, output_path, mode='aggregated', threshold=1e-4, round_by=4, chunk_size=10000):
+    t0 = perf_counter()
+    row_count = 0
+    with open(input_path, 'r', encoding = 'utf-8') as infile, open(output_path, 'w', newline = '', encoding = 'utf-8') as outfile:
+        header_items, reader = read_table(infile)
+        writer = csv.writer(outfile, delimiter = ',')
+        writer.writerow(['name', 'compound', 'ion', 'peak', 'm/z', 'intensity'])
+        ion_definitions = [header for header in header_items[2:] if header.rt == 'no' and not header.descriptor]
+        while True:
+            rows = [row + [''] * (2 - len(row)) for row in islice(reader, chunk_size)]
+            if not rows:
+                break
+            names = [row[0] for row in rows]
+            formulas = [row[1] for row in rows]
+            patterns = table_patterns(formulas, ion_definitions, mode, threshold)
+            writer.writerows(pattern_rows(names, formulas, ion_definitions, patterns, round_by))
+            row_count += len(rows)
+    return row_count, perf_counter() - t0
+
+#annotate the peaks of an mzML, MGF or csv file with the ions of a csv table
+def annotate(table_path, peak_path, output_path, tolerance='5 ppm', all_peaks=False, round_by=4):
+    with open(table_path, 'r', encoding = 'utf-8') as infile:
+        header_items, reader = read_table(infile)
+        rows = [row + [''] * (2 - len(row)) for row in reader]
+    ion_definitions = [header for header in header_items[2:] if header.rt == 'no']
+    ppm, mda = parse_tolerance(tolerance)
+    return annotate_file(peak_path, output_path, [row[0] for row in rows], [row[1] for row in rows], ion_definitions, ppm, mda, all_peaks, round_by)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='cli.py', description='Exact Mass Calculator without GUI')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    batch_parser = commands.add_parser('batch', help='calculate the masses of a csv table')
+    batch_parser.add_argument('input', help='csv file in the format of the Mass Calculator')
+    batch_parser.add_argument('output', help='csv file to write the calculated table to')
+    batch_parser.add_argument('--precision', type=int, default=4, help='number of decimals (default 4)')
+    batch_parser.add_argument('--chunk-size', type=int, default=default_chunk_size, help=f'rows calculated at once (default {default_chunk_size})')
+    batch_parser.add_argument('--workers', type=int, default=None, help='worker processes (default one per core)')
+
+    isotopes_parser = commands.add_parser('isotopes', help='calculate the isotope patterns of a csv table')
+    isotopes_parser.add_argument('input', help='csv file in the format of the Mass Calculator')
+    isotopes_parser.add_argument('output', help='csv file to write one peak per line to')
+    isotopes_parser.add_argument('--mode', choices=['aggregated', 'fine'], default='aggregated', help='one peak per nominal mass or the fine structure (default aggregated)')
+    isotopes_parser.add_argument('--threshold', type=float, default=1e-4, help='smallest peak relative to the highest peak (default 1e-4)')
+    isotopes_parser.add_argument('--precision', type=int, default=4, help='number of decimals (default 4)')
+    isotopes_parser.add_argument('--chunk-size', type=int, default=10000, help='rows calculated at once (default 10000)')
+
+    annotate_parser = commands.add_parser('annotate', help='annotate the peaks of an mzML, MGF or csv file with the ions of a table')
+    annotate_parser.add_argument('table', help='csv file in the format of the Mass Calculator')
+    annotate_parser.add_argument('peaks', help='peak list, .mzML, .mgf or csv with m/z and intensity columns')
+    annotate_parser.add_argument('output', help='csv file to write one line per peak and matching ion to')
+    annotate_parser.add_argument('--tolerance', default='5 ppm', help='tolerance like 5 ppm or 2 mDa (default 5 ppm)')
+    annotate_parser.add_argument('--all-peaks', action='store_true', help='also write the peaks without a match')
+    annotate_parser.add_argument('--precision', type=int, default=4, help='number of decimals (default 4)')
+
+    serve_parser = commands.add_parser('serve', help='answer json requests for masses, tables and m/z lookups on localhost')
+    serve_parser.add_argument('--host', default='127.0.0.1', help='127.0.0.1, localhost or ::1 (default 127.0.0.1)')
+    serve_parser.add_argument('--port', type=int, default=default_port, help=f'port (default {default_port})')
+    serve_parser.add_argument('--chunk-size', type=int, default=default_chunk_size, help=f'formulas calculated at once (default {default_chunk_size})')
+    serve_parser.add_argument('--workers', type=int, default=None, help='worker processes (default one per core)')
+    serve_parser.add_argument('--verbose', action='store_true', help='log every request')
+
+    args = parser.parse_args(argv)
+    if args.command == 'serve':
+        print(f'Serving on http://{args.host}:{args.port}', file=sys.stderr)
+        serve(args.host, args.port, args.workers, args.chunk_size, args.verbose)
+        return
+    if args.command == 'batch':
+        row_count, seconds = batch(args.input, args.output, args.precision, args.chunk_size, args.workers)
+    elif args.command == 'isotopes':
+        row_count, seconds = isotopes(args.input, args.output, args.mode, args.threshold, args.precision, args.chunk_size)
+    elif args.command == 'annotate':
+        peak_count, row_count, seconds = annotate(args.table, args.peaks, args.output, args.tolerance, args.all_peaks, args.precision)
+        print(f'{peak_count} peaks, {row_count} annotations in {seconds:.2f} s ({peak_count / max(seconds, 1e-9):.0f} peaks/s)', file=sys.stderr)
+        return
+    print(f'{row_count} rows in {seconds:.2f} s ({row_count / max(seconds, 1e-9):.0f} rows/s)', file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
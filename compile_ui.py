@@ -0,0 +1,45 @@
+import io
+import os
+import re
+import sys
+import zlib
+from PyQt5 import uic
+
+#compile the .ui files of view/ into ui_forms.py, so the program starts without parsing them
+#  python compile_ui.py
+#every form is a class Ui_<file name>, like Ui_main for view/main.ui
+#the checksum of every .ui file is kept, a form that was changed after compiling is loaded from its .ui file again
+view_directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'view')
+output_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ui_forms.py')
+
+#checksum of a .ui file, the same with windows and unix line endings
+def ui_checksum(file_name):
+    with open(file_name, 'rb') as file:
+        return zlib.crc32(file.read().replace(b'\r\n', b'\n'))
+
+#python code of the class of one form
+def compile_form(file_name, name):
+    code = io.StringIO()
+    uic.compileUi(file_name, code)
+    code = code.getvalue()
+    #the header and the imports are written once for all forms
+    code = code[code.index('\nclass ') + 1:]
+    return re.sub(r'^class Ui_\w+\(object\):', f'class Ui_{name}(object):', code, count=1).rstrip() + '\n'
+
+def compile_view(directory=view_directory, output=output_file):
+    forms = sorted(file_name[:-3] for file_name in os.listdir(directory) if file_name.endswith('.ui'))
+    parts = ['#generated by compile_ui.py from the .ui files of view/, do not edit\n',
+             '#run python compile_ui.py again after a .ui file was changed\n',
+             'from PyQt5 import QtCore, QtGui, QtWidgets\n\n',
+             'ui_checksums = {\n']
+    parts += [f"    '{name}': {ui_checksum(os.path.join(directory, name + '.ui'))},\n" for name in forms]
+    parts.append('}\n')
+    for name in forms:
+        parts.append('\n\n' + compile_form(os.path.join(directory, name + '.ui'), name))
+    with open(output, 'w', encoding = 'utf-8', newline = '\r\n') as file:
+        file.write(''.join(parts))
+    return forms
+
+if __name__ == '__main__':
+    forms = compile_view()
+    print(f'{len(forms)} forms written to {output_file}', file=sys.stderr)
@@ -1,5 +1,7 @@
 import re
 from decimal import Decimal
+from functools import lru_cache
+import numpy as np
 
 exact_masses = {'He': 4.002603,
                 'Li': 7.016005,
@@ -27,21 +29,107 @@ exact_masses = {'He': 4.002603,
                 'Ca': 39.962591}
 
 
+#element order of composition vectors is the order of exact_masses
+elements = list(exact_masses.keys())
+element_index = {element: i for i, element in enumerate(elements)}
+
+#formulas are rendered in Hill order, carbon and hydrogen first if there is carbon
+carbon = element_index['C']
+hill_order = [element_index[e] for e in sorted(elements)]
+hill_order_carbon = [carbon, element_index['H']] + [i for i in hill_order if elements[i] not in ('C', 'H')]
+
+#one element symbol with optional count
+element_pattern = re.compile(r'([A-Z][a-z]?)([0-9]*)')
+
+class FormulaError(ValueError):
+    def __init__(self, formula, position):
+        self.formula = formula
+        self.position = position
+        super().__init__(f'Invalid formula {formula!r} at position {position}')
+
+#immutable element counts as a fixed length vector indexed like exact_masses
+#the formula string is only rendered when it is needed
+class Composition():
+    __slots__ = ('counts', '_formula')
+
+    def __init__(self, counts, formula=None):
+        counts.flags.writeable = False
+        self.counts = counts
+        self._formula = formula
+
+    @property
+    def formula(self):
+        if self._formula is None:
+            counts = self.counts.tolist()
+            order = hill_order_carbon if counts[carbon] else hill_order
+            self._formula = ''.join(elements[i] + (str(counts[i]) if counts[i] != 1 else '') for i in order if counts[i])
+        return self._formula
+
+    def __add__(self, other):
+        return Composition(self.counts + other.counts)
+
+    def __sub__(self, other):
+        return Composition(self.counts - other.counts)
+
+    def __mul__(self, factor):
+        return Composition(self.counts * factor)
+
+    __rmul__ = __mul__
+
+    def __eq__(self, other):
+        return isinstance(other, Composition) and np.array_equal(self.counts, other.counts)
+
+    def __hash__(self):
+        return hash(self.counts.tobytes())
+
+    def __getitem__(self, element):
+        return int(self.counts[element_index[element]])
+
+    def __contains__(self, element):
+        return element in element_index and self.counts[element_index[element]] > 0
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return int(np.count_nonzero(self.counts))
+
+    def keys(self):
+        order = hill_order_carbon if self.counts[carbon] else hill_order
+        return [elements[i] for i in order if self.counts[i]]
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def __repr__(self):
+        return f'Composition({self.formula!r})'
+
+#formulas of many count rows like Composition.formula writes them, only the elements that occur are looked at
+def count_formulas(counts):
+    present = set(np.flatnonzero(np.asarray(counts).any(axis=0)).tolist())
+    order_carbon = [i for i in hill_order_carbon if i in present]
+    order = [i for i in hill_order if i in present]
+    return [''.join(elements[i] + (str(row[i]) if row[i] != 1 else '') for i in (order_carbon if row[carbon] else order) if row[i]) for row in np.asarray(counts).tolist()]
+
+#parse a formula in one pass, the composition is immutable so repeated formulas can share it
+#cache hits and misses are available with parse_formula.cache_info()
+@lru_cache(maxsize=65536)
+def parse_formula(formula):
+    counts = np.zeros(len(elements), dtype=np.int32)
+    position = 0
+    while position < len(formula):
+        match = element_pattern.match(formula, position)
+        if not match or match[1] not in exact_masses:
+            raise FormulaError(formula, position)
+        counts[element_index[match[1]]] += int(match[2]) if match[2] != '' else 1
+        position = match.end()
+    return Composition(counts, formula)
+
 def get_element_dict(formula):
-    elements = {}
-    matches = re.findall(r'[A-Z][a-z]?[0-9]*', formula)
-    if len("".join(matches)) != len(formula):
+    try:
+        return dict(parse_formula(formula).items())
+    except FormulaError:
         return 'invalid formula'
-    for m in matches:
-        result = re.search(r'(\D+)(\d*)', m)
-        if result[1] not in exact_masses:
-            return 'invalid formula'
-        if result[1] in elements:
-            elements[result[1]] += int(result[2]) if result[2] != '' else 1
-        else:
-            elements[result[1]] = int(result[2]) if result[2] != '' else 1
-        
-    return elements
 
 def get_formula_from_dict(elements):
     formula = ''
@@ -52,63 +140,84 @@ def get_formula_from_dict(elements):
             formula += key + str(value)
     return formula
 
+#the ion of Compound.calc_mass as (lost (element index, count) pairs, mass offset, divisor, multiplier), None if it can not be read
+@lru_cache(maxsize=1024)
+def compound_ion(adduct, charge):
+    ion = mass_engine.compiled_ion('', '', adduct, charge)
+    if ion is None:
+        return None
+    delta, offset, charge, multiplier = ion
+    return tuple((i, -int(delta[i])) for i in np.flatnonzero(delta < 0).tolist()), offset, abs(charge) or 1, multiplier
+
 class Compound():
+    __slots__ = ('composition', '_formula', 'name', 'charge', 'adduct')
+
     def __init__(self, formula, name = None, charge = 0, adduct = None):
         self.formula = formula
-        self.elements = get_element_dict(formula)
         self.name = name
         self.charge = charge
         self.adduct = adduct
 
+    @classmethod
+    def from_composition(cls, composition, name = None, charge = 0, adduct = None):
+        compound = cls.__new__(cls)
+        compound.composition = composition
+        compound._formula = None
+        compound.name = name
+        compound.charge = charge
+        compound.adduct = adduct
+        return compound
+
+    #an invalid formula keeps its text and has no composition
+    @property
+    def formula(self):
+        if self.composition is None:
+            return self._formula
+        return self.composition.formula
+
+    @formula.setter
+    def formula(self, formula):
+        try:
+            self.composition = parse_formula(formula)
+            self._formula = None
+        except FormulaError:
+            self.composition = None
+            self._formula = formula
+
+    @property
+    def elements(self):
+        if self.composition is None:
+            return 'invalid formula'
+        return dict(self.composition.items())
+
+    #m/z of the compound with its charge and adduct, calculated like a table column, the adduct can also be an ion like [2M+H]+
+    #the scalar path of mass_matrix: the ion is compiled once per adduct and charge, the rest is integer math on the counts
     def calc_mass(self, round_by=4):
-        mass = Decimal('0')
-        if self.charge < 0 and 'H' not in self.elements:
-            raise Exception(f'Can not measure mass in negative mode if no H in formula!', AttributeError)
-        for key, value in self.elements.items():
-            mass += Decimal(str(exact_masses[key])) * value
-        if self.charge != 0:
-            mass -= Decimal('0.000549') * self.charge
-        if self.charge == 1:
-            if self.adduct != '':
-                mass = mass + Decimal(str(exact_masses[self.adduct]))
-            else:
-                mass = mass + Decimal(str(exact_masses['H']))
-        elif self.charge > 1:
-            if self.adduct != '':
-                mass = (mass+self.charge*Decimal(str(exact_masses[self.adduct])))/self.charge
-            else:
-                mass = (mass+self.charge*Decimal(str(exact_masses['H'])))/self.charge
-        elif self.charge == -1:
-            print(mass)
-            mass = mass - Decimal(str(exact_masses['H']))
-            print(mass)
-        elif self.charge < -1:
-            mass = (mass+self.charge*Decimal(str(exact_masses['H'])))/(self.charge* -1)
-        return round(mass, round_by)
+        if self.composition is None:
+            raise ValueError(f'Invalid formula {self._formula!r}')
+        ion = compound_ion(self.adduct or '', str(self.charge))
+        counts = self.composition.counts
+        if ion is None or any(counts[i] * ion[3] < lost for i, lost in ion[0]):
+            raise ValueError(f'Can not calculate the mass of {self.formula} with charge {self.charge} and adduct {self.adduct!r}')
+        lost, offset, divisor, multiplier = ion
+        numerator = int(counts @ mass_engine.element_masses) * multiplier + offset
+        return Decimal(mass_engine.mass_text(numerator, divisor, round_by))
     
     def add_elements(self, add):
-        to_add = get_element_dict(add)
-        for key, value in to_add.items():
-            if key in self.elements.keys():
-                self.elements[key] += value
-            else:
-                self.elements[key] = value
-        self.formula = get_formula_from_dict(self.elements)
+        self.composition = self.composition + parse_formula(add)
         return self
 
     def del_elements(self, delete):
-        to_delete = get_element_dict(delete)
+        return self.del_composition(parse_formula(delete))
+
+    def del_composition(self, to_delete):
         for key, value in to_delete.items():
-            if key not in self.elements.keys():
+            if key not in self.composition:
                 return f'Can not delete, {key} not in formula!'
-            elif value > self.elements[key]:
+            elif value > self.composition[key]:
                 raise Exception(f'Can not delete, less of {value} {key} in {self.formula}!', ValueError)
                 #return f'Can not delete, less of {value} {key} in {self.formula}!'
-        for key, value in to_delete.items():
-            self.elements[key] -= value
-            if self.elements[key] == 0:
-                del self.elements[key]
-        self.formula = get_formula_from_dict(self.elements)
+        self.composition = self.composition - to_delete
         return self
     
     def change_name(self, name):
@@ -121,35 +230,29 @@ class Compound():
         for char in self.formula:
             if not char.isalnum():
                 return False
-        for key in self.elements.keys():
-            try:
-                check = exact_masses[key]
-            except KeyError:
-                return False
-        return True
+        return self.composition is not None
             
     def copy(self):
-        return Compound(self.formula, self.name)
+        return Compound.from_composition(self.composition, self.name)
     
     def add_compound(self, compound, elimination = 'H2O', name='New Added Compound'):
-        new_compound = self.copy()
-        new_compound.name = name
-        new_compound.add_elements(compound.formula)
+        new_compound = Compound.from_composition(self.composition + compound.composition, name)
         new_compound.del_elements(elimination)
         return new_compound
     
     def del_compound(self, compound, elimination = 'H2O', name='New Added Compound'):
         new_compound = self.copy()
         new_compound.name = name
-        new_compound.del_elements(compound.formula)
+        new_compound.del_composition(compound.composition)
         new_compound.add_elements(elimination)
         return new_compound
     
     def multiply(self, multiply, name='New Multiplied Compound', elimination = 'H2O'):
-        new_compound = self.copy()
-        new_compound.name = name
-        new_formula = self.formula * multiply
-        new_compound.elements = get_element_dict(new_formula)
-        new_compound.formula = get_formula_from_dict(new_compound.elements)
-        new_compound.del_elements(elimination*(multiply-1))
-        return new_compound
\ No newline at end of file
+        new_compound = Compound.from_composition(self.composition * multiply, name)
+        if multiply > 1:
+            new_compound.del_composition(parse_formula(elimination) * (multiply-1))
+        return new_compound
+
+
+#the mass engine is built on this module, it is imported once everything it takes from here is defined
+import mass_engine
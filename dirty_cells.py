@@ -0,0 +1,61 @@
+#keeps track of the mass cells that need a new calculation
+#a mass cell depends on the formula of its row and on the header item of its column
+class DirtyCells():
+    def __init__(self):
+        self.rows = set()
+        self.headers = []
+        self.everything = False
+
+    #every ion column of the row has to be calculated
+    def formula_changed(self, row):
+        self.rows.add(row)
+
+    def formulas_changed(self, rows):
+        self.rows.update(int(row) for row in rows)
+
+    #every row of the column has to be calculated
+    def header_changed(self, header):
+        if not self.is_header_changed(header):
+            self.headers.append(header)
+
+    #mass precision or similar settings changed
+    def all_changed(self):
+        self.everything = True
+
+    #keep row numbers valid when rows are inserted or removed
+    def rows_inserted(self, row, count=1):
+        self.rows = set(r + count if r >= row else r for r in self.rows)
+
+    def row_removed(self, row):
+        self.rows_removed(row)
+
+    def rows_removed(self, row, count=1):
+        self.rows = set(r - count if r >= row + count else r for r in self.rows if not row <= r < row + count)
+
+    def changed_rows(self, row_count):
+        if self.everything:
+            return list(range(row_count))
+        return sorted(r for r in self.rows if r < row_count)
+
+    def is_header_changed(self, header):
+        return any(h is header for h in self.headers)
+
+    def clear(self):
+        self.rows = set()
+        self.headers = []
+        self.everything = False
+
+    def __bool__(self):
+        return self.everything or bool(self.rows) or bool(self.headers)
+
+    #turn all_changed into single rows, so rows can be removed as they are calculated
+    def expand(self, row_count):
+        if self.everything:
+            self.rows = set(range(row_count))
+            self.everything = False
+
+    def rows_calculated(self, rows):
+        self.rows.difference_update(rows)
+
+    def headers_calculated(self, headers):
+        self.headers = [h for h in self.headers if not any(h is header for header in headers)]
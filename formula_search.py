@@ -0,0 +1,170 @@
+import heapq
+import os
+import re
+from collections import namedtuple
+import numpy as np
+from compound import exact_masses, elements, element_index, Composition
+from mass_engine import compile_ion, mass_matrix, element_valences, SCALE
+from table_csv import HeaderItem
+from parallel import process_context
+
+default_limits = {'C': (0, 50), 'H': (0, 100), 'N': (0, 10), 'O': (0, 20), 'P': (0, 3), 'S': (0, 3)}
+
+Candidate = namedtuple('Candidate', ['formula', 'mz', 'ppm', 'rdbe'])
+
+#element limits text like 'C0-50 H0-100 N0-10', a single number is the upper limit
+def parse_limits(text):
+    limits = {}
+    for token in text.replace(',', ' ').split():
+        match = re.fullmatch(r'([A-Z][a-z]?)(?:([0-9]+)-)?([0-9]+)', token)
+        if not match or match[1] not in exact_masses or int(match[2] or 0) > int(match[3]):
+            raise ValueError(f'Invalid element limit {token!r}')
+        limits[match[1]] = (int(match[2] or 0), int(match[3]))
+    return limits
+
+def rdbe_values(counts):
+    return 1 + (counts @ (element_valences - 2)) / 2
+
+#all count combinations of the elements with a mass between low and high
+#elements are sorted heaviest first, the last two are solved as vectors for each prefix
+def enumerate_counts(masses, lower, upper, low, high):
+    k = len(masses)
+    rest_min = np.append(np.cumsum((lower * masses)[::-1])[::-1], 0)
+    rest_max = np.append(np.cumsum((upper * masses)[::-1])[::-1], 0)
+    found = []
+    prefix = np.zeros(k, dtype=np.int64)
+
+    def count_range(i, mass):
+        first = max(lower[i], int(np.ceil((low - mass - rest_max[i+1]) / masses[i])))
+        last = min(upper[i], int(np.floor((high - mass - rest_min[i+1]) / masses[i])))
+        return first, last
+
+    def recurse(i, mass):
+        if i == k - 1:
+            first, last = count_range(i, mass)
+            for n in range(first, last + 1):
+                row = prefix.copy()
+                row[i] = n
+                found.append(row[None, :])
+            return
+        if i == k - 2:
+            first, last = count_range(i, mass)
+            if first > last:
+                return
+            n1 = np.arange(first, last + 1)
+            rest = mass + n1 * masses[i]
+            first2 = np.maximum(lower[i+1], np.ceil((low - rest) / masses[i+1])).astype(np.int64)
+            last2 = np.minimum(upper[i+1], np.floor((high - rest) / masses[i+1])).astype(np.int64)
+            number = np.maximum(last2 - first2 + 1, 0)
+            if not number.any():
+                return
+            n1 = np.repeat(n1, number)
+            n2 = np.repeat(first2, number) + np.arange(number.sum()) - np.repeat(np.cumsum(number) - number, number)
+            rows = np.repeat(prefix[None, :], len(n1), axis=0)
+            rows[:, i] = n1
+            rows[:, i+1] = n2
+            found.append(rows)
+            return
+        first, last = count_range(i, mass)
+        for n in range(first, last + 1):
+            prefix[i] = n
+            recurse(i + 1, mass + n * masses[i])
+        prefix[i] = 0
+
+    recurse(0, 0.0)
+    return np.concatenate(found) if found else np.zeros((0, k), dtype=np.int64)
+
+#search one part of the space, the count range of the heaviest element is split between workers
+#returns a full count matrix and exact m/z values sorted by absolute error
+def search_chunk(order, lower, upper, low, high, observed, tolerance, ion, filters):
+    masses = np.array([exact_masses[elements[i]] for i in order])
+    found = enumerate_counts(masses, lower, upper, low, high)
+    counts = np.zeros((len(found), len(elements)), dtype=np.int64)
+    counts[:, order] = found
+
+    #chemical plausibility
+    keep = np.ones(len(counts), dtype=bool)
+    rdbe = rdbe_values(counts)
+    if filters['rdbe'] is not None:
+        keep &= (rdbe >= filters['rdbe'][0]) & (rdbe <= filters['rdbe'][1])
+    if filters['integer_rdbe']:
+        keep &= rdbe == np.floor(rdbe)
+    carbon = counts[:, element_index['C']]
+    for element, limits in filters['ratios'].items():
+        if limits is not None:
+            ratio = counts[:, element_index[element]] / np.maximum(carbon, 1)
+            keep &= (carbon == 0) | ((ratio >= limits[0]) & (ratio <= limits[1]))
+    counts = counts[keep]
+    rdbe = rdbe[keep]
+
+    numerators, divisors, ok, na = mass_matrix(counts, [ion])
+    mz = numerators[:, 0] / (divisors[0] * SCALE)
+    keep = ok[:, 0] & (np.abs(observed - mz) <= tolerance)
+    ppm = (observed - mz[keep]) / mz[keep] * 1e6
+    order = np.argsort(np.abs(ppm), kind='stable')
+    return counts[keep][order], mz[keep][order], ppm[order], rdbe[keep][order]
+
+def chunk_candidates(result):
+    counts, mz, ppm, rdbe = result
+    for i in range(len(counts)):
+        yield Candidate(Composition(counts[i].astype(np.int32)).formula, float(mz[i]), float(ppm[i]), float(rdbe[i]))
+
+#find all formulas that fit an observed m/z within ppm or mDa for an ion definition
+#the search is bounded by the element limits and split across a process pool
+#candidates are yielded lazily, sorted by absolute ppm error
+#without limits the default limits are used, empty limits are an error
+def search_formulas(observed, ion=None, ppm=None, mda=None, limits=None, rdbe=(0, 50), integer_rdbe=True,
+                    h_c=(0.2, 3.1), n_c=(0, 1.3), o_c=(0, 1.2), workers=None, chunks=None):
+    ion = ion or HeaderItem('neutral', charge = 0)
+    if limits is None:
+        limits = default_limits
+    if not limits:
+        raise ValueError('At least one element is needed')
+    for element, (minimum, maximum) in limits.items():
+        if element not in element_index or minimum > maximum:
+            raise ValueError(f'Invalid element limit {element}{minimum}-{maximum}')
+    if ppm is not None:
+        tolerance = observed * ppm * 1e-6
+    elif mda is not None:
+        tolerance = mda * 1e-3
+    else:
+        raise ValueError('A tolerance in ppm or mDa is needed')
+    compiled = compile_ion(ion)
+    if compiled is None:
+        raise ValueError(f'Invalid ion definition {ion.name!r}')
+    delta, offset, charge, multiplier = compiled
+
+    #neutral formula mass window from the m/z window
+    divisor = abs(charge) if charge != 0 else 1
+    low = ((observed - tolerance) * divisor - offset / SCALE) / multiplier - 1e-6
+    high = ((observed + tolerance) * divisor - offset / SCALE) / multiplier + 1e-6
+
+    #a formula needs at least the atoms the ion loses
+    order = sorted((element_index[e] for e in limits), key=lambda i: -exact_masses[elements[i]])
+    lower = np.array([max(limits[elements[i]][0], -(delta[i] // multiplier)) for i in order], dtype=np.int64)
+    upper = np.array([limits[elements[i]][1] for i in order], dtype=np.int64)
+    filters = {'rdbe': rdbe, 'integer_rdbe': integer_rdbe, 'ratios': {'H': h_c, 'N': n_c, 'O': o_c}}
+    #the ion loses more atoms than the limits allow
+    if (lower > upper).any():
+        return iter(())
+
+    #split the count range of the heaviest element into chunks
+    workers = workers or os.cpu_count() or 1
+    chunks = chunks or workers * 4
+    values = np.arange(lower[0], upper[0] + 1)
+    parts = []
+    for part in np.array_split(values, min(chunks, len(values))):
+        if len(part):
+            part_lower = lower.copy()
+            part_upper = upper.copy()
+            part_lower[0] = part[0]
+            part_upper[0] = part[-1]
+            parts.append((order, part_lower, part_upper, low, high, observed, tolerance, ion, filters))
+
+    if workers <= 1:
+        results = [search_chunk(*part) for part in parts]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers, mp_context=process_context()) as executor:
+            results = list(executor.map(search_chunk, *zip(*parts)))
+    return heapq.merge(*(chunk_candidates(result) for result in results), key=lambda candidate: abs(candidate.ppm))
@@ -0,0 +1,25 @@
+from itertools import islice
+from PyQt5 import QtCore
+from formula_search import search_formulas
+
+#searches formulas for a measured mass on a worker thread, the search itself runs on a process pool
+#the best max_candidates candidates are sent back at once, a started search is not cancelled
+class FormulaSearchThread(QtCore.QThread):
+    #list of Candidate
+    done = QtCore.pyqtSignal(object)
+    failed = QtCore.pyqtSignal(str)
+
+    def __init__(self, observed, ion, ppm=None, mda=None, limits=None, max_candidates=500, parent=None):
+        super(FormulaSearchThread, self).__init__(parent)
+        self.observed = observed
+        self.ion = ion
+        self.ppm = ppm
+        self.mda = mda
+        self.limits = limits
+        self.max_candidates = max_candidates
+
+    def run(self):
+        try:
+            self.done.emit(list(islice(search_formulas(self.observed, self.ion, ppm=self.ppm, mda=self.mda, limits=self.limits), self.max_candidates)))
+        except (ValueError, OSError) as error:
+            self.failed.emit(str(error))
@@ -0,0 +1,66 @@
+import re
+from compound import parse_formula
+
+#ion types are written like [M+H]+, [2M+Na]+ or [M+H+Na]2+: how often the molecule is taken, added and lost groups, the charge
+#groups in charge_carriers carry their charge, all other groups are neutral, like H2O in [M+H-H2O]+
+#an ion without a written charge has the charge of its carriers, [M+Cl] is [M+Cl]-
+charge_carriers = {'H': 1, 'Li': 1, 'Na': 1, 'K': 1, 'NH4': 1, 'Cl': -1, 'Br': -1, 'HCOO': -1, 'CH3COO': -1}
+
+#ion types that are offered for new columns, more can be listed in ion_types.txt next to the program
+ion_library = ['[M]', '[M+H]+', '[M-H]-', '[M+Li]+', '[M+Na]+', '[M+K]+', '[M+NH4]+',
+               '[M+Cl]-', '[M+Br]-', '[M+HCOO]-', '[M+CH3COO]-', '[M+H-H2O]+', '[M-H-H2O]-',
+               '[M+2H]2+', '[M-2H]2-', '[M+H+Na]2+', '[M+H+K]2+', '[M+H+NH4]2+', '[M+2Na]2+', '[M+3H]3+',
+               '[2M+H]+', '[2M-H]-', '[2M+Na]+', '[2M+K]+', '[2M+NH4]+', '[2M+Cl]-', '[2M+HCOO]-', '[3M+H]+']
+
+ion_pattern = re.compile(r'\[(\d*)M((?:[+-]\d*[A-Z][A-Za-z0-9]*)*)\](?:(\d*)([+-]))?')
+group_pattern = re.compile(r'([+-])(\d*)([A-Z][A-Za-z0-9]*)')
+
+#parse an ion notation into (multiplier, groups, charge), groups are (count, formula) with a negative count for a loss
+#raises ValueError if the text is no ion notation or a group is no formula
+def parse_ion(notation):
+    match = ion_pattern.fullmatch(notation.replace(' ', ''))
+    if not match or match[1] == '0':
+        raise ValueError(f'{notation!r} is no ion like [M+H]+ or [2M+Na]+')
+    groups = []
+    for sign, count, formula in group_pattern.findall(match[2]):
+        parse_formula(formula)
+        groups.append((int(sign + (count or '1')), formula))
+    if match[4]:
+        charge = int(match[4] + (match[3] or '1'))
+    else:
+        charge = sum(count * charge_carriers.get(formula, 0) for count, formula in groups)
+    return int(match[1] or 1), groups, charge
+
+#the ion of a column header as (multiplier, groups, charge)
+#the adduct is an ion notation, a charge carrier or an element that is added as a cation, it is taken as often as the charge needs
+#add and delete of the header are neutral groups, an adduct without a charge is left out like before
+def header_ion(header):
+    charge = int(header.charge) if header.charge != '' else 0
+    groups = [(count, formula) for count, formula in ((1, header.add), (-1, header.delete)) if formula]
+    adduct = (header.adduct or '').strip()
+    if adduct.startswith('['):
+        multiplier, adduct_groups, charge = parse_ion(adduct)
+        return multiplier, groups + adduct_groups, charge
+    if charge == 0:
+        return 1, groups, 0
+    carrier = adduct or 'H'
+    parse_formula(carrier)
+    return 1, groups + [(charge * charge_carriers.get(carrier, 1), carrier)], charge
+
+#notation of an ion, like the names of the default ion columns
+def ion_name(multiplier, groups, charge):
+    name = '[' + (str(multiplier) if multiplier != 1 else '') + 'M'
+    for count, formula in groups:
+        name += ('+' if count > 0 else '-') + (str(abs(count)) if abs(count) != 1 else '') + formula
+    name += ']'
+    if charge != 0:
+        name += (str(abs(charge)) if abs(charge) != 1 else '') + ('+' if charge > 0 else '-')
+    return name
+
+#ion types of a text file with one notation per line, empty lines and lines starting with # are left out
+def read_library(file_name):
+    with open(file_name, 'r', encoding = 'utf-8') as file:
+        notations = [line.strip() for line in file if line.strip() and not line.lstrip().startswith('#')]
+    for notation in notations:
+        parse_ion(notation)
+    return notations
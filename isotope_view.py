@@ -0,0 +1,81 @@
+import threading
+import numpy as np
+from PyQt5 import QtCore
+from isotopes import table_patterns, pattern_table
+
+#isotope patterns of table rows on a worker thread, the names and formulas are copied before and the table is never touched here
+#rows are calculated in chunks, so a large table shows progress and can be cancelled between chunks
+class IsotopeThread(QtCore.QThread):
+    #percent of all rows
+    progress = QtCore.pyqtSignal(int)
+    #the peaks of all patterns, see pattern_table
+    done = QtCore.pyqtSignal(object)
+    failed = QtCore.pyqtSignal(str)
+
+    def __init__(self, formulas, ion_definitions, mode='aggregated', threshold=1e-4, chunk_size=5000, parent=None):
+        super(IsotopeThread, self).__init__(parent)
+        self.formulas = formulas
+        self.ion_definitions = ion_definitions
+        self.mode = mode
+        self.threshold = threshold
+        self.chunk_size = chunk_size
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def run(self):
+        parts = []
+        try:
+            for start in range(0, len(self.formulas), self.chunk_size):
+                if self.cancelled.is_set():
+                    return
+                patterns = table_patterns(self.formulas[start:start + self.chunk_size], self.ion_definitions, self.mode, self.threshold)
+                rows, columns, shifts, mz, intensities = pattern_table(patterns)
+                parts.append((rows + start, columns, shifts, mz, intensities))
+                self.progress.emit(min(start + self.chunk_size, len(self.formulas)) * 100 // len(self.formulas))
+        except (ValueError, MemoryError) as error:
+            self.failed.emit(str(error))
+            return
+        self.done.emit(tuple(np.concatenate([part[k] for part in parts] + [np.zeros(0, dtype=dtype)])
+                             for k, dtype in enumerate((np.int64, np.int64, np.int64, np.float64, np.float64))))
+
+#peaks of isotope patterns, one peak per line like pattern_rows, the texts are only formatted when they are displayed
+class PeakTableModel(QtCore.QAbstractTableModel):
+    header = ['name', 'compound', 'ion', 'peak', 'm/z', 'intensity']
+
+    def __init__(self, names, formulas, ion_definitions, peaks=None, round_by=4, parent=None):
+        super(PeakTableModel, self).__init__(parent)
+        self.names = names
+        self.formulas = formulas
+        self.ion_names = [ion.name for ion in ion_definitions]
+        self.round_by = round_by
+        self.peaks = peaks if peaks is not None else tuple(np.zeros(0, dtype=dtype) for dtype in (np.int64, np.int64, np.int64, np.float64, np.float64))
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.peaks[0])
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.header)
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role != QtCore.Qt.DisplayRole:
+            return None
+        return self.header[section] if orientation == QtCore.Qt.Horizontal else section + 1
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if role == QtCore.Qt.TextAlignmentRole:
+            return int(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter) if index.column() > 2 else None
+        if role != QtCore.Qt.DisplayRole:
+            return None
+        return self.texts(index.row())[index.column()]
+
+    #the csv row of a peak: name, compound, ion, peak, m/z, intensity
+    def texts(self, r):
+        rows, columns, shifts, mz, intensities = self.peaks
+        row = int(rows[r])
+        return [self.names[row], self.formulas[row], self.ion_names[columns[r]], f'M{int(shifts[r]):+d}',
+                f'{mz[r]:.{self.round_by}f}', f'{intensities[r]:.4f}']
+
+    def csv_rows(self):
+        return (self.texts(r) for r in range(self.rowCount()))
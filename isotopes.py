@@ -0,0 +1,211 @@
+from functools import lru_cache
+import numpy as np
+from compound import exact_masses, elements
+from mass_engine import count_matrix, compile_ion, mass_matrix, ELECTRON, SCALE
+
+#(mass number, exact mass, abundance) of the stable isotopes, the isotope in exact_masses uses that mass
+isotope_table = {'He': [(3, 3.016029, 0.00000134), (4, exact_masses['He'], 0.99999866)],
+                 'Li': [(6, 6.015123, 0.0759), (7, exact_masses['Li'], 0.9241)],
+                 'Be': [(9, exact_masses['Be'], 1.0)],
+                 'B': [(10, 10.012937, 0.199), (11, exact_masses['B'], 0.801)],
+                 'F': [(19, exact_masses['F'], 1.0)],
+                 'Mg': [(24, exact_masses['Mg'], 0.7899), (25, 24.985837, 0.1000), (26, 25.982593, 0.1101)],
+                 'Al': [(27, exact_masses['Al'], 1.0)],
+                 'Si': [(28, exact_masses['Si'], 0.92223), (29, 28.976495, 0.04685), (30, 29.973770, 0.03092)],
+                 'Cl': [(35, exact_masses['Cl'], 0.7576), (37, 36.965903, 0.2424)],
+                 'Fe': [(54, 53.939611, 0.05845), (56, exact_masses['Fe'], 0.91754), (57, 56.935394, 0.02119), (58, 57.933276, 0.00282)],
+                 'Cu': [(63, exact_masses['Cu'], 0.6915), (65, 64.927789, 0.3085)],
+                 'Co': [(59, exact_masses['Co'], 1.0)],
+                 'Ni': [(58, exact_masses['Ni'], 0.680769), (60, 59.930791, 0.262231), (61, 60.931060, 0.011399), (62, 61.928349, 0.036345), (64, 63.927970, 0.009256)],
+                 'Zn': [(64, exact_masses['Zn'], 0.4917), (66, 65.926037, 0.2773), (67, 66.927131, 0.0404), (68, 67.924848, 0.1845), (70, 69.925325, 0.0061)],
+                 'Br': [(79, exact_masses['Br'], 0.5069), (81, 80.916291, 0.4931)],
+                 'C': [(12, exact_masses['C'], 0.9893), (13, 13.003355, 0.0107)],
+                 'O': [(16, exact_masses['O'], 0.99757), (17, 16.999132, 0.00038), (18, 17.999160, 0.00205)],
+                 'H': [(1, exact_masses['H'], 0.999885), (2, 2.014102, 0.000115)],
+                 'N': [(14, exact_masses['N'], 0.99636), (15, 15.000109, 0.00364)],
+                 'P': [(31, exact_masses['P'], 1.0)],
+                 'S': [(32, exact_masses['S'], 0.9499), (33, 32.971458, 0.0075), (34, 33.967867, 0.0425), (36, 35.967081, 0.0001)],
+                 'K': [(39, exact_masses['K'], 0.932581), (40, 39.963999, 0.000117), (41, 40.961826, 0.067302)],
+                 'Na': [(23, exact_masses['Na'], 1.0)],
+                 'Ca': [(40, exact_masses['Ca'], 0.96941), (42, 41.958618, 0.00647), (43, 42.958767, 0.00135), (44, 43.955481, 0.02086), (46, 45.953693, 0.00004), (48, 47.952534, 0.00187)]}
+
+#mass number of the isotope in exact_masses, nominal peaks are counted from it
+reference_numbers = {e: min(isotope_table[e], key=lambda isotope: abs(isotope[1] - exact_masses[e]))[0] for e in elements}
+
+#convolution of two probability vectors, with FFT for long vectors
+def convolve(a, b):
+    if min(len(a), len(b)) < 64:
+        return np.convolve(a, b)
+    size = len(a) + len(b) - 1
+    return np.fft.irfft(np.fft.rfft(a, size) * np.fft.rfft(b, size), size)
+
+#Aggregated mode: one peak per nominal mass
+#a distribution is (first nominal offset, probabilities, probability weighted masses)
+def combine_aggregated(first, second, threshold):
+    start = first[0] + second[0]
+    p = convolve(first[1], second[1])
+    pm = convolve(first[2], second[1]) + convolve(first[1], second[2])
+    keep = np.flatnonzero(p >= threshold * p.max())
+    return start + keep[0], p[keep[0]:keep[-1]+1], pm[keep[0]:keep[-1]+1]
+
+#distribution of n atoms of one element, powers are built by squaring and cached
+@lru_cache(maxsize=4096)
+def element_aggregated(element, n, threshold):
+    if n < 0:
+        raise ValueError(f'Negative count of {element}')
+    if n == 0:
+        return 0, np.ones(1), np.zeros(1)
+    if n == 1:
+        isotopes = isotope_table[element]
+        offsets = [number - reference_numbers[element] for number, mass, abundance in isotopes]
+        start = min(offsets)
+        p = np.zeros(max(offsets) - start + 1)
+        pm = np.zeros(len(p))
+        for offset, (number, mass, abundance) in zip(offsets, isotopes):
+            p[offset - start] += abundance
+            pm[offset - start] += abundance * mass
+        return start, p, pm
+    half = element_aggregated(element, n // 2, threshold)
+    result = combine_aggregated(half, half, threshold)
+    if n % 2:
+        result = combine_aggregated(result, element_aggregated(element, 1, threshold), threshold)
+    return result
+
+#Fine structure mode: one peak per isotopologue mass
+#a distribution is (masses, probabilities), peaks of the same mass are merged
+def combine_fine(first, second, threshold):
+    masses = np.add.outer(first[0], second[0]).ravel()
+    p = np.multiply.outer(first[1], second[1]).ravel()
+    keep = p >= threshold * p.max()
+    masses, p = masses[keep], p[keep]
+    unique, inverse = np.unique(np.round(masses, 6), return_inverse=True)
+    merged = np.bincount(inverse, weights=p)
+    return np.bincount(inverse, weights=p * masses) / merged, merged
+
+@lru_cache(maxsize=4096)
+def element_fine(element, n, threshold):
+    if n < 0:
+        raise ValueError(f'Negative count of {element}')
+    if n == 0:
+        return np.zeros(1), np.ones(1)
+    if n == 1:
+        isotopes = isotope_table[element]
+        return np.array([mass for number, mass, abundance in isotopes]), np.array([abundance for number, mass, abundance in isotopes])
+    half = element_fine(element, n // 2, threshold)
+    result = combine_fine(half, half, threshold)
+    if n % 2:
+        result = combine_fine(result, element_fine(element, 1, threshold), threshold)
+    return result
+
+#aggregated patterns of many count vectors at once
+#the cached element distributions are multiplied in frequency space for all rows together
+def aggregated_patterns(count_rows, threshold=1e-4, chunk_size=10000):
+    patterns = []
+    for chunk in range(0, len(count_rows), chunk_size):
+        rows = count_rows[chunk:chunk + chunk_size]
+        present = np.flatnonzero(rows.any(axis=0))
+        starts = np.zeros(len(rows), dtype=np.int64)
+        spans = np.zeros(len(rows), dtype=np.int64)
+        columns = []
+        for i in present:
+            numbers, inverse = np.unique(rows[:, i], return_inverse=True)
+            distributions = [element_aggregated(elements[i], int(n), threshold) for n in numbers]
+            starts += np.array([d[0] for d in distributions])[inverse]
+            spans += np.array([len(d[1]) - 1 for d in distributions])[inverse]
+            columns.append((distributions, inverse))
+        size = 1 << int(spans.max(initial=0) + 1).bit_length()
+        fp = np.ones((len(rows), size // 2 + 1), dtype=complex)
+        fpm = np.zeros((len(rows), size // 2 + 1), dtype=complex)
+        for distributions, inverse in columns:
+            element_p = np.array([np.fft.rfft(d[1], size) for d in distributions])[inverse]
+            element_pm = np.array([np.fft.rfft(d[2], size) for d in distributions])[inverse]
+            fpm = fpm * element_p + fp * element_pm
+            fp = fp * element_p
+        p = np.fft.irfft(fp, size, axis=1)
+        pm = np.fft.irfft(fpm, size, axis=1)
+        highest = p.max(axis=1, keepdims=True)
+        keep = p >= threshold * highest
+        splits = np.cumsum(keep.sum(axis=1))[:-1]
+        masses = np.split(pm[keep] / p[keep], splits)
+        intensities = np.split((p / highest * 100)[keep], splits)
+        patterns.extend(zip(masses, intensities))
+    return patterns
+
+#isotope pattern of a count vector as masses and intensities relative to the highest peak (100)
+#peaks below threshold times the highest peak are pruned
+def isotope_pattern(counts, mode='aggregated', threshold=1e-4):
+    if mode == 'aggregated':
+        return aggregated_patterns(np.asarray(counts, dtype=np.int64)[None, :], threshold)[0]
+    elif mode == 'fine':
+        distribution = (np.zeros(1), np.ones(1))
+        for i in np.flatnonzero(counts):
+            distribution = combine_fine(distribution, element_fine(elements[i], int(counts[i]), threshold), threshold)
+        masses, p = distribution
+        return masses, p / p.max() * 100
+    raise ValueError(f'Unknown isotope pattern mode {mode!r}')
+
+#patterns of all formulas for all ion definitions, every distinct ion composition is calculated once
+#returns rows of (m/z, intensity, nominal shift) arrays per ion definition, None where no mass can be calculated
+def table_patterns(formulas, ion_definitions, mode='aggregated', threshold=1e-4):
+    counts, valid = count_matrix(formulas)
+    numerators, divisors, ok, na = mass_matrix(counts, ion_definitions)
+    ok &= (valid & counts.any(axis=1))[:, None]
+    cells = []
+    ions = []
+    for j, ion in enumerate(ion_definitions):
+        if na[j] or not ok[:, j].any():
+            continue
+        #composition of the ion, the formula taken multiplier times with the adduct atoms added and losses removed
+        delta, offset, charge, multiplier = compile_ion(ion)
+        rows = np.flatnonzero(ok[:, j])
+        composition = counts[rows] * multiplier + delta
+        #an ion that removes more atoms than the formula has cannot be formed, its cells stay None
+        possible = (composition >= 0).all(axis=1)
+        if not possible.any():
+            continue
+        rows = rows[possible]
+        cells.append((rows, j))
+        ions.append(np.column_stack([composition[possible], np.full(len(rows), charge)]))
+    results = [[None] * len(ion_definitions) for formula in formulas]
+    if not cells:
+        return results
+    #rows are compared as raw bytes, which is much faster than np.unique with axis
+    ions = np.ascontiguousarray(np.concatenate(ions))
+    keys = ions.view(np.dtype((np.void, ions.itemsize * ions.shape[1]))).ravel()
+    keys, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    unique = ions[first]
+    if mode == 'aggregated':
+        patterns = aggregated_patterns(unique[:, :-1], threshold)
+    else:
+        patterns = [isotope_pattern(row[:-1], mode, threshold) for row in unique]
+    monoisotopic = unique[:, :-1] @ np.array([exact_masses[e] for e in elements])
+    for k, (masses, intensities) in enumerate(patterns):
+        charge = int(unique[k, -1])
+        shifts = np.rint(masses - monoisotopic[k]).astype(np.int64)
+        patterns[k] = ((masses - charge * ELECTRON / SCALE) / (abs(charge) or 1), intensities, shifts)
+    position = 0
+    for rows, j in cells:
+        for i, k in zip(rows, inverse[position:position + len(rows)]):
+            results[i][j] = patterns[k]
+        position += len(rows)
+    return results
+
+#the peaks of all patterns as flat arrays (row, ion column, nominal shift, m/z, intensity), in the order of pattern_rows
+#a few arrays hold the peaks of a large table in much less memory than a row of texts per peak
+def pattern_table(patterns):
+    cells = [(i, j, pattern) for i, row in enumerate(patterns) for j, pattern in enumerate(row) if pattern is not None]
+    sizes = np.array([len(pattern[0]) for i, j, pattern in cells], dtype=np.int64)
+    rows = np.repeat(np.array([i for i, j, pattern in cells], dtype=np.int64), sizes)
+    columns = np.repeat(np.array([j for i, j, pattern in cells], dtype=np.int64), sizes)
+    mz, intensities, shifts = (np.concatenate([pattern[k] for i, j, pattern in cells] + [np.zeros(0, dtype=dtype)])
+                               for k, dtype in ((0, np.float64), (1, np.float64), (2, np.int64)))
+    return rows, columns, shifts, mz, intensities
+
+#csv rows with one peak per line: name, compound, ion, peak, m/z, intensity
+def pattern_rows(names, formulas, ion_definitions, patterns, round_by=4):
+    for name, formula, row in zip(names, formulas, patterns):
+        for ion, pattern in zip(ion_definitions, row):
+            if pattern is None:
+                continue
+            for mz, intensity, shift in zip(*pattern):
+                yield [name, formula, ion.name, f'M{shift:+d}', f'{mz:.{round_by}f}', f'{intensity:.4f}']
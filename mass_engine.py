@@ -0,0 +1,260 @@
+from functools import lru_cache
+import numpy as np
+from compound import exact_masses, elements, element_index, parse_formula, FormulaError
+#compound imports this module, so ion_types is only looked up when an ion is compiled
+import ion_types
+from table_csv import HeaderItem
+
+#all masses in exact_masses have at most 6 decimals, so they are exact integers in micro-Dalton
+SCALE = 10**6
+ELECTRON = 549
+
+#column order of the count matrix is the order of exact_masses, like composition vectors
+element_masses = np.array([round(exact_masses[e] * SCALE) for e in elements], dtype=np.int64)
+
+#Decimal default context, round() fails for results with more digits
+MAX_DIGITS = 28
+
+#valences for the ring and double bond equivalents
+valences = {'He': 0, 'Li': 1, 'Be': 2, 'B': 3, 'F': 1, 'Mg': 2, 'Al': 3, 'Si': 4, 'Cl': 1, 'Fe': 2, 'Cu': 2, 'Co': 2,
+            'Ni': 2, 'Zn': 2, 'Br': 1, 'C': 4, 'O': 2, 'H': 1, 'N': 3, 'P': 3, 'S': 2, 'K': 1, 'Na': 1, 'Ca': 2}
+element_valences = np.array([valences[e] for e in elements])
+
+#descriptor columns hold a value of the ion of their column instead of its m/z, in micro-units like the masses
+#  md        mass defect, the mass minus the nearest integer
+#  km:CH2    Kendrick mass for a base, the mass scaled so that the base has an integer mass
+#  kmd:CH2   Kendrick mass defect, the nearest integer of the Kendrick mass minus the Kendrick mass
+#  rdbe      ring and double bond equivalents
+#  h/c, o/c, n/c   element ratios, not possible without carbon
+#mass descriptors use the m/z of the column, the others the composition of its ion, the neutral compound by default
+descriptor_names = {'md': 'mass defect', 'km': 'KM', 'kmd': 'KMD', 'rdbe': 'RDBE', 'h/c': 'H/C', 'o/c': 'O/C', 'n/c': 'N/C'}
+mass_descriptors = ('md', 'km', 'kmd')
+ratio_elements = {'h/c': 'H', 'o/c': 'O', 'n/c': 'N'}
+
+
+#build the count matrix for a list of formulas, invalid formulas get a row of zeros and valid = False
+def count_matrix(formulas):
+    counts = np.zeros((len(formulas), len(elements)), dtype=np.int64)
+    valid = np.ones(len(formulas), dtype=bool)
+    parsed = {}
+    for i, formula in enumerate(formulas):
+        if formula not in parsed:
+            try:
+                parsed[formula] = parse_formula(formula).counts
+            except FormulaError:
+                parsed[formula] = None
+        vector = parsed[formula]
+        if vector is None:
+            valid[i] = False
+        else:
+            counts[i] = vector
+    return counts, valid
+
+#compile one ion definition (HeaderItem like) into (composition delta, mass offset, charge, multiplier)
+#the ion of a formula is multiplier formulas plus delta, its m/z is (multiplier * neutral mass + offset) / |charge|
+#the offset is in micro-Dalton and includes the electrons, None if the ion can not be read
+def compile_ion(ion):
+    return compiled_ion(ion.add or '', ion.delete or '', ion.adduct or '', str(ion.charge))
+
+#the same ion is compiled once, the delta is shared and read only
+@lru_cache(maxsize=1024)
+def compiled_ion(add, delete, adduct, charge):
+    try:
+        multiplier, groups, charge = ion_types.header_ion(HeaderItem('', add=add, delete=delete, adduct=adduct, charge=charge))
+    except ValueError:
+        return None
+    delta = np.zeros(len(elements), dtype=np.int64)
+    for count, formula in groups:
+        delta += count * parse_formula(formula).counts.astype(np.int64)
+    delta.setflags(write=False)
+    return delta, int(delta @ element_masses) - charge * ELECTRON, charge, multiplier
+
+#compile a descriptor like kmd:CH2 into (kind, base mass in micro-Dalton, nominal base mass), raises ValueError
+@lru_cache(maxsize=256)
+def compile_descriptor(descriptor):
+    kind, _, base = descriptor.strip().partition(':')
+    kind = kind.lower()
+    if kind not in descriptor_names:
+        raise ValueError(f'Unknown descriptor {descriptor!r}, descriptors are ' + ', '.join(descriptor_names))
+    if kind not in ('km', 'kmd'):
+        if base.strip():
+            raise ValueError(f'The descriptor {kind} has no base')
+        return kind, 0, 0
+    base_mass = int(parse_formula(base.strip() or 'CH2').counts.astype(np.int64) @ element_masses)
+    if base_mass <= 0:
+        raise ValueError(f'Invalid Kendrick base {base!r}')
+    return kind, base_mass, (base_mass + SCALE // 2) // SCALE
+
+#column name of a descriptor, like KMD CH2
+def descriptor_name(descriptor):
+    kind, _, base = descriptor.strip().partition(':')
+    kind = kind.lower()
+    if kind in ('km', 'kmd'):
+        return descriptor_names[kind] + ' ' + (base.strip() or 'CH2')
+    return descriptor_names.get(kind, descriptor)
+
+#values of a descriptor for one column, from the m/z numerators and divisor of the column and the compositions of its ions
+#returns numerators, divisor and a mask of the rows where the descriptor is defined
+def descriptor_values(compiled, numerators, divisor, compositions):
+    kind, base_mass, base_nominal = compiled
+    ok = np.ones(len(numerators), dtype=bool)
+    unit = divisor * SCALE
+    if kind == 'md':
+        return numerators - (2 * numerators + unit) // (2 * unit) * unit, divisor, ok
+    if kind in ('km', 'kmd'):
+        kendrick = np.rint(numerators * (base_nominal * SCALE / (divisor * base_mass))).astype(np.int64)
+        if kind == 'km':
+            return kendrick, 1, ok
+        return (2 * kendrick + SCALE) // (2 * SCALE) * SCALE - kendrick, 1, ok
+    if kind == 'rdbe':
+        return SCALE + compositions @ (element_valences - 2) * (SCALE // 2), 1, ok
+    carbon = compositions[:, element_index['C']]
+    ok = carbon > 0
+    ratios = np.rint(compositions[:, element_index[ratio_elements[kind]]] * SCALE / np.where(ok, carbon, 1)).astype(np.int64)
+    return np.where(ok, ratios, 0), 1, ok
+
+#calculate m/z of all formulas (count matrix rows) for all ion definitions
+#every column is one affine transform of the neutral masses with its compiled ion
+#a descriptor column is computed from the m/z and the ion compositions of its column in the same pass
+#returns numerators in micro-Dalton, a divisor per column and a mask of calculable cells
+def mass_matrix(counts, ion_definitions):
+    compiled = [compile_ion(ion) for ion in ion_definitions]
+    na = np.array([ion is None for ion in compiled], dtype=bool)
+    deltas = np.zeros((len(compiled), len(elements)), dtype=np.int64)
+    offsets = np.zeros(len(compiled), dtype=np.int64)
+    charges = np.zeros(len(compiled), dtype=np.int64)
+    multipliers = np.ones(len(compiled), dtype=np.int64)
+    for j, ion in enumerate(compiled):
+        if ion is not None:
+            deltas[j], offsets[j], charges[j], multipliers[j] = ion
+    numerators = (counts @ element_masses)[:, None] * multipliers + offsets
+    divisors = np.where(charges != 0, np.abs(charges), 1)
+    ok = np.ones((len(counts), len(ion_definitions)), dtype=bool)
+    ok[:, na] = False
+    #an ion is only possible if the formulas have enough of each element that is lost
+    for j in np.flatnonzero((deltas < 0).any(axis=1) & ~na):
+        lost = deltas[j] < 0
+        ok[:, j] = (counts[:, lost] * multipliers[j] + deltas[j, lost] >= 0).all(axis=1)
+    #the deletion of a header is taken from the formula before the addition is added, like Compound.del_elements
+    #so an atom that only the addition brings can not be deleted
+    for j, ion in enumerate(ion_definitions):
+        if na[j] or not getattr(ion, 'delete', ''):
+            continue
+        deleted = parse_formula(ion.delete).counts
+        needed = np.flatnonzero(deleted)
+        ok[:, j] &= (counts[:, needed] * multipliers[j] >= deleted[needed]).all(axis=1)
+    for j, ion in enumerate(ion_definitions):
+        if not getattr(ion, 'descriptor', '') or na[j]:
+            continue
+        try:
+            compiled_descriptor = compile_descriptor(ion.descriptor)
+        except ValueError:
+            na[j] = True
+            ok[:, j] = False
+            continue
+        compositions = None if compiled_descriptor[0] in mass_descriptors else counts * multipliers[j] + deltas[j]
+        numerators[:, j], divisors[j], defined = descriptor_values(compiled_descriptor, numerators[:, j], divisors[j], compositions)
+        ok[:, j] &= defined
+    return numerators, divisors, ok, na
+
+#round numerator/(divisor*SCALE) half even to round_by decimals, like round(Decimal, round_by)
+def round_masses(numerators, divisors, round_by):
+    if round_by > 12 and isinstance(numerators, np.ndarray):
+        numerators = numerators.astype(object)
+    if round_by >= 6:
+        num = numerators * 10**(round_by - 6)
+        den = divisors
+    else:
+        num = numerators
+        den = divisors * 10**(6 - round_by)
+    quotient = num // den
+    twice = (num - quotient * den) * 2
+    return quotient + ((twice > den) | ((twice == den) & (quotient % 2 == 1)))
+
+#format an integer in units of 10**-round_by the way str(Decimal) does
+def format_mass(value, round_by, negative=False):
+    value = int(value)
+    negative = negative or value < 0
+    digits = str(abs(value))
+    if len(digits.lstrip('0')) > MAX_DIGITS:
+        return '---'
+    if round_by > 0:
+        digits = digits.rjust(round_by + 1, '0')
+        digits = digits[:-round_by] + '.' + digits[-round_by:]
+    return '-' + digits if negative else digits
+
+#format a column of rounded masses, float formatting is exact while the value has at most 15 digits
+def format_masses(rounded, numerators, round_by):
+    if round_by <= 12 and np.abs(rounded).max(initial=0) < 10**15:
+        values = np.copysign(rounded / 10**round_by, numerators)
+        return list(map(f'%.{round_by}f'.__mod__, values.tolist()))
+    return [format_mass(value, round_by, numerator < 0) for value, numerator in zip(rounded, numerators)]
+
+#rounded mass text of a single cell, for display on demand
+def mass_text(numerator, divisor, round_by):
+    numerator = int(numerator)
+    return format_mass(round_masses(numerator, int(divisor), round_by), round_by, numerator < 0)
+
+#states of a cell in a mass column
+EMPTY = 0
+MASS = 1
+IMPOSSIBLE = 2
+NA = 3
+state_texts = {EMPTY: '', IMPOSSIBLE: '---', NA: 'N/A'}
+
+#masses and cell states of formulas for ion definitions, used by the table and the calculation workers
+#returns numerators and states per row and ion, divisors per ion and invalid per row
+def mass_states(formulas, ion_definitions):
+    counts, valid = count_matrix(formulas)
+    numerators, divisors, ok, na = mass_matrix(counts, ion_definitions)
+    empty = np.array([formula == '' for formula in formulas], dtype=bool)
+    states = np.where(ok, MASS, IMPOSSIBLE).astype(np.int8)
+    states[:, na] = NA
+    states[empty | ~valid] = EMPTY
+    return numerators, states, divisors, ~valid & ~empty
+
+#read mass texts of a column back, e.g. from a saved table, returns numerators, states and a mask of the cells that were read
+#a mass can only be read back exactly if it was written with enough decimals for its divisor, 6 for charges up to 1
+#empty cells and masses with fewer decimals are not read and have to be calculated again
+def parse_masses(texts, divisor):
+    numerators = np.zeros(len(texts), dtype=np.int64)
+    states = np.zeros(len(texts), dtype=np.int8)
+    read = np.zeros(len(texts), dtype=bool)
+    codes = {text: state for state, text in state_texts.items() if text != ''}
+    for i, text in enumerate(texts):
+        if text in codes:
+            states[i] = codes[text]
+            read[i] = True
+            continue
+        integer, point, decimals = text.partition('.')
+        unit = 10**len(decimals)
+        if unit < divisor * SCALE or not (integer + decimals).lstrip('-').isdigit():
+            continue
+        #the text is at most half a decimal away from numerator/(divisor*SCALE), so the nearest integer is the numerator
+        numerators[i] = (int(integer + decimals) * divisor * SCALE * 2 + unit) // (2 * unit)
+        states[i] = MASS
+        read[i] = True
+    return numerators, states, read
+
+#calculate the rounded mass text of every formula for every ion definition
+#rows with an empty formula are all '', rows with an invalid formula are None
+def calc_masses(formulas, ion_definitions, round_by=4):
+    counts, valid = count_matrix(formulas)
+    numerators, divisors, ok, na = mass_matrix(counts, ion_definitions)
+    rounded = round_masses(numerators, divisors, round_by)
+    columns = []
+    for j in range(len(ion_definitions)):
+        if na[j]:
+            columns.append(['N/A'] * len(formulas))
+            continue
+        texts = format_masses(rounded[:, j], numerators[:, j], round_by)
+        for i in np.flatnonzero(~ok[:, j]):
+            texts[i] = '---'
+        columns.append(texts)
+    results = [list(row) for row in zip(*columns)] if columns else [[] for formula in formulas]
+    for i, formula in enumerate(formulas):
+        if formula == '':
+            results[i] = [''] * len(ion_definitions)
+        elif not valid[i]:
+            results[i] = None
+    return results
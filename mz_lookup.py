@@ -0,0 +1,67 @@
+import re
+import numpy as np
+from mass_engine import count_matrix, mass_matrix, SCALE
+
+#one hit per observed m/z and theoretical ion within the tolerance
+hit_dtype = np.dtype([('query', np.int64), ('row', np.int64), ('column', np.int64), ('mz', np.float64), ('ppm', np.float64)])
+
+#sorted m/z of all ions of a table, lookups are binary searches
+class MassIndex():
+    def __init__(self, mz, rows, columns):
+        order = np.argsort(mz, kind='stable')
+        self.mz = np.asarray(mz, dtype=np.float64)[order]
+        self.rows = np.asarray(rows, dtype=np.int64)[order]
+        self.columns = np.asarray(columns, dtype=np.int64)[order]
+
+    #index every calculable cell, column_ids maps the ion definitions to table columns
+    #descriptor columns hold no m/z and are left out
+    @classmethod
+    def from_formulas(cls, formulas, ion_definitions, column_ids=None):
+        counts, valid = count_matrix(formulas)
+        numerators, divisors, ok, na = mass_matrix(counts, ion_definitions)
+        ok &= (valid & counts.any(axis=1))[:, None]
+        ok[:, [bool(getattr(ion, 'descriptor', '')) for ion in ion_definitions]] = False
+        rows, columns = np.nonzero(ok)
+        mz = numerators[rows, columns] / (divisors[columns] * SCALE)
+        if column_ids is not None:
+            columns = np.asarray(column_ids, dtype=np.int64)[columns]
+        return cls(mz, rows, columns)
+
+    def __len__(self):
+        return len(self.mz)
+
+    #all ions within ppm or mDa of each observed m/z, errors are (observed - theoretical) in ppm
+    def query(self, observed, ppm=None, mda=None):
+        observed = np.atleast_1d(np.asarray(observed, dtype=np.float64))
+        if ppm is not None:
+            tolerance = observed * (ppm * 1e-6)
+        elif mda is not None:
+            tolerance = np.full(len(observed), mda * 1e-3)
+        else:
+            raise ValueError('A tolerance in ppm or mDa is needed')
+        lower = np.searchsorted(self.mz, observed - tolerance, 'left')
+        upper = np.searchsorted(self.mz, observed + tolerance, 'right')
+        counts = upper - lower
+        total = int(counts.sum())
+        query = np.repeat(np.arange(len(observed)), counts)
+        positions = np.repeat(lower - (np.cumsum(counts) - counts), counts) + np.arange(total)
+        hits = np.empty(total, dtype=hit_dtype)
+        hits['query'] = query
+        hits['row'] = self.rows[positions]
+        hits['column'] = self.columns[positions]
+        hits['mz'] = self.mz[positions]
+        hits['ppm'] = (observed[query] - hits['mz']) / hits['mz'] * 1e6
+        return hits
+
+#match observed m/z values against the ions of a list of formulas
+def annotate(observed, formulas, ion_definitions, ppm=None, mda=None):
+    return MassIndex.from_formulas(formulas, ion_definitions).query(observed, ppm=ppm, mda=mda)
+
+#tolerance text like '5 ppm' or '2 mDa', a number without unit is ppm
+def parse_tolerance(text):
+    match = re.fullmatch(r'\s*([0-9]*\.?[0-9]+)\s*(ppm|mda)?\s*', text, re.IGNORECASE)
+    if not match:
+        raise ValueError(f'Invalid tolerance {text!r}')
+    if match[2] and match[2].lower() == 'mda':
+        return None, float(match[1])
+    return float(match[1]), None
@@ -0,0 +1,65 @@
+import numpy as np
+from compound import elements, parse_formula
+
+#all linear oligomers of building blocks with min_units to max_units units, one elimination product is lost per linkage
+#the oligomers of n units are built from those of n - 1 units by adding one block, so every composition is built once
+#a composition that was added before, also with another number of units, is left out
+#below min_units compositions are only compared with those of the same number of units, they can still be added with more units
+#yields (units, counts) in chunks of at most chunk_size oligomers, fewer units first
+#units are the numbers of each block of the first way a composition was found, counts are element counts like count_matrix
+def enumerate_oligomers(blocks, max_units, elimination='H2O', min_units=1, limit=None, chunk_size=50000):
+    blocks = np.array([np.asarray(block, dtype=np.int64) for block in blocks]).reshape(-1, len(elements))
+    loss = parse_formula(elimination or '').counts.astype(np.int64)
+    #only elements of the blocks and the elimination product are counted
+    present = np.flatnonzero(blocks.any(axis=0) | (loss != 0))
+    steps = blocks[:, present] - loss[present]
+    k = len(blocks)
+    seen = set()
+    found = 0
+    frontier = [(np.eye(k, dtype=np.int32), blocks[:, present].astype(np.int32))]
+    for n in range(1, max_units + 1):
+        following = []
+        known = seen if n >= min_units else set()
+        for units, counts in frontier:
+            for start in range(0, len(units), chunk_size):
+                if n > 1:
+                    #every oligomer of the chunk extended by every block, an elimination that is not possible is left out
+                    new_units = (units[start:start + chunk_size, None, :] + np.eye(k, dtype=np.int32)).reshape(-1, k)
+                    new_counts = (counts[start:start + chunk_size, None, :] + steps.astype(np.int32)).reshape(-1, len(present))
+                    possible = (new_counts >= 0).all(axis=1)
+                    new_units, new_counts = new_units[possible], new_counts[possible]
+                else:
+                    new_units, new_counts = units[start:start + chunk_size], counts[start:start + chunk_size]
+                new = first_seen(np.ascontiguousarray(new_counts).view(np.dtype((np.void, 4 * len(present)))).ravel().tolist(), known)
+                new_units, new_counts = new_units[new], new_counts[new]
+                if not len(new_units):
+                    continue
+                following.append((new_units, new_counts))
+                if n < min_units:
+                    continue
+                if limit is not None and found + len(new_units) >= limit:
+                    yield new_units[:limit - found], expand_counts(new_counts[:limit - found], present)
+                    return
+                found += len(new_units)
+                yield new_units, expand_counts(new_counts, present)
+        frontier = following
+        if not frontier:
+            return
+
+#mask of the keys that are not in seen yet, seen is updated
+def first_seen(keys, seen):
+    new = np.zeros(len(keys), dtype=bool)
+    for i, key in enumerate(keys):
+        if key not in seen:
+            seen.add(key)
+            new[i] = True
+    return new
+
+def expand_counts(counts, present):
+    full = np.zeros((len(counts), len(elements)), dtype=np.int64)
+    full[:, present] = counts
+    return full
+
+#names like 2(GlcNAc)+(MurNAc), like the compound builder names a sum
+def oligomer_names(units, names):
+    return ['+'.join(('' if n == 1 else str(n)) + '(' + names[i] + ')' for i, n in enumerate(row) if n) for row in units.tolist()]
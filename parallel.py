@@ -0,0 +1,83 @@
+import csv
+import io
+import os
+from collections import deque
+from itertools import islice
+from mass_engine import calc_masses, mass_states
+
+#rows per chunk and number of worker processes, None means one worker per core
+default_chunk_size = 20000
+default_workers = None
+
+#the ion definitions and settings of a run are sent once to each worker process, not with every chunk
+#chunk functions take (context, chunk), in a worker process the context is the one of its pool
+worker_context = None
+
+def init_worker(*context):
+    global worker_context
+    worker_context = context
+
+def context_call(function, chunk):
+    return function(worker_context, chunk)
+
+#worker processes are started fresh and not forked, a fork would copy the threads and the Qt state of the program
+#the fork server imports the calculation modules once, instead of the main module with Qt
+def process_context():
+    import multiprocessing
+    if 'forkserver' not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('spawn')
+    context = multiprocessing.get_context('forkserver')
+    context.set_forkserver_preload(['parallel'])
+    return context
+
+#masses and cell states of a chunk of formulas, returned as compact integer arrays
+def states_chunk(context, formulas):
+    ion_definitions, = context
+    return mass_states(formulas, ion_definitions)
+
+#fill the mass columns of a chunk of csv rows and return the chunk as csv text
+def table_chunk(context, rows):
+    ion_definitions, columns, width, round_by = context
+    for row in rows:
+        row.extend([''] * (width - len(row)))
+    results = calc_masses([row[1] for row in rows], ion_definitions, round_by=round_by)
+    for row, texts in zip(rows, results):
+        for j, text in zip(columns, texts or [''] * len(columns)):
+            row[j] = text
+    text = io.StringIO()
+    csv.writer(text, delimiter = ',').writerows(rows)
+    return len(rows), text.getvalue()
+
+def chunked(iterable, chunk_size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def worker_count(workers=None):
+    return workers or default_workers or os.cpu_count() or 1
+
+#apply function to every chunk in a process pool and yield the results in the order of the chunks
+#only a few chunks per worker are submitted ahead, so a stream of chunks is never read completely
+#with one worker everything runs in this process and the context is passed to function directly
+def map_chunks(function, chunks, context, workers=None):
+    workers = worker_count(workers)
+    if workers <= 1:
+        for chunk in chunks:
+            yield function(context, chunk)
+        return
+    #the process pool is imported on first use, it is not needed to start the program
+    from concurrent.futures import ProcessPoolExecutor
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=process_context(), initializer=init_worker, initargs=context)
+    try:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(context_call, function, chunk))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
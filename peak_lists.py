@@ -0,0 +1,188 @@
+import base64
+import csv
+import zlib
+import xml.etree.ElementTree as ElementTree
+from itertools import islice
+from time import perf_counter
+import numpy as np
+from mz_lookup import MassIndex
+
+#peak lists of measured spectra from mzML, MGF and csv files
+#every reader yields (spectrum, m/z, intensities) one spectrum at a time, so files of any size are read in bounded memory
+#csv files are read in chunks of rows, consecutive rows of the same spectrum are one spectrum up to the chunk size
+
+#controlled vocabulary of the binary arrays of mzML
+mzml_arrays = {'MS:1000514': 'mz', 'MS:1000515': 'intensity'}
+mzml_types = {'MS:1000521': '<f4', 'MS:1000523': '<f8', 'MS:1000519': '<i4', 'MS:1000522': '<i8'}
+mzml_compressions = {'MS:1000574': 'zlib', 'MS:1000576': None}
+
+def local_name(tag):
+    return tag.rpartition('}')[2]
+
+#one binaryDataArray of mzML as (array name, values), arrays that are not m/z or intensity have no name
+def mzml_array(element):
+    name = None
+    dtype = '<f8'
+    compression = None
+    binary = ''
+    for child in element:
+        tag = local_name(child.tag)
+        if tag == 'cvParam':
+            accession = child.get('accession')
+            if accession in mzml_arrays:
+                name = mzml_arrays[accession]
+            elif accession in mzml_types:
+                dtype = mzml_types[accession]
+            elif accession in mzml_compressions:
+                compression = mzml_compressions[accession]
+            elif 'numpress' in (child.get('name') or '').lower():
+                raise ValueError(f'Compression {child.get("name")} is not supported')
+        elif tag == 'binary':
+            binary = child.text or ''
+    data = base64.b64decode(binary)
+    if compression == 'zlib':
+        try:
+            data = zlib.decompress(data)
+        except zlib.error as error:
+            raise ValueError(f'Invalid binary array: {error}') from error
+    return name, np.frombuffer(data, dtype=dtype).astype(np.float64)
+
+#spectra of an mzML file, the xml is parsed incrementally and every spectrum is dropped after it was read
+def read_mzml(file_name):
+    path = []
+    for event, element in ElementTree.iterparse(file_name, events=('start', 'end')):
+        if event == 'start':
+            path.append(element)
+            continue
+        path.pop()
+        tag = local_name(element.tag)
+        if tag not in ('spectrum', 'chromatogram'):
+            continue
+        if tag == 'spectrum':
+            arrays = {}
+            for array_list in element:
+                if local_name(array_list.tag) == 'binaryDataArrayList':
+                    arrays.update(mzml_array(array) for array in array_list)
+            if 'mz' in arrays:
+                yield element.get('id', ''), arrays['mz'], arrays.get('intensity', np.zeros(len(arrays['mz'])))
+        element.clear()
+        if path:
+            path[-1].remove(element)
+
+#spectra of an MGF file, peaks are lines of m/z and intensity between BEGIN IONS and END IONS
+def read_mgf(file_name):
+    with open(file_name, 'r', encoding = 'utf-8') as file:
+        title = None
+        peaks = None
+        number = 0
+        for line in file:
+            line = line.strip()
+            if line == 'BEGIN IONS':
+                number += 1
+                title = f'spectrum {number}'
+                peaks = []
+            elif line == 'END IONS':
+                if peaks is not None:
+                    values = np.array(peaks, dtype=np.float64).reshape(-1, 2)
+                    yield title, values[:, 0], values[:, 1]
+                peaks = None
+            elif peaks is None or not line or line[0] in '#;!/':
+                continue
+            elif line.startswith('TITLE='):
+                title = line[6:]
+            elif line[0].isdigit():
+                parts = line.split()
+                peaks.append((float(parts[0]), float(parts[1]) if len(parts) > 1 else 0.0))
+
+#peaks of a csv file, the columns are found by their header (m/z or mz, intensity, spectrum or scan)
+#without a header the first column is m/z and the second the intensity
+def read_peak_csv(file_name, chunk_size=100000):
+    with open(file_name, 'r', newline = '', encoding = 'utf-8') as file:
+        reader = csv.reader(file)
+        first = next(reader, None)
+        if first is None:
+            return
+        header = [text.strip().lower() for text in first]
+        try:
+            float(first[0])
+            columns = (0, 1 if len(first) > 1 else None, None)
+            pending = [first]
+        except (ValueError, IndexError):
+            def find(*names):
+                return next((header.index(name) for name in names if name in header), None)
+            columns = (find('m/z', 'mz', 'mass'), find('intensity', 'int', 'abundance'), find('spectrum', 'scan', 'id', 'title'))
+            if columns[0] is None:
+                raise ValueError(f'{file_name} has no m/z column')
+            pending = []
+        mz_column, intensity_column, spectrum_column = columns
+        while True:
+            rows = pending + list(islice(reader, chunk_size))
+            pending = []
+            rows = [row for row in rows if len(row) > mz_column and row[mz_column].strip()]
+            if not rows:
+                return
+            mz = np.array([float(row[mz_column]) for row in rows])
+            intensity = np.array([float(row[intensity_column]) if intensity_column is not None and len(row) > intensity_column and row[intensity_column] else 0.0 for row in rows])
+            if spectrum_column is None:
+                yield '', mz, intensity
+                continue
+            spectra = [row[spectrum_column] if len(row) > spectrum_column else '' for row in rows]
+            start = 0
+            for end in list(np.flatnonzero([a != b for a, b in zip(spectra, spectra[1:])]) + 1) + [len(rows)]:
+                yield spectra[start], mz[start:end], intensity[start:end]
+                start = end
+
+#reader for the format of a file, by its extension
+def read_peaks(file_name):
+    extension = file_name.lower().rpartition('.')[2]
+    if extension == 'mzml':
+        return read_mzml(file_name)
+    if extension == 'mgf':
+        return read_mgf(file_name)
+    return read_peak_csv(file_name)
+
+annotation_header = ['spectrum', 'peak m/z', 'intensity', 'name', 'compound', 'ion', 'm/z', 'ppm']
+
+#annotation rows of spectra, one row per peak and matching ion, best match of a peak first
+#peaks without a match are left out, or written without annotation if all_peaks is True
+def annotate_spectra(spectra, index, names, formulas, ion_names, ppm=None, mda=None, all_peaks=False, round_by=4):
+    mass_format = f'%.{round_by}f'.__mod__
+    for spectrum, mz, intensity in spectra:
+        hits = index.query(mz, ppm=ppm, mda=mda)
+        hits = hits[np.lexsort((np.abs(hits['ppm']), hits['query']))]
+        #the columns are formatted as lists, reading single elements of the hit array is slow
+        peak_texts = list(map(mass_format, mz.tolist()))
+        intensity_texts = list(map('%g'.__mod__, intensity.tolist()))
+        queries = hits['query'].tolist()
+        rows = [[spectrum, peak_texts[query], intensity_texts[query], names[row], formulas[row], ion_names[column], mz_text, ppm_text]
+                for query, row, column, mz_text, ppm_text in zip(queries, hits['row'].tolist(), hits['column'].tolist(),
+                                                                  map(mass_format, hits['mz'].tolist()), map('%.2f'.__mod__, hits['ppm'].tolist()))]
+        if all_peaks:
+            #the peaks without a match are put between the others, so the peaks stay in the order of the spectrum
+            matched = np.zeros(len(mz), dtype=bool)
+            matched[hits['query']] = True
+            unmatched = np.flatnonzero(~matched).tolist()
+            rows += [[spectrum, peak_texts[i], intensity_texts[i], '', '', '', '', ''] for i in unmatched]
+            order = np.argsort(np.array(queries + unmatched, dtype=np.int64), kind='stable')
+            rows = [rows[i] for i in order.tolist()]
+        yield len(mz), rows
+
+#annotate a peak list file against the ions of a table and write the result as csv while it is read
+#progress is called with the number of peaks after every spectrum and can return True to stop
+#returns the number of peaks, the number of annotation rows and the seconds
+def annotate_file(peak_file, output_file, names, formulas, ion_definitions, ppm=None, mda=None, all_peaks=False, round_by=4, progress=None):
+    t0 = perf_counter()
+    index = MassIndex.from_formulas(formulas, ion_definitions)
+    ion_names = [ion.name for ion in ion_definitions]
+    peak_count = 0
+    row_count = 0
+    with open(output_file, 'w', newline = '', encoding = 'utf-8') as outfile:
+        writer = csv.writer(outfile, delimiter = ',')
+        writer.writerow(annotation_header)
+        for peaks, rows in annotate_spectra(read_peaks(peak_file), index, names, formulas, ion_names, ppm, mda, all_peaks, round_by):
+            writer.writerows(rows)
+            peak_count += peaks
+            row_count += len(rows)
+            if progress is not None and progress(peak_count):
+                break
+    return peak_count, row_count, perf_counter() - t0
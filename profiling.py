@@ -0,0 +1,117 @@
+import cProfile
+import json
+import sys
+from contextlib import contextmanager
+from time import perf_counter
+try:
+    import resource
+except ImportError:
+    resource = None
+
+#environment variable that turns the profiler on when the program starts, like MASSCALC_PROFILE=1
+profile_variable = 'MASSCALC_PROFILE'
+
+#peak resident memory of the process in bytes, None where it is not available (Windows)
+#it is read from the operating system, tracing every allocation would slow down what is measured
+def peak_memory():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+#wall time, calls, cells and peak memory of the phases of an operation, e.g. 'calculate' and 'calculate.put_cells'
+#phases nest, the peak memory of a phase is the peak of the process when it ends
+#the main thread is also profiled with cProfile while a phase runs, so the time can be followed into functions
+#phases that end on another event, like a calculation in the background, are started with begin and ended with end
+#turned off every phase costs one check
+class Profiler():
+    def __init__(self, enabled=False):
+        self.enabled = False
+        self.set_enabled(enabled)
+
+    def set_enabled(self, enabled):
+        if enabled and not self.enabled:
+            self.reset()
+        elif not enabled and self.enabled and self.stack:
+            self.profile.disable()
+            self.stack = []
+        self.enabled = enabled
+
+    def reset(self):
+        #name: [calls, seconds, cells, peak bytes]
+        self.phases = {}
+        self.stack = []
+        #name: (seconds, cells, peak bytes, {inner phase: [calls, seconds]}) of the last run
+        self.last = {}
+        self.profile = cProfile.Profile()
+
+    @contextmanager
+    def phase(self, name, cells=0):
+        if not self.enabled:
+            yield
+            return
+        token = self.begin(name, cells)
+        try:
+            yield
+        finally:
+            self.end(token)
+
+    def begin(self, name, cells=0):
+        if not self.enabled:
+            return None
+        if not self.stack:
+            self.profile.enable()
+        frame = {'name': name, 'cells': cells, 'start': perf_counter(), 'phases': {}}
+        self.stack.append(frame)
+        return frame
+
+    #end a phase, cells can be given when they are known only at the end
+    def end(self, token, cells=None):
+        if token is None or not self.enabled or not any(frame is token for frame in self.stack):
+            return
+        seconds = perf_counter() - token['start']
+        peak = peak_memory()
+        cells = token['cells'] if cells is None else cells
+        self.stack = [frame for frame in self.stack if frame is not token]
+        for frame in self.stack:
+            inner = frame['phases'].setdefault(token['name'], [0, 0.0])
+            inner[0] += 1
+            inner[1] += seconds
+        if not self.stack:
+            self.profile.disable()
+        phase = self.phases.setdefault(token['name'], [0, 0.0, 0, None])
+        phase[0] += 1
+        phase[1] += seconds
+        phase[2] += cells
+        phase[3] = peak
+        self.last[token['name']] = (seconds, cells, peak, token['phases'])
+
+    def report(self):
+        phases = {}
+        for name, (calls, seconds, cells, peak) in self.phases.items():
+            phases[name] = {'calls': calls, 'seconds': seconds, 'cells': cells,
+                            'cells_per_second': cells / seconds if cells and seconds > 0 else None,
+                            'peak_memory': peak}
+        return {'phases': phases, 'peak_memory': peak_memory()}
+
+    #one line for the status bar about the last run of an operation and the phases in it
+    def summary(self, name):
+        if not self.enabled or name not in self.last:
+            return ''
+        seconds, cells, peak, phases = self.last[name]
+        text = f'{name} {seconds:.3f} s'
+        if cells:
+            text += f', {cells / max(seconds, 1e-9):.0f} cells/s'
+        if peak is not None:
+            text += f', peak {peak / 2**20:.0f} MB'
+        if phases:
+            text += '    ' + ', '.join(f'{phase} {inner[1]:.3f} s ({inner[0]}x)' for phase, inner in phases.items())
+        return text
+
+    #json with the phases or, for the .prof extension, the cProfile statistics for pstats or snakeviz
+    def export(self, file_name):
+        if file_name.endswith('.prof'):
+            self.profile.dump_stats(file_name)
+            return
+        with open(file_name, 'w', encoding = 'utf-8') as file:
+            json.dump(self.report(), file, indent=1)
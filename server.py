@@ -0,0 +1,223 @@
+import csv
+import io
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+from compound import parse_formula
+from ion_types import parse_ion
+from mass_engine import calc_masses, compiled_ion
+from mz_lookup import MassIndex, parse_tolerance
+from parallel import table_chunk, chunked, worker_count, default_chunk_size, process_context
+from table_csv import HeaderItem, decode_header, default_header_items, read_table, header_row
+
+#local calculation server for scripts and pipelines, it only listens on localhost
+#  python cli.py serve --port 8765 --workers 4
+#requests and responses are json, every request can hold thousands of formulas
+#  POST /masses   {"formulas": ["C6H12O6"], "ions": ["[M+H]+", "[M+Na]+"], "precision": 4}
+#  POST /table    {"csv": "name,compound,neutral,...\n..."}
+#  POST /library  {"name": "sugars", "formulas": [...], "names": [...], "ions": [...]}
+#  POST /lookup   {"mz": [181.0707], "tolerance": "5 ppm", "library": "sugars"} or with formulas, names and ions
+#  GET  /status
+#ions are notations like [M+H]+ or encoded csv headers like name#add#delete#adduct#charge, without ions the columns of a new table are used
+#large requests are split into chunks that are calculated by a pool of worker processes, the pool and its caches of parsed
+#formulas and compiled ions are kept between requests
+local_hosts = ('127.0.0.1', 'localhost', '::1')
+default_port = 8765
+
+#ion definitions of a request, the columns of a new table if there are none
+def read_ions(ions):
+    if ions is None:
+        return default_header_items()[2:]
+    headers = []
+    for ion in ions:
+        if not isinstance(ion, str):
+            raise ValueError(f'{ion!r} is no ion')
+        if '#' in ion:
+            header = decode_header(ion)
+            if header.rt != 'no':
+                raise ValueError(f'{ion!r} is no ion column')
+        else:
+            multiplier, groups, charge = parse_ion(ion)
+            header = HeaderItem(ion, adduct=ion, charge=charge)
+        headers.append(header)
+    return headers
+
+def read_formulas(request, key='formulas'):
+    formulas = request.get(key)
+    if not isinstance(formulas, list) or not all(isinstance(formula, str) for formula in formulas):
+        raise ValueError(f'{key} must be a list of formulas')
+    return formulas
+
+#chunk functions take (context, chunk) like in parallel, the context is sent with every chunk, so one pool serves requests with different ions
+def masses_chunk(context, formulas):
+    ion_definitions, round_by = context
+    return calc_masses(formulas, ion_definitions, round_by)
+
+#m/z, rows and ion columns of a chunk of formulas, rows are numbered from the first formula of the chunk
+def index_chunk(context, formulas):
+    ion_definitions, = context
+    index = MassIndex.from_formulas(formulas, ion_definitions)
+    return index.mz, index.rows, index.columns
+
+class MassServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=default_port, workers=None, chunk_size=default_chunk_size, verbose=False):
+        if host not in local_hosts:
+            raise ValueError(f'The server only listens on localhost, not on {host}')
+        if host == '::1':
+            self.address_family = socket.AF_INET6
+        super().__init__((host, port), RequestHandler)
+        self.workers = worker_count(workers)
+        self.chunk_size = chunk_size
+        self.verbose = verbose
+        #with one worker the chunks are calculated one after another in this process
+        if self.workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=process_context())
+        else:
+            from concurrent.futures import ThreadPoolExecutor
+            self.pool = ThreadPoolExecutor(max_workers=1)
+        #name: (index, names, formulas, ions) of the libraries for lookups
+        self.libraries = {}
+        self.lock = threading.Lock()
+
+    #results of function for every chunk, in the order of the chunks
+    def map_chunks(self, function, items, context):
+        futures = [self.pool.submit(function, context, chunk) for chunk in chunked(items, self.chunk_size)]
+        return [future.result() for future in futures]
+
+    def masses(self, request):
+        formulas = read_formulas(request)
+        ions = read_ions(request.get('ions'))
+        round_by = int(request.get('precision', 4))
+        masses = [row for chunk in self.map_chunks(masses_chunk, formulas, (ions, round_by)) for row in chunk]
+        return {'ions': [ion.name for ion in ions], 'masses': masses}
+
+    #a whole table in the csv format of the GUI, the mass columns are calculated like cli.py batch does
+    def table(self, request):
+        if not isinstance(request.get('csv'), str):
+            raise ValueError('csv must be the text of a table')
+        try:
+            header_items, reader = read_table(io.StringIO(request['csv']))
+        except StopIteration:
+            raise ValueError('csv has no header row') from None
+        round_by = int(request.get('precision', 4))
+        columns = [j for j in range(2, len(header_items)) if header_items[j].rt == 'no']
+        context = ([header_items[j] for j in columns], columns, len(header_items), round_by)
+        text = io.StringIO()
+        csv.writer(text, delimiter = ',').writerow(header_row(header_items))
+        rows = 0
+        for count, chunk in self.map_chunks(table_chunk, list(reader), context):
+            text.write(chunk)
+            rows += count
+        return {'rows': rows, 'csv': text.getvalue()}
+
+    def build_index(self, formulas, ions):
+        parts = self.map_chunks(index_chunk, formulas, (ions,))
+        offsets = np.cumsum([0] + [len(chunk) for chunk in chunked(formulas, self.chunk_size)])
+        return MassIndex(np.concatenate([mz for mz, rows, columns in parts] + [np.zeros(0)]),
+                         np.concatenate([rows + offset for (mz, rows, columns), offset in zip(parts, offsets)] + [np.zeros(0, dtype=np.int64)]),
+                         np.concatenate([columns for mz, rows, columns in parts] + [np.zeros(0, dtype=np.int64)]))
+
+    #keep the index of a library for lookups, a library with the same name is replaced
+    def library(self, request):
+        name = request.get('name')
+        if not isinstance(name, str) or not name:
+            raise ValueError('A library needs a name')
+        formulas = read_formulas(request)
+        names = request.get('names') or [''] * len(formulas)
+        if len(names) != len(formulas):
+            raise ValueError('names and formulas must have the same length')
+        ions = read_ions(request.get('ions'))
+        index = self.build_index(formulas, ions)
+        with self.lock:
+            self.libraries[name] = (index, names, formulas, ions)
+        return {'library': name, 'formulas': len(formulas), 'ions': len(index)}
+
+    #all ions within the tolerance of each observed m/z, of a library or of the formulas of the request
+    def lookup(self, request):
+        observed = request.get('mz')
+        if not isinstance(observed, list) or not all(isinstance(mz, (int, float)) for mz in observed):
+            raise ValueError('mz must be a list of numbers')
+        if 'tolerance' in request:
+            ppm, mda = parse_tolerance(str(request['tolerance']))
+        else:
+            ppm, mda = request.get('ppm'), request.get('mda')
+            if ppm is None and mda is None:
+                ppm = 5
+        if 'library' in request:
+            with self.lock:
+                if request['library'] not in self.libraries:
+                    raise ValueError(f'No library is named {request["library"]!r}')
+                index, names, formulas, ions = self.libraries[request['library']]
+        else:
+            formulas = read_formulas(request)
+            names = request.get('names') or [''] * len(formulas)
+            if len(names) != len(formulas):
+                raise ValueError('names and formulas must have the same length')
+            ions = read_ions(request.get('ions'))
+            index = self.build_index(formulas, ions)
+        hits = index.query(observed, ppm=ppm, mda=mda)
+        #best hit of each observed mass first
+        hits = hits[np.lexsort((np.abs(hits['ppm']), hits['query']))]
+        return {'hits': [{'query': int(hit['query']), 'observed': observed[hit['query']], 'row': int(hit['row']),
+                          'name': names[hit['row']], 'formula': formulas[hit['row']], 'ion': ions[hit['column']].name,
+                          'mz': float(hit['mz']), 'ppm': float(hit['ppm'])} for hit in hits]}
+
+    #every worker process has its own caches and a pool can not ask a given worker, so only the caches of the server process
+    #are reported, they cover all chunks only with one worker
+    def status(self):
+        with self.lock:
+            libraries = {name: len(library[2]) for name, library in self.libraries.items()}
+        return {'workers': self.workers, 'chunk_size': self.chunk_size, 'libraries': libraries,
+                'main_process_caches': {'parse_formula': parse_formula.cache_info()._asdict(), 'compiled_ion': compiled_ion.cache_info()._asdict()}}
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=True, cancel_futures=True)
+
+class RequestHandler(BaseHTTPRequestHandler):
+    routes = {'/masses': MassServer.masses, '/table': MassServer.table, '/library': MassServer.library, '/lookup': MassServer.lookup}
+
+    def do_GET(self):
+        if self.path != '/status':
+            self.send_json(404, {'error': f'Unknown path {self.path}'})
+            return
+        self.send_json(200, self.server.status())
+
+    def do_POST(self):
+        if self.path not in self.routes:
+            self.send_json(404, {'error': f'Unknown path {self.path}'})
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            if not isinstance(request, dict):
+                raise ValueError('The request must be a json object')
+            response = self.routes[self.path](self.server, request)
+        except (ValueError, TypeError) as error:
+            self.send_json(400, {'error': str(error)})
+            return
+        self.send_json(200, response)
+
+    def send_json(self, status, content):
+        body = json.dumps(content).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+#run the server until it is stopped with ctrl+c
+def serve(host='127.0.0.1', port=default_port, workers=None, chunk_size=default_chunk_size, verbose=False):
+    with MassServer(host, port, workers, chunk_size, verbose) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
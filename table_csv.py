@@ -0,0 +1,50 @@
+import csv
+
+#the first columns of every table, only the columns after them are encoded in the csv header
+fixed_columns = 3
+
+class HeaderItem():
+    def __init__(self, name, add='', delete ='', adduct = '', charge='', rt = 'no', descriptor = ''):
+        self.name = name 
+        self.add = add
+        self.delete = delete
+        self.adduct = adduct
+        self.charge = charge
+        self.rt = rt
+        #a descriptor like rdbe or kmd:CH2 is computed from the ion of the column instead of its m/z, see mass_engine
+        self.descriptor = descriptor
+
+def default_header_items():
+    return [HeaderItem('name'),
+            HeaderItem('compound'),
+            HeaderItem('neutral', charge = 0),
+            HeaderItem('[M-H]-', charge= -1),
+            HeaderItem('[M+H]+',  charge= 1),
+            HeaderItem('[M+Na]+', adduct = 'Na', charge= 1),
+            HeaderItem('[M+K]+', adduct = 'K', charge= 1)]
+
+#header text is name#add#delete#adduct#charge#rt#descriptor, rt and descriptor are optional
+#a plain column name without the encoding is kept as a text column
+def decode_header(text):
+    content = text.split('#')
+    if len(content) < 5:
+        return HeaderItem(content[0], rt = 'yes')
+    rt = content[5] if len(content) > 5 else 'no'
+    descriptor = content[6] if len(content) > 6 else ''
+    return HeaderItem(content[0], add=content[1], delete=content[2], adduct=content[3], charge=content[4], rt = rt, descriptor = descriptor)
+
+#the descriptor is only written for descriptor columns, so other headers read the same in older versions
+def encode_header(header):
+    text = header.name+'#'+header.add+'#'+header.delete+'#'+header.adduct+'#'+str(header.charge)+'#'+header.rt
+    return text+'#'+header.descriptor if header.descriptor else text
+
+def header_items_from_row(headers):
+    return default_header_items()[:fixed_columns] + [decode_header(text) for text in headers[fixed_columns:]]
+
+def header_row(header_items):
+    return ['name', 'compound', 'neutral'] + [encode_header(header) for header in header_items[fixed_columns:]]
+
+#read the header of a csv file and return the header items and a reader for the remaining rows
+def read_table(csvfile):
+    reader = csv.reader(csvfile, delimiter = ',')
+    return header_items_from_row(next(reader)), reader
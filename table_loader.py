@@ -0,0 +1,59 @@
+import csv
+import threading
+from itertools import islice
+import numpy as np
+from PyQt5 import QtCore
+from compound import elements
+from mass_engine import mass_matrix, parse_masses
+from parallel import default_chunk_size
+
+#reads the rows of a csv table on a worker thread and sends them to the table in chunks
+#the first chunk is small, so the first rows are shown while the rest of the file is read
+#masses stored in the file are read back where possible, the other rows are marked for a calculation
+class TableLoadThread(QtCore.QThread):
+    #(names, formulas, cells by column number, rows that need a calculation)
+    chunkReady = QtCore.pyqtSignal(object)
+    failed = QtCore.pyqtSignal(str)
+
+    def __init__(self, file_name, header_items, chunk_size=default_chunk_size, first_chunk_size=1000, parent=None):
+        super(TableLoadThread, self).__init__(parent)
+        self.file_name = file_name
+        self.header_items = list(header_items)
+        self.chunk_size = chunk_size
+        self.first_chunk_size = first_chunk_size
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def run(self):
+        mass_columns = [j for j in range(2, len(self.header_items)) if self.header_items[j].rt == 'no']
+        text_columns = [j for j in range(2, len(self.header_items)) if self.header_items[j].rt == 'yes']
+        divisors = mass_matrix(np.zeros((0, len(elements)), dtype=np.int64), [self.header_items[j] for j in mass_columns])[1]
+        width = len(self.header_items)
+        try:
+            with open(self.file_name, 'r', encoding = 'utf-8') as csvfile:
+                reader = csv.reader(csvfile, delimiter = ',')
+                next(reader, None)
+                chunk_size = self.first_chunk_size
+                while not self.cancelled.is_set():
+                    rows = list(islice(reader, chunk_size))
+                    if not rows:
+                        return
+                    self.chunkReady.emit(self.parse_chunk(rows, width, mass_columns, text_columns, divisors))
+                    chunk_size = self.chunk_size
+        except (OSError, UnicodeDecodeError, csv.Error) as error:
+            self.failed.emit(str(error))
+
+    @staticmethod
+    def parse_chunk(rows, width, mass_columns, text_columns, divisors):
+        for row in rows:
+            if len(row) < width:
+                row.extend([''] * (width - len(row)))
+        cells = {j: [row[j] for row in rows] for j in text_columns}
+        calculate = np.zeros(len(rows), dtype=bool)
+        for j, divisor in zip(mass_columns, divisors):
+            numerators, states, read = parse_masses([row[j] for row in rows], int(divisor))
+            cells[j] = (numerators, states, int(divisor))
+            calculate |= ~read
+        return [row[0] for row in rows], [row[1] for row in rows], cells, calculate
@@ -0,0 +1,376 @@
+import numpy as np
+from PyQt5 import QtCore, QtGui
+from mass_engine import mass_states, mass_text, round_masses, format_masses, EMPTY, MASS, NA, state_texts
+from table_search import SearchIndex
+
+#an ion column, masses are exact micro-Dalton numerators and only formatted when they are displayed
+class MassColumn():
+    __slots__ = ('numerators', 'states', 'divisor')
+
+    def __init__(self, rows=0):
+        self.numerators = np.zeros(rows, dtype=np.int64)
+        self.states = np.zeros(rows, dtype=np.int8)
+        self.divisor = 1
+
+    def __len__(self):
+        return len(self.states)
+
+    def insert(self, row, count):
+        self.numerators = np.insert(self.numerators, row, np.zeros(count, dtype=np.int64))
+        self.states = np.insert(self.states, row, np.zeros(count, dtype=np.int8))
+
+    def remove(self, row, count):
+        self.numerators = np.delete(self.numerators, np.s_[row:row + count])
+        self.states = np.delete(self.states, np.s_[row:row + count])
+
+#table data of the main window in columns
+#names, formulas and retention times are lists of text, ion columns are MassColumns
+class MassTableModel(QtCore.QAbstractTableModel):
+    #emitted when the user edited a cell, not when the table is changed by the program
+    cellEdited = QtCore.pyqtSignal(int, int)
+
+    def __init__(self, header_items, round_by=4, parent=None):
+        super(MassTableModel, self).__init__(parent)
+        self.header_items = list(header_items)
+        self.columns = [self.new_column(header, i, 0) for i, header in enumerate(self.header_items)]
+        self.invalid = np.zeros(0, dtype=bool)
+        #highlighted rows as a boolean mask per column
+        self.highlighted = {}
+        self.changes = []
+        self.round_by = round_by
+        self.search_index = SearchIndex(self)
+
+        #changes whenever rows or columns are inserted or removed, row and column numbers are only valid for one layout
+        self.layout_version = 0
+
+        self.header_font = QtGui.QFont()
+        self.header_font.setPointSize(14)
+        self.header_font.setBold(True)
+        self.header_font.setFamily("Consolas")
+
+    @staticmethod
+    def new_column(header, index, rows):
+        if index < 2 or header.rt == 'yes':
+            return [''] * rows
+        return MassColumn(rows)
+
+    def is_mass_column(self, column):
+        return isinstance(self.columns[column], MassColumn)
+
+    #Qt model interface
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.invalid)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        row = index.row()
+        column = index.column()
+        if role in (QtCore.Qt.DisplayRole, QtCore.Qt.EditRole):
+            return self.text(row, column)
+        elif role == QtCore.Qt.TextAlignmentRole:
+            if column < 2:
+                return QtCore.Qt.AlignLeft | QtCore.Qt.AlignVCenter
+            if self.is_mass_column(column) and self.columns[column].states[row] == NA:
+                return QtCore.Qt.AlignCenter
+            return QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter
+        elif role == QtCore.Qt.ForegroundRole:
+            if column == 1 and self.invalid[row]:
+                return QtGui.QBrush(QtGui.QColor(240, 71, 71))
+        elif role == QtCore.Qt.BackgroundRole:
+            if column in self.highlighted and self.highlighted[column][row]:
+                return QtGui.QBrush(QtGui.QColor(255, 191, 0))
+        return None
+
+    def setData(self, index, value, role=QtCore.Qt.EditRole):
+        if role != QtCore.Qt.EditRole or self.is_mass_column(index.column()):
+            return False
+        if value == self.text(index.row(), index.column()):
+            return False
+        self.set_text(index.row(), index.column(), value)
+        self.cellEdited.emit(index.row(), index.column())
+        return True
+
+    def flags(self, index):
+        if self.is_mass_column(index.column()):
+            return QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable
+        return QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable | QtCore.Qt.ItemIsEditable
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if orientation == QtCore.Qt.Vertical:
+            return section + 1 if role == QtCore.Qt.DisplayRole else None
+        if role == QtCore.Qt.DisplayRole:
+            return self.header_items[section].name
+        elif role == QtCore.Qt.FontRole:
+            return self.header_font
+        elif role == QtCore.Qt.ForegroundRole:
+            return QtGui.QBrush(QtGui.QColor(85, 85, 85))
+        return None
+
+    #row changes are recorded for undo, see undo_changes
+    def insertRows(self, row, count, parent=QtCore.QModelIndex()):
+        self.insert_rows(row, count)
+        self.record(('insert', row, count))
+        return True
+
+    def removeRows(self, row, count, parent=QtCore.QModelIndex()):
+        rows = range(row, row + count)
+        self.record(('remove', row, count, [self.get_cells(j, rows) for j in range(self.columnCount())], self.invalid[row:row + count].copy()))
+        self.remove_rows(row, count)
+        return True
+
+    def setRowCount(self, rows):
+        if rows > self.rowCount():
+            self.insertRows(self.rowCount(), rows - self.rowCount())
+        elif rows < self.rowCount():
+            self.removeRows(rows, self.rowCount() - rows)
+
+    def insert_rows(self, row, count):
+        self.beginInsertRows(QtCore.QModelIndex(), row, row + count - 1)
+        for column in self.columns:
+            if isinstance(column, MassColumn):
+                column.insert(row, count)
+            else:
+                column[row:row] = [''] * count
+        self.invalid = np.insert(self.invalid, row, np.zeros(count, dtype=bool))
+        self.highlighted = {}
+        self.search_index.rows_inserted(row, count)
+        self.layout_version += 1
+        self.endInsertRows()
+
+    def remove_rows(self, row, count):
+        self.beginRemoveRows(QtCore.QModelIndex(), row, row + count - 1)
+        for column in self.columns:
+            if isinstance(column, MassColumn):
+                column.remove(row, count)
+            else:
+                del column[row:row + count]
+        self.invalid = np.delete(self.invalid, np.s_[row:row + count])
+        self.highlighted = {}
+        self.search_index.rows_removed(row, count)
+        self.layout_version += 1
+        self.endRemoveRows()
+
+    #add rows at the end without recording them, e.g. while a file is read in chunks
+    #cells are the values of other columns by column number like get_cells returns them, missing columns stay empty
+    def append_rows(self, names, formulas, cells):
+        row = self.rowCount()
+        count = len(formulas)
+        if count == 0:
+            return
+        self.beginInsertRows(QtCore.QModelIndex(), row, row + count - 1)
+        for j, column in enumerate(self.columns):
+            values = names if j == 0 else formulas if j == 1 else cells.get(j)
+            if isinstance(column, MassColumn):
+                if values is None:
+                    column.insert(row, count)
+                else:
+                    column.numerators = np.concatenate([column.numerators, values[0]])
+                    column.states = np.concatenate([column.states, values[1]])
+                    column.divisor = values[2]
+            else:
+                column.extend(values if values is not None else [''] * count)
+        self.invalid = np.concatenate([self.invalid, np.zeros(count, dtype=bool)])
+        self.highlighted = {}
+        self.search_index.rows_inserted(row, count)
+        self.layout_version += 1
+        self.endInsertRows()
+
+    #all columns like get_cells returns them, without a copy, e.g. to write a project file
+    def table_columns(self):
+        return [(data.numerators, data.states, data.divisor) if isinstance(data, MassColumn) else data for data in self.columns]
+
+    #values of some cells of a column, text or (numerators, states, divisor)
+    def get_cells(self, column, rows):
+        data = self.columns[column]
+        if isinstance(data, MassColumn):
+            rows = np.asarray(rows, dtype=np.int64)
+            return data.numerators[rows], data.states[rows], data.divisor
+        return [data[i] for i in rows]
+
+    def put_cells(self, column, rows, values):
+        data = self.columns[column]
+        if isinstance(data, MassColumn):
+            rows = np.asarray(rows, dtype=np.int64)
+            data.numerators[rows], data.states[rows], data.divisor = values
+        else:
+            for i, value in zip(rows, values):
+                data[i] = value
+        self.search_index.cells_changed(column, rows)
+        if len(rows):
+            self.dataChanged.emit(self.index(int(np.min(rows)), column), self.index(int(np.max(rows)), column))
+
+    def put_invalid(self, rows, values):
+        self.invalid[np.asarray(rows, dtype=np.int64)] = values
+        if len(rows):
+            self.dataChanged.emit(self.index(int(np.min(rows)), 1), self.index(int(np.max(rows)), 1))
+
+    def set_columns(self, header_items, columns):
+        self.beginResetModel()
+        self.header_items = list(header_items)
+        self.columns = list(columns)
+        self.highlighted = {}
+        self.search_index.reset()
+        self.layout_version += 1
+        self.endResetModel()
+
+    #Undo/Redo
+    #every change of the table is recorded with the old and the new values of the cells it touched
+    #the records since the last take_changes are one step of the undo history
+    def record(self, change):
+        self.changes.append(change)
+
+    def take_changes(self):
+        changes = self.changes
+        self.changes = []
+        return changes
+
+    def undo_changes(self, changes):
+        for change in reversed(changes):
+            kind = change[0]
+            if kind == 'cells':
+                self.put_cells(change[1], change[2], change[3])
+            elif kind == 'invalid':
+                self.put_invalid(change[1], change[2])
+            elif kind == 'insert':
+                self.remove_rows(change[1], change[2])
+            elif kind == 'remove':
+                row, count, values, invalid = change[1:]
+                self.insert_rows(row, count)
+                rows = range(row, row + count)
+                for j, column_values in enumerate(values):
+                    self.put_cells(j, rows, column_values)
+                self.put_invalid(rows, invalid)
+            elif kind == 'header':
+                self.set_columns(change[1], change[2])
+            elif kind == 'precision':
+                self.show_precision(change[1])
+
+    def redo_changes(self, changes):
+        for change in changes:
+            kind = change[0]
+            if kind == 'cells':
+                self.put_cells(change[1], change[2], change[4])
+            elif kind == 'invalid':
+                self.put_invalid(change[1], change[3])
+            elif kind == 'insert':
+                self.insert_rows(change[1], change[2])
+            elif kind == 'remove':
+                self.remove_rows(change[1], change[2])
+            elif kind == 'header':
+                self.set_columns(change[3], change[4])
+            elif kind == 'precision':
+                self.show_precision(change[2])
+
+    #cell access
+    def text(self, row, column):
+        data = self.columns[column]
+        if isinstance(data, MassColumn):
+            state = data.states[row]
+            if state == MASS:
+                return mass_text(data.numerators[row], data.divisor, self.round_by)
+            return state_texts[state]
+        return data[row]
+
+    #set a cell without cellEdited, a mass cell can only be cleared
+    def set_text(self, row, column, text):
+        before = self.get_cells(column, [row])
+        if self.is_mass_column(column):
+            if text != '':
+                return
+            after = (before[0], np.array([EMPTY], dtype=np.int8), before[2])
+        else:
+            after = [text]
+        self.put_cells(column, [row], after)
+        self.record(('cells', column, [row], before, after))
+        if column == 1 and self.invalid[row]:
+            self.put_invalid([row], False)
+            self.record(('invalid', [row], True, False))
+
+    #set text cells of a column as one recorded change, e.g. many new rows at once
+    def set_texts(self, column, rows, texts):
+        before = self.get_cells(column, rows)
+        after = list(texts)
+        self.put_cells(column, rows, after)
+        self.record(('cells', column, rows, before, after))
+
+    #texts of a whole column, mass columns are formatted in one batch
+    def column_texts(self, column):
+        data = self.columns[column]
+        if not isinstance(data, MassColumn):
+            return data
+        rounded = round_masses(data.numerators, data.divisor, self.round_by)
+        texts = format_masses(rounded, data.numerators, self.round_by)
+        for i in np.flatnonzero(data.states != MASS):
+            texts[i] = state_texts[data.states[i]]
+        return texts
+
+    #all rows as lists of text, e.g. to write a csv file
+    def rows(self):
+        return zip(*[self.column_texts(j) for j in range(self.columnCount())])
+
+    #fill the table with names, formulas and texts of other columns by column number, all other cells are empty
+    #this starts a new table, the recorded changes are dropped
+    def set_compounds(self, names, formulas, texts=None):
+        self.beginResetModel()
+        self.columns = [self.new_column(header, i, len(formulas)) for i, header in enumerate(self.header_items)]
+        self.columns[0] = list(names)
+        self.columns[1] = list(formulas)
+        for j, values in (texts or {}).items():
+            self.columns[j] = list(values)
+        self.invalid = np.zeros(len(formulas), dtype=bool)
+        self.highlighted = {}
+        self.search_index.reset()
+        self.changes = []
+        self.layout_version += 1
+        self.endResetModel()
+
+    #keep the data of all header items that are still there and add empty columns for new ones
+    #the columns of removed header items are kept in the record
+    def set_header_items(self, header_items):
+        old = {id(header): column for header, column in zip(self.header_items, self.columns)}
+        columns = [old[id(header)] if id(header) in old else self.new_column(header, i, self.rowCount()) for i, header in enumerate(header_items)]
+        self.record(('header', self.header_items, self.columns, list(header_items), columns))
+        self.set_columns(header_items, columns)
+
+    def set_precision(self, round_by):
+        self.record(('precision', self.round_by, round_by))
+        self.show_precision(round_by)
+
+    def show_precision(self, round_by):
+        self.round_by = round_by
+        self.search_index.precision_changed()
+        self.dataChanged.emit(self.index(0, 0), self.index(self.rowCount() - 1, self.columnCount() - 1))
+
+    #highlight rows per column, e.g. the result of search_index.search, only the rows between the first and last changed cell are repainted
+    def set_highlighted(self, found):
+        old = self.highlighted
+        self.highlighted = {}
+        for column, rows in found.items():
+            self.highlighted[column] = np.zeros(self.rowCount(), dtype=bool)
+            self.highlighted[column][rows] = True
+        for column in set(old) | set(self.highlighted):
+            changed = np.flatnonzero(old.get(column, False) ^ self.highlighted.get(column, np.zeros(self.rowCount(), dtype=bool)))
+            if len(changed):
+                self.dataChanged.emit(self.index(int(changed[0]), column), self.index(int(changed[-1]), column), [QtCore.Qt.BackgroundRole])
+
+    #calculate the mass columns of the given rows in one batch, invalid formulas are marked
+    def calculate(self, rows, columns):
+        if not len(rows) or not columns:
+            return
+        formulas = [self.columns[1][i] for i in rows]
+        self.put_masses(rows, columns, mass_states(formulas, [self.header_items[j] for j in columns]))
+
+    #put a result of mass_states into the table
+    def put_masses(self, rows, columns, result):
+        numerators, states, divisors, invalid = result
+        rows = np.asarray(rows, dtype=np.int64)
+        for k, j in enumerate(columns):
+            before = self.get_cells(j, rows)
+            after = (numerators[:, k], states[:, k], int(divisors[k]))
+            self.put_cells(j, rows, after)
+            self.record(('cells', j, rows, before, after))
+        before = self.invalid[rows]
+        self.put_invalid(rows, invalid)
+        self.record(('invalid', rows, before, invalid))
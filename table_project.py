@@ -0,0 +1,102 @@
+import json
+import os
+import struct
+import numpy as np
+from compound import elements, element_index
+from table_csv import HeaderItem
+
+#project files store a table as raw arrays in columns, so it can be opened without parsing or calculating
+#layout: magic, length of a json description, the description, then the arrays, each aligned to 64 bytes
+#the description has the header items, the precision and dtype, shape and offset of every array
+#offsets are counted from the first aligned position after the description
+#names, formulas and text columns are utf-8 with \0 between the rows, formulas are also stored as element counts
+#mass columns are the exact micro-Dalton numerators and cell states of the table, no mass is rounded
+project_magic = b'MASSCALC'
+project_version = 1
+alignment = 64
+
+def aligned(size):
+    return -(-size // alignment) * alignment
+
+def text_array(texts):
+    return np.frombuffer('\0'.join(texts).encode('utf-8'), dtype=np.uint8)
+
+def array_texts(array, rows):
+    if rows == 0:
+        return []
+    return array.tobytes().decode('utf-8').split('\0')
+
+#write a table, columns are text lists or (numerators, states, divisor) like MassTableModel.get_cells returns them
+#counts are the element counts of the formulas like count_matrix returns them
+#the file is written next to path and then replaces it, so a failed save keeps the old file
+def write_project(path, header_items, columns, invalid, counts, round_by):
+    present = np.flatnonzero(np.asarray(counts).any(axis=0))
+    arrays = {'invalid': np.asarray(invalid, dtype=np.bool_),
+              'counts': np.asarray(counts)[:, present].astype('<i4')}
+    description = {'version': project_version,
+                   'rows': len(invalid),
+                   'round_by': round_by,
+                   'elements': [elements[i] for i in present],
+                   'header': [],
+                   'arrays': {}}
+    for j, (header, column) in enumerate(zip(header_items, columns)):
+        item = {'name': header.name, 'add': header.add, 'delete': header.delete, 'adduct': header.adduct, 'charge': str(header.charge), 'rt': header.rt}
+        if header.descriptor:
+            item['descriptor'] = header.descriptor
+        if isinstance(column, tuple):
+            numerators, states, divisor = column
+            item['divisor'] = int(divisor)
+            arrays[f'numerators{j}'] = np.asarray(numerators, dtype='<i8')
+            arrays[f'states{j}'] = np.asarray(states, dtype='|i1')
+        else:
+            arrays[f'texts{j}'] = text_array(column)
+        description['header'].append(item)
+    offset = 0
+    for name, array in arrays.items():
+        description['arrays'][name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset += aligned(array.nbytes)
+    encoded = json.dumps(description).encode('utf-8')
+
+    temp = path + '.tmp'
+    with open(temp, 'wb') as file:
+        file.write(project_magic + struct.pack('<Q', len(encoded)) + encoded)
+        file.write(b'\0' * (aligned(file.tell()) - file.tell()))
+        for array in arrays.values():
+            file.write(np.ascontiguousarray(array).tobytes())
+            file.write(b'\0' * (aligned(array.nbytes) - array.nbytes))
+    os.replace(temp, path)
+
+#read a table written by write_project, returns the header items, columns, invalid, element counts and precision
+#mass columns and counts are memory mapped with mmap_mode ('r', 'c' or None to read them into memory)
+#element counts are (element indices, counts), only elements that occur in a formula have a column
+def read_project(path, mmap_mode='r'):
+    with open(path, 'rb') as file:
+        if file.read(len(project_magic)) != project_magic:
+            raise ValueError(f'{path} is not a project file')
+        length, = struct.unpack('<Q', file.read(8))
+        description = json.loads(file.read(length).decode('utf-8'))
+        start = aligned(len(project_magic) + 8 + length)
+        if description['version'] > project_version:
+            raise ValueError(f'{path} was written by a newer version')
+
+        def load(name):
+            entry = description['arrays'][name]
+            dtype = np.dtype(entry['dtype'])
+            shape = tuple(entry['shape'])
+            if mmap_mode is None or np.prod(shape) == 0:
+                file.seek(start + entry['offset'])
+                return np.fromfile(file, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+            return np.memmap(path, dtype=dtype, mode=mmap_mode, offset=start + entry['offset'], shape=shape)
+
+        rows = description['rows']
+        header_items = []
+        columns = []
+        for j, item in enumerate(description['header']):
+            header_items.append(HeaderItem(item['name'], add=item['add'], delete=item['delete'], adduct=item['adduct'], charge=item['charge'], rt=item['rt'],
+                                           descriptor=item.get('descriptor', '')))
+            if 'divisor' in item:
+                columns.append((load(f'numerators{j}'), load(f'states{j}'), item['divisor']))
+            else:
+                columns.append(array_texts(load(f'texts{j}'), rows))
+        counts = ([element_index[e] for e in description['elements']], load('counts'))
+        return header_items, columns, np.array(load('invalid')), counts, description['round_by']
@@ -0,0 +1,189 @@
+import re
+import numpy as np
+from compound import elements, parse_formula, FormulaError
+from mass_engine import count_matrix, SCALE, MASS
+from mz_lookup import parse_tolerance
+
+number = r'([0-9]*\.?[0-9]+)'
+#m/z 301.1, m/z 301.1±5ppm, m/z 301.1 +- 2 mDa, m/z 300-302, mz and mass work like m/z
+mass_query = re.compile(r'(?:m/z|mz|mass)\s*' + number + r'\s*(?:(?:±|\+/?-)\s*(' + number[1:-1] + r'\s*(?:ppm|mda)?)|-\s*' + number + r')?', re.IGNORECASE)
+#name contains glc, formula contains N2
+contains_query = re.compile(r'(name|formula)\s+contains\s+(.+)', re.IGNORECASE)
+#/regex/ or re:regex
+regex_query = re.compile(r'/(.+)/|re:(.+)', re.IGNORECASE)
+
+#parse a search term into (kind, arguments), raises ValueError for an invalid query
+#kinds are 'range' (low, high), 'composition' (counts), 'regex' (pattern, columns) and 'text' (term, columns)
+#columns None means all columns
+def parse_query(text):
+    text = text.strip()
+    match = mass_query.fullmatch(text)
+    if match:
+        value = float(match[1])
+        if match[3]:
+            return 'range', (value, float(match[3]))
+        if match[2]:
+            ppm, mda = parse_tolerance(match[2])
+            tolerance = value * ppm * 1e-6 if ppm is not None else mda * 1e-3
+        else:
+            #without a tolerance every mass that is displayed like the value matches
+            decimals = len(match[1].partition('.')[2])
+            tolerance = 0.5 * 10**-decimals
+        return 'range', (value - tolerance, value + tolerance)
+    match = contains_query.fullmatch(text)
+    if match:
+        column = 0 if match[1].lower() == 'name' else 1
+        term = match[2].strip()
+        if column == 1:
+            try:
+                return 'composition', (parse_formula(term).counts,)
+            except FormulaError:
+                pass
+        return 'text', (term.lower(), [column])
+    match = regex_query.fullmatch(text)
+    if match:
+        try:
+            pattern = re.compile(match[1] or match[2], re.IGNORECASE | re.MULTILINE)
+        except re.error as error:
+            raise ValueError(f'Invalid regular expression: {error}')
+        return 'regex', (pattern, None)
+    return 'text', (text.lower(), None)
+
+#search index over the columns of a table model
+#text of every column is kept lowercased and joined, so substrings and regular expressions are found in one scan
+#mass columns also have a sorted m/z array for ranges and the formulas an element count matrix
+#the model reports changed cells and rows, only the parts of the index they touch are updated or rebuilt on the next search
+class SearchIndex():
+    def __init__(self, source):
+        self.source = source
+        self.reset()
+
+    def reset(self):
+        self.texts = {}
+        self.blobs = {}
+        self.masses = {}
+        self.counts = None
+        self.stored_counts = None
+
+    #element counts that were stored with the table as (element indices, counts), e.g. in a project file
+    #they replace parsing the formulas until the rows change
+    def set_element_counts(self, indices, counts):
+        self.counts = None
+        self.stored_counts = (indices, counts)
+
+    def cells_changed(self, column, rows):
+        self.blobs.pop(column, None)
+        if self.source.is_mass_column(column):
+            self.texts.pop(column, None)
+            self.masses.pop(column, None)
+            return
+        data = self.source.columns[column]
+        if column in self.texts:
+            texts = self.texts[column]
+            for i in rows:
+                texts[i] = data[i].lower()
+        if column == 1:
+            self.stored_counts = None
+        if column == 1 and self.counts is not None and len(rows):
+            self.counts[np.asarray(rows, dtype=np.int64)] = count_matrix([data[i] for i in rows])[0]
+
+    def rows_inserted(self, row, count):
+        for column in list(self.texts):
+            if self.source.is_mass_column(column):
+                del self.texts[column]
+            else:
+                self.texts[column][row:row] = [text.lower() for text in self.source.columns[column][row:row + count]]
+        if self.counts is not None:
+            self.counts = np.insert(self.counts, row, count_matrix(self.source.columns[1][row:row + count])[0], axis=0)
+        self.stored_counts = None
+        self.blobs = {}
+        self.masses = {}
+
+    def rows_removed(self, row, count):
+        for texts in self.texts.values():
+            del texts[row:row + count]
+        if self.counts is not None:
+            self.counts = np.delete(self.counts, np.s_[row:row + count], axis=0)
+        self.stored_counts = None
+        self.blobs = {}
+        self.masses = {}
+
+    #mass texts depend on the precision
+    def precision_changed(self):
+        for column in range(self.source.columnCount()):
+            if self.source.is_mass_column(column):
+                self.texts.pop(column, None)
+                self.blobs.pop(column, None)
+
+    def column_text(self, column):
+        if column not in self.blobs:
+            if column not in self.texts:
+                self.texts[column] = [text.lower() for text in self.source.column_texts(column)]
+            texts = self.texts[column]
+            starts = np.zeros(len(texts) + 1, dtype=np.int64)
+            np.cumsum([len(text) + 1 for text in texts], out=starts[1:])
+            self.blobs[column] = ('\n'.join(texts), starts)
+        return self.blobs[column]
+
+    def mass_column(self, column):
+        if column not in self.masses:
+            data = self.source.columns[column]
+            rows = np.flatnonzero(data.states == MASS)
+            mz = data.numerators[rows] / (data.divisor * SCALE)
+            order = np.argsort(mz, kind='stable')
+            self.masses[column] = (mz[order], rows[order])
+        return self.masses[column]
+
+    def element_counts(self):
+        if self.counts is None and self.stored_counts is not None:
+            indices, counts = self.stored_counts
+            self.counts = np.zeros((len(counts), len(elements)), dtype=np.int64)
+            self.counts[:, indices] = counts
+        elif self.counts is None:
+            self.counts = count_matrix(self.source.columns[1])[0]
+        return self.counts
+
+    #rows of a column that contain term, every row is found once
+    def find_text(self, column, term):
+        text, starts = self.column_text(column)
+        rows = []
+        position = text.find(term)
+        while position >= 0:
+            row = int(np.searchsorted(starts, position, 'right')) - 1
+            rows.append(row)
+            position = text.find(term, starts[row + 1])
+        return np.array(rows, dtype=np.int64)
+
+    #rows of a column with a match of pattern within the cell text
+    def find_regex(self, column, pattern):
+        text, starts = self.column_text(column)
+        #each row is searched on its own slice of the text, so no match crosses into the next row
+        starts = starts.tolist()
+        search = pattern.search
+        rows = [row for row in range(len(starts) - 1) if search(text, starts[row], starts[row + 1] - 1)]
+        return np.array(rows, dtype=np.int64)
+
+    def find_range(self, column, low, high):
+        mz, rows = self.mass_column(column)
+        return np.sort(rows[np.searchsorted(mz, low, 'left'):np.searchsorted(mz, high, 'right')])
+
+    def find_composition(self, counts):
+        counts = np.asarray(counts, dtype=np.int64)
+        needed = np.flatnonzero(counts)
+        return np.flatnonzero((self.element_counts()[:, needed] >= counts[needed]).all(axis=1))
+
+    #matching rows per column for a search term, columns without a match are left out
+    #mass ranges are only searched in the ion columns, descriptor columns hold no m/z
+    def search(self, text):
+        kind, arguments = parse_query(text)
+        columns = range(self.source.columnCount())
+        if kind == 'range':
+            found = {j: self.find_range(j, *arguments) for j in columns
+                     if self.source.is_mass_column(j) and not self.source.header_items[j].descriptor}
+        elif kind == 'composition':
+            found = {1: self.find_composition(*arguments)} if self.source.columnCount() > 1 else {}
+        else:
+            term, selected = arguments
+            find = self.find_regex if kind == 'regex' else self.find_text
+            found = {j: find(j, term) for j in (selected if selected is not None else columns)}
+        return {j: rows for j, rows in found.items() if len(rows)}
@@ -0,0 +1,254 @@
+import os
+import sys
+import tempfile
+import re
+import unittest
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PyQt5 import QtCore, QtWidgets
+import MassCalculator
+import calculation
+from isotopes import table_patterns, pattern_rows
+
+#the buttons and menu actions of the main window and its dialogs are clicked like a user would
+#  python -m pytest test_gui.py   or   python -m unittest test_gui
+#the window runs with the offscreen Qt platform, so no screen is needed
+
+def setUpModule():
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+    MassCalculator.app = app
+    MassCalculator.win = MassCalculator.MainWindow()
+
+#run the events until the table is loaded and calculated
+def wait():
+    win = MassCalculator.win
+    while win.loading is not None or win.calculation is not None:
+        MassCalculator.app.processEvents()
+
+#answer the next modal dialog of dialog_class with the texts of its fields
+def answer(dialog_class, **texts):
+    def fill():
+        w = MassCalculator.win.dialogs[dialog_class]
+        for name, text in texts.items():
+            getattr(w, name).setText(text)
+        w.accept()
+    QtCore.QTimer.singleShot(0, fill)
+
+#a new table of names and formulas
+def new_table(names, formulas):
+    win = MassCalculator.win
+    wait()
+    win.model.set_compounds(names, formulas)
+    win.dirty.all_changed()
+    win.add_undo('Test')
+
+class BuilderTest(unittest.TestCase):
+    def test_add_button(self):
+        win = MassCalculator.win
+        new_table(['GlcNAc', 'MurNAc'], ['C8H15NO6', 'C11H19NO8'])
+        win.inputBuilderCalculation.setText('1+2')
+        win.btnAddBuilder.click()
+        self.assertEqual([formula for formula in win.model.column_texts(1) if formula], ['C8H15NO6', 'C11H19NO8', 'C19H32N2O13'])
+
+class FormulaSearchTest(unittest.TestCase):
+    def test_search_button(self):
+        w = MassCalculator.FormulaSearchDialog()
+        w.inputMz.setText('180.0634')
+        w.inputTolerance.setText('5 ppm')
+        w.inputElements.setText('C10 H20 O10')
+        w.comboIon.setCurrentIndex(0)
+        w.btnSearch.click()
+        #the search runs on a worker thread, the window stays responsive
+        self.assertFalse(w.btnSearch.isEnabled())
+        while w.search_thread is not None:
+            MassCalculator.app.processEvents()
+        self.assertIn('C6H12O6', [candidate.formula for candidate in w.candidates])
+        self.assertEqual(w.tableCandidates.rowCount(), len(w.candidates))
+
+    def test_invalid_limits(self):
+        w = MassCalculator.FormulaSearchDialog()
+        w.inputMz.setText('180.0634')
+        w.inputTolerance.setText('5 ppm')
+        for limits in ('C10-5', ''):
+            w.inputElements.setText(limits)
+            w.btnSearch.click()
+            while w.search_thread is not None:
+                MassCalculator.app.processEvents()
+            self.assertIn('#f04747', w.inputElements.styleSheet())
+            self.assertEqual(w.candidates, [])
+
+class UndoTest(unittest.TestCase):
+    def test_calculate_saved_table(self):
+        win = MassCalculator.win
+        win.btnCalculate.click()
+        wait()
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'table.csv')
+            win.write_table(file_name)
+            win.open_table(file_name)
+            wait()
+            win.btnCalculate.click()
+            wait()
+        self.assertFalse(win.is_modified())
+        self.assertFalse(win.actionUndo.isEnabled())
+
+    #the column of an undone calculation is calculated again
+    def test_undo_calculated_column(self):
+        win = MassCalculator.win
+        new_table(['Glc', 'GlcNAc'], ['C6H12O6', 'C8H15NO6'])
+        win.btnCalculate.click()
+        wait()
+        win.inputNewColumnName.setText('[M+Cl]-')
+        win.inputNewColumnCharge.setText('-')
+        win.inputNewColumnAdduct.setText('Cl')
+        win.btnAddColumn.click()
+        win.btnCalculate.click()
+        wait()
+        column = len(win.header_items) - 1
+        calculated = win.model.column_texts(column)[:2]
+        win.undo()
+        self.assertEqual(win.model.column_texts(column)[:2], ['', ''])
+        win.btnCalculate.click()
+        wait()
+        self.assertEqual(win.model.column_texts(column)[:2], calculated)
+        self.assertEqual(calculated, ['215.0328', '256.0593'])
+
+    #rows that are still to be calculated move with rows inserted or removed by undo
+    def test_undo_insert_moves_dirty_rows(self):
+        win = MassCalculator.win
+        new_table(['Glc', 'B'], ['C6H12O6', 'C6H12O6'])
+        win.btnCalculate.click()
+        wait()
+        win.model.setData(win.model.index(1, 1), 'C8H15NO6')
+        win.t1.selectRow(0)
+        win.add_row()
+        win.t1.clearSelection()
+        win.undo()
+        win.btnCalculate.click()
+        wait()
+        self.assertEqual(win.model.column_texts(2)[:2], ['180.0634', '221.0899'])
+
+class CalculationTest(unittest.TestCase):
+    #a failed worker is reported and the new column stays to be calculated
+    def test_failed_calculation(self):
+        win = MassCalculator.win
+        new_table(['Glc'], ['C6H12O6'])
+        win.btnCalculate.click()
+        wait()
+        win.inputNewColumnName.setText('[M+K]+')
+        win.inputNewColumnCharge.setText('+')
+        win.inputNewColumnAdduct.setText('K')
+        win.btnAddColumn.click()
+        def failing(context, formulas):
+            raise RuntimeError('worker failed')
+        states_chunk = calculation.states_chunk
+        calculation.states_chunk = failing
+        try:
+            win.btnCalculate.click()
+            wait()
+        finally:
+            calculation.states_chunk = states_chunk
+        column = len(win.header_items) - 1
+        self.assertEqual(win.statusBar().currentMessage(), 'Calculation failed: worker failed')
+        self.assertEqual(win.model.column_texts(column)[0], '')
+        win.btnCalculate.click()
+        wait()
+        self.assertEqual(win.model.column_texts(column)[0], '219.0265')
+
+class MatchTest(unittest.TestCase):
+    def test_reopened_dialog(self):
+        win = MassCalculator.win
+        new_table(['Glc', 'GlcNAc'], ['C6H12O6', 'C8H15NO6'])
+        win.calculate()
+        wait()
+        #hits and rows of the hit table while the dialog is open, an exception in a slot would end the test program
+        shown = []
+        def match():
+            w = win.dialogs[MassCalculator.MatchDialog]
+            shown.append((len(w.hits), w.tableHits.rowCount()))
+            w.inputMasses.setPlainText('181.0707')
+            w.inputTolerance.setText('5 ppm')
+            w.btnMatch.click()
+            shown.append((len(w.hits), w.tableHits.rowCount()))
+            w.accept()
+        QtCore.QTimer.singleShot(0, match)
+        win.actionMatch_Masses.trigger()
+        new_table(['GlcNAc'], ['C8H15NO6'])
+        QtCore.QTimer.singleShot(0, match)
+        win.actionMatch_Masses.trigger()
+        self.assertEqual(shown, [(0, 0), (1, 1), (0, 0), (0, 0)])
+
+class SearchTest(unittest.TestCase):
+    def test_mass_range_skips_descriptors(self):
+        win = MassCalculator.win
+        new_table(['Glc'], ['C6H12O6'])
+        for descriptor in ('rdbe', 'kmd:CH2'):
+            win.header_items.append(MassCalculator.HeaderItem(descriptor, charge = 0, descriptor = descriptor))
+            win.update_header()
+            win.dirty.header_changed(win.header_items[-1])
+        win.calculate()
+        wait()
+        descriptors = {j for j, header in enumerate(win.header_items) if header.descriptor}
+        for query in ('m/z 0.5-1.5', 'm/z 0.0-0.2', 'm/z 181.0707'):
+            self.assertFalse(descriptors & set(win.model.search_index.search(query)), query)
+        self.assertTrue(win.model.search_index.search('m/z 181.0707'))
+
+    #a longer match that crosses into the next row must not hide a shorter one in the row itself
+    def test_regex_stays_in_row(self):
+        win = MassCalculator.win
+        new_table(['xa', 'b', 'ab'], ['C6H12O6', 'CH4', 'H2O'])
+        self.assertEqual(list(win.model.search_index.find_regex(0, re.compile('a\\s*b|a', re.MULTILINE))), [0, 2])
+        self.assertEqual(list(win.model.search_index.find_regex(0, re.compile('a\\sb', re.MULTILINE))), [])
+        self.assertEqual(list(win.model.search_index.find_regex(0, re.compile('b$', re.MULTILINE))), [1, 2])
+
+class AnnotationTest(unittest.TestCase):
+    #the annotation works on copies of the table, an edit while it runs does not change its names
+    def test_annotation_copies_table(self):
+        win = MassCalculator.win
+        new_table(['Glc'], ['C6H12O6'])
+        win.calculate()
+        wait()
+        folder = tempfile.mkdtemp()
+        peak_file = os.path.join(folder, 'peaks.csv')
+        output_file = os.path.join(folder, 'annotated.csv')
+        with open(peak_file, 'w') as file:
+            file.write('mz,intensity\n181.0707,100\n')
+        dialogs = QtWidgets.QFileDialog.getOpenFileName, QtWidgets.QFileDialog.getSaveFileName, QtWidgets.QInputDialog.getText
+        QtWidgets.QFileDialog.getOpenFileName = lambda *args, **kwargs: (peak_file, '')
+        QtWidgets.QFileDialog.getSaveFileName = lambda *args, **kwargs: (output_file, '')
+        QtWidgets.QInputDialog.getText = lambda *args, **kwargs: ('5 ppm', True)
+        try:
+            win.actionAnnotate_Peaks.trigger()
+        finally:
+            QtWidgets.QFileDialog.getOpenFileName, QtWidgets.QFileDialog.getSaveFileName, QtWidgets.QInputDialog.getText = dialogs
+        names = win.annotation.names
+        self.assertIsNot(names, win.model.column_texts(0))
+        win.stop_annotation()
+        self.assertIsNone(win.annotation)
+
+class IsotopeTest(unittest.TestCase):
+    def test_patterns_on_thread(self):
+        win = MassCalculator.win
+        new_table(['Glc', 'CHCl'], ['C6H12O6', 'CHCl'])
+        w = MassCalculator.IsotopeDialog([0, 1])
+        while w.thread is not None:
+            MassCalculator.app.processEvents()
+        rows = list(w.peaks.csv_rows())
+        patterns = table_patterns(w.formulas, w.ions, 'aggregated', float(w.inputThreshold.text()) / 100)
+        self.assertEqual(rows, list(pattern_rows(w.names, w.formulas, w.ions, patterns, win.mass_precision)))
+        self.assertEqual(w.tablePeaks.model().rowCount(), len(rows))
+        self.assertEqual(w.peaks.data(w.peaks.index(0, 4)), rows[0][4])
+        w.done(0)
+
+class OligomerTest(unittest.TestCase):
+    def test_oligomers_action(self):
+        win = MassCalculator.win
+        new_table(['Suc', 'Glc', 'Fru'], ['C12H22O11', 'C6H12O6', 'C6H12O6'])
+        answer(MassCalculator.OligomerDialog, lineEdit='1-3', lineEdit_2='2', lineEdit_3='2')
+        win.actionOligomers.trigger()
+        added = [row for row in zip(win.model.column_texts(0)[3:], win.model.column_texts(1)[3:]) if row[1]]
+        #the dimer of Glc has the composition of the monomer Suc, which is below the min units
+        self.assertIn(('2(Glc)', 'C12H22O11'), added)
+        self.assertEqual(len(added), 3)
+
+if __name__ == '__main__':
+    unittest.main()
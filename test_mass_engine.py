@@ -0,0 +1,33 @@
+import unittest
+from compound import Compound
+from mass_engine import calc_masses
+from table_csv import HeaderItem
+
+#masses of the vectorized engine, against values of the Decimal calculation of the first version
+#  python -m pytest test_mass_engine.py   or   python -m unittest test_mass_engine
+
+class DeleteBeforeAddTest(unittest.TestCase):
+    #the deletion is taken from the formula first, an atom that only the addition brings can not be deleted
+    def test_delete_needs_the_formula(self):
+        headers = [HeaderItem('N', add = 'N', delete = 'N', charge = 0),
+                   HeaderItem('H2O-O7', add = 'H2O', delete = 'O7', charge = 0)]
+        self.assertEqual(calc_masses(['C6H12O6'], headers), [['---', '---']])
+        self.assertEqual(calc_masses(['C6H12NO7'], headers), [['210.0614', '116.1075']])
+
+    def test_add_and_delete(self):
+        headers = [HeaderItem('Na-H', add = 'Na', delete = 'H', charge = 0)]
+        self.assertEqual(calc_masses(['C6H12O6', 'C6O6'], headers), [['202.0453'], ['---']])
+
+class CompoundMassTest(unittest.TestCase):
+    #the scalar path of Compound.calc_mass gives the masses of a table column
+    def test_calc_mass_like_column(self):
+        for formula, charge, adduct in (('C6H12O6', 1, 'Na'), ('C12H22O11', -1, None), ('CH4', 0, None), ('C6H12O6', 1, '[2M+H]+')):
+            header = HeaderItem('', adduct = adduct or '', charge = charge)
+            self.assertEqual(str(Compound(formula, charge = charge, adduct = adduct).calc_mass(6)), calc_masses([formula], [header], 6)[0][0])
+
+    def test_impossible_ion(self):
+        with self.assertRaises(ValueError):
+            Compound('CH4', charge = 1, adduct = '-H2O2').calc_mass()
+
+if __name__ == '__main__':
+    unittest.main()
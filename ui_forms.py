@@ -0,0 +1,924 @@
+#generated by compile_ui.py from the .ui files of view/, do not edit
+#run python compile_ui.py again after a .ui file was changed
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+ui_checksums = {
+    'elimination_product_dialog': 2898768413,
+    'formula_search_dialog': 3044825603,
+    'help_dialog': 2365603987,
+    'isotope_dialog': 3556941479,
+    'main': 806195172,
+    'mass_precision_dialog': 2791137669,
+    'match_dialog': 2332949616,
+    'oligomer_dialog': 1727607299,
+    'parallel_dialog': 1699494551,
+}
+
+
+class Ui_elimination_product_dialog(object):
+    def setupUi(self, Dialog):
+        Dialog.setObjectName("Dialog")
+        Dialog.resize(192, 167)
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        Dialog.setFont(font)
+        self.buttonBox = QtWidgets.QDialogButtonBox(Dialog)
+        self.buttonBox.setGeometry(QtCore.QRect(-80, 110, 251, 61))
+        self.buttonBox.setOrientation(QtCore.Qt.Horizontal)
+        self.buttonBox.setStandardButtons(QtWidgets.QDialogButtonBox.Cancel|QtWidgets.QDialogButtonBox.Ok)
+        self.buttonBox.setObjectName("buttonBox")
+        self.lineEdit = QtWidgets.QLineEdit(Dialog)
+        self.lineEdit.setGeometry(QtCore.QRect(10, 80, 171, 31))
+        self.lineEdit.setObjectName("lineEdit")
+        self.label = QtWidgets.QLabel(Dialog)
+        self.label.setGeometry(QtCore.QRect(10, 50, 171, 31))
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        self.label.setFont(font)
+        self.label.setObjectName("label")
+        self.line = QtWidgets.QFrame(Dialog)
+        self.line.setGeometry(QtCore.QRect(-40, -20, 271, 261))
+        self.line.setFrameShape(QtWidgets.QFrame.HLine)
+        self.line.setFrameShadow(QtWidgets.QFrame.Sunken)
+        self.line.setObjectName("line")
+        self.label_2 = QtWidgets.QLabel(Dialog)
+        self.label_2.setGeometry(QtCore.QRect(10, 10, 171, 31))
+        self.label_2.setObjectName("label_2")
+        self.line.raise_()
+        self.buttonBox.raise_()
+        self.lineEdit.raise_()
+        self.label.raise_()
+        self.label_2.raise_()
+
+        self.retranslateUi(Dialog)
+        self.buttonBox.accepted.connect(Dialog.accept) # type: ignore
+        self.buttonBox.rejected.connect(Dialog.reject) # type: ignore
+        QtCore.QMetaObject.connectSlotsByName(Dialog)
+
+    def retranslateUi(self, Dialog):
+        _translate = QtCore.QCoreApplication.translate
+        Dialog.setWindowTitle(_translate("Dialog", "Dialog"))
+        self.lineEdit.setText(_translate("Dialog", "H2O"))
+        self.label.setText(_translate("Dialog", "Elimination Product"))
+        self.label_2.setText(_translate("Dialog", "Compound Builder"))
+
+
+class Ui_formula_search_dialog(object):
+    def setupUi(self, Dialog):
+        Dialog.setObjectName("Dialog")
+        Dialog.resize(760, 420)
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        Dialog.setFont(font)
+        self.line = QtWidgets.QFrame(Dialog)
+        self.line.setGeometry(QtCore.QRect(-40, -10, 841, 461))
+        self.line.setFrameShape(QtWidgets.QFrame.HLine)
+        self.line.setFrameShadow(QtWidgets.QFrame.Sunken)
+        self.line.setObjectName("line")
+        self.label = QtWidgets.QLabel(Dialog)
+        self.label.setGeometry(QtCore.QRect(10, 10, 181, 21))
+        self.label.setObjectName("label")
+        self.inputMz = QtWidgets.QLineEdit(Dialog)
+        self.inputMz.setGeometry(QtCore.QRect(10, 35, 181, 31))
+        self.inputMz.setObjectName("inputMz")
+        self.label_2 = QtWidgets.QLabel(Dialog)
+        self.label_2.setGeometry(QtCore.QRect(10, 75, 181, 21))
+        self.label_2.setObjectName("label_2")
+        self.inputTolerance = QtWidgets.QLineEdit(Dialog)
+        self.inputTolerance.setGeometry(QtCore.QRect(10, 100, 181, 31))
+        self.inputTolerance.setObjectName("inputTolerance")
+        self.label_3 = QtWidgets.QLabel(Dialog)
+        self.label_3.setGeometry(QtCore.QRect(10, 140, 181, 21))
+        self.label_3.setObjectName("label_3")
+        self.comboIon = QtWidgets.QComboBox(Dialog)
+        self.comboIon.setGeometry(QtCore.QRect(10, 165, 181, 31))
+        self.comboIon.setObjectName("comboIon")
+        self.label_4 = QtWidgets.QLabel(Dialog)
+        self.label_4.setGeometry(QtCore.QRect(10, 205, 181, 21))
+        self.label_4.setObjectName("label_4")
+        self.inputElements = QtWidgets.QLineEdit(Dialog)
+        self.inputElements.setGeometry(QtCore.QRect(10, 230, 181, 31))
+        self.inputElements.setObjectName("inputElements")
+        self.btnSearch = QtWidgets.QPushButton(Dialog)
+        self.btnSearch.setGeometry(QtCore.QRect(10, 280, 181, 31))
+        self.btnSearch.setObjectName("btnSearch")
+        self.btnAdd = QtWidgets.QPushButton(Dialog)
+        self.btnAdd.setGeometry(QtCore.QRect(10, 330, 181, 31))
+        self.btnAdd.setObjectName("btnAdd")
+        self.tableCandidates = QtWidgets.QTableWidget(Dialog)
+        self.tableCandidates.setGeometry(QtCore.QRect(200, 10, 551, 401))
+        self.tableCandidates.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.tableCandidates.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.tableCandidates.setObjectName("tableCandidates")
+        self.tableCandidates.setColumnCount(0)
+        self.tableCandidates.setRowCount(0)
+        self.line.raise_()
+        self.label.raise_()
+        self.inputMz.raise_()
+        self.label_2.raise_()
+        self.inputTolerance.raise_()
+        self.label_3.raise_()
+        self.comboIon.raise_()
+        self.label_4.raise_()
+        self.inputElements.raise_()
+        self.btnSearch.raise_()
+        self.btnAdd.raise_()
+        self.tableCandidates.raise_()
+
+        self.retranslateUi(Dialog)
+        QtCore.QMetaObject.connectSlotsByName(Dialog)
+
+    def retranslateUi(self, Dialog):
+        _translate = QtCore.QCoreApplication.translate
+        Dialog.setWindowTitle(_translate("Dialog", "Dialog"))
+        self.label.setText(_translate("Dialog", "m/z"))
+        self.label_2.setText(_translate("Dialog", "Tolerance"))
+        self.inputTolerance.setText(_translate("Dialog", "5 ppm"))
+        self.label_3.setText(_translate("Dialog", "Ion"))
+        self.label_4.setText(_translate("Dialog", "Elements"))
+        self.inputElements.setText(_translate("Dialog", "C0-50 H0-100 N0-10 O0-20 P0-3 S0-3"))
+        self.btnSearch.setText(_translate("Dialog", "Search"))
+        self.btnAdd.setText(_translate("Dialog", "Add to Table"))
+
+
+class Ui_help_dialog(object):
+    def setupUi(self, Dialog):
+        Dialog.setObjectName("Dialog")
+        Dialog.resize(855, 474)
+        self.gridLayout = QtWidgets.QGridLayout(Dialog)
+        self.gridLayout.setObjectName("gridLayout")
+        self.textBrowser = QtWidgets.QTextBrowser(Dialog)
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(10)
+        self.textBrowser.setFont(font)
+        self.textBrowser.setObjectName("textBrowser")
+        self.gridLayout.addWidget(self.textBrowser, 0, 0, 1, 1)
+
+        self.retranslateUi(Dialog)
+        QtCore.QMetaObject.connectSlotsByName(Dialog)
+
+    def retranslateUi(self, Dialog):
+        _translate = QtCore.QCoreApplication.translate
+        Dialog.setWindowTitle(_translate("Dialog", "Dialog"))
+        self.textBrowser.setHtml(_translate("Dialog", "<!DOCTYPE HTML PUBLIC \"-//W3C//DTD HTML 4.0//EN\" \"http://www.w3.org/TR/REC-html40/strict.dtd\">\n"
+"<html><head><meta name=\"qrichtext\" content=\"1\" /><style type=\"text/css\">\n"
+"p, li { white-space: pre-wrap; }\n"
+"</style></head><body style=\" font-family:\'Arial\'; font-size:10pt; font-weight:400; font-style:normal;\">\n"
+"<p style=\" margin-top:0px; margin-bottom:0px; margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px;\"><span style=\" font-family:\'MS Shell Dlg 2\'; font-weight:600;\">Exact Mass Calculator</span></p>\n"
+"<p style=\"-qt-paragraph-type:empty; margin-top:0px; margin-bottom:0px; margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px; font-family:\'MS Shell Dlg 2\';\"><br /></p>\n"
+"<p style=\" margin-top:0px; margin-bottom:0px; margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px;\"><span style=\" font-family:\'MS Shell Dlg 2\'; font-weight:600;\">General</span></p>\n"
+"<p style=\" margin-top:0px; margin-bottom:0px; margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px;\"><span style=\" font-family:\'MS Shell Dlg 2\';\">Calculates the exact mass of a chemical compound using its molecular formula according to the exact mass of the most abundant isotope. The mass precision can be set in the settings under Mass Precision. Sum formulas are always to be entered in the form element and number without special or blank characters such as C8H15NO6.</span></p>\n"
+"<p style=\" margin-top:0px; margin-bottom:0px; margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px;\"><span style=\" font-family:\'MS Shell Dlg 2\';\">The columns name, compound and neutral are fixed, the remaining columns can be deleted or reassigned.</span></p>\n"
+"<p style=\"-qt-paragraph-type:empty; margin-top:0px; margin-bottom:0px; margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px; font-family:\'MS Shell Dlg 2\';\"><br /></p>\n"
+"<p style=\" margin-top:0px; margin-bottom:0px; margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px;\"><span style=\" font-family:\'MS Shell Dlg 2\'; font-weight:600;\">New Column</span></p>\n"
+"<p style=\" margin-top:0px; margin-bottom:0px; margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px;\"><span style=\" font-family:\'Arial\';\">A new column can be added to display custom conditions, this applies for each compound in the list. In modifications add something (eg. type +H2O) or remove elements (eg. -H2O). The charge</span></p>\n"
+"<p style=\" margin-top:0px; margin-bottom:0px; margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px;\"><span style=\" font-family:\'Arial\';\">can be specified (write + for once positive, - for once negative or 3+ for three times positive charge). An adduct for positive ion mode can be specified, enter either Na or K (sodium or potassium).</span></p>\n"
+"<p style=\"-qt-paragraph-type:empty; margin-top:0px; margin-bottom:0px; margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px; font-family:\'MS Shell Dlg 2\';\"><br /></p>\n"
+"<p style=\" margin-top:0px; margin-bottom:0px; margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px;\"><span style=\" font-family:\'MS Shell Dlg 2\'; font-weight:600;\">Compound Builder</span></p>\n"
+"<p style=\" margin-top:0px; margin-bottom:0px; margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px;\"><span style=\" font-family:\'MS Shell Dlg 2\';\">Here a new connection can be generated from connections already contained in the table and added to the table. </span></p>\n"
+"<p style=\" margin-top:0px; margin-bottom:0px; margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px;\"><span style=\" font-family:\'MS Shell Dlg 2\';\">Addition (+), subtraction (-) and multipication (*) are possible.</span></p>\n"
+"<p style=\" margin-top:0px; margin-bottom:0px; margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px;\"><span style=\" font-family:\'MS Shell Dlg 2\';\">Input as the indexes in the table, eg. if GlcNAc is in row 1 and MurNAc in row 2: 1+2 = GlcNAc+MurNAc; 2*5 = (MurNAc)5; 1+2-2 = GlcNAc.</span></p>\n"
+"<p style=\" margin-top:0px; margin-bottom:0px; margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px;\"><span style=\" font-family:\'MS Shell Dlg 2\';\">If no name for the new compound was provides it will be auto generated. For example 2* GlcNAc minus 1*MurNAc would be 2(GlcNAc)-(MurNAc). The minus sign is a literal minus not a hyphen.</span></p>\n"
+"<p style=\"-qt-paragraph-type:empty; margin-top:0px; margin-bottom:0px; margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px; font-family:\'MS Shell Dlg 2\';\"><br /></p>\n"
+"<p style=\" margin-top:0px; margin-bottom:0px; margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px;\"><span style=\" font-family:\'MS Shell Dlg 2\'; font-weight:600;\">Open and Save Files</span></p>\n"
+"<p style=\" margin-top:0px; margin-bottom:0px; margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px;\"><span style=\" font-family:\'MS Shell Dlg 2\';\">The table can be saved as a Comma Separated Value (CSV) file. File -&gt; Save. A .csv extension must always be added. Tables can be opened in exactly the same state again.</span></p>\n"
+"<p style=\"-qt-paragraph-type:empty; margin-top:0px; margin-bottom:0px; margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px; font-family:\'MS Shell Dlg 2\';\"><br /></p>\n"
+"<p style=\" margin-top:0px; margin-bottom:0px; margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px;\"><span style=\" font-family:\'MS Shell Dlg 2\'; font-weight:600;\">Delete Rows and Columns</span></p>\n"
+"<p style=\" margin-top:0px; margin-bottom:0px; margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px;\"><span style=\" font-family:\'MS Shell Dlg 2\';\">Columns and rows can be selected by clicking on the column name or row number. Several can be selected by holding down Ctrl. The selection can be deleted with the Delete key or Settings -&gt; Delete Selection.</span></p>\n"
+"<p style=\"-qt-paragraph-type:empty; margin-top:0px; margin-bottom:0px; margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px; font-family:\'MS Shell Dlg 2\'; font-size:8.25pt;\"><br /></p></body></html>"))
+
+
+class Ui_isotope_dialog(object):
+    def setupUi(self, Dialog):
+        Dialog.setObjectName("Dialog")
+        Dialog.resize(760, 420)
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        Dialog.setFont(font)
+        self.line = QtWidgets.QFrame(Dialog)
+        self.line.setGeometry(QtCore.QRect(-40, -10, 841, 461))
+        self.line.setFrameShape(QtWidgets.QFrame.HLine)
+        self.line.setFrameShadow(QtWidgets.QFrame.Sunken)
+        self.line.setObjectName("line")
+        self.label = QtWidgets.QLabel(Dialog)
+        self.label.setGeometry(QtCore.QRect(10, 10, 181, 21))
+        self.label.setObjectName("label")
+        self.comboMode = QtWidgets.QComboBox(Dialog)
+        self.comboMode.setGeometry(QtCore.QRect(10, 35, 181, 31))
+        self.comboMode.setObjectName("comboMode")
+        self.label_2 = QtWidgets.QLabel(Dialog)
+        self.label_2.setGeometry(QtCore.QRect(10, 75, 181, 21))
+        self.label_2.setObjectName("label_2")
+        self.inputThreshold = QtWidgets.QLineEdit(Dialog)
+        self.inputThreshold.setGeometry(QtCore.QRect(10, 100, 181, 31))
+        self.inputThreshold.setObjectName("inputThreshold")
+        self.btnCalculate = QtWidgets.QPushButton(Dialog)
+        self.btnCalculate.setGeometry(QtCore.QRect(10, 150, 181, 31))
+        self.btnCalculate.setObjectName("btnCalculate")
+        self.btnExport = QtWidgets.QPushButton(Dialog)
+        self.btnExport.setGeometry(QtCore.QRect(10, 200, 181, 31))
+        self.btnExport.setObjectName("btnExport")
+        self.tablePeaks = QtWidgets.QTableView(Dialog)
+        self.tablePeaks.setGeometry(QtCore.QRect(200, 10, 551, 401))
+        self.tablePeaks.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.tablePeaks.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.tablePeaks.setObjectName("tablePeaks")
+        self.line.raise_()
+        self.label.raise_()
+        self.comboMode.raise_()
+        self.label_2.raise_()
+        self.inputThreshold.raise_()
+        self.btnCalculate.raise_()
+        self.btnExport.raise_()
+        self.tablePeaks.raise_()
+
+        self.retranslateUi(Dialog)
+        QtCore.QMetaObject.connectSlotsByName(Dialog)
+
+    def retranslateUi(self, Dialog):
+        _translate = QtCore.QCoreApplication.translate
+        Dialog.setWindowTitle(_translate("Dialog", "Dialog"))
+        self.label.setText(_translate("Dialog", "Mode"))
+        self.label_2.setText(_translate("Dialog", "Threshold %"))
+        self.inputThreshold.setText(_translate("Dialog", "0.01"))
+        self.btnCalculate.setText(_translate("Dialog", "Calculate"))
+        self.btnExport.setText(_translate("Dialog", "Export"))
+
+
+class Ui_main(object):
+    def setupUi(self, MainWindow):
+        MainWindow.setObjectName("MainWindow")
+        MainWindow.resize(1387, 893)
+        MainWindow.setToolTipDuration(-6)
+        self.centralwidget = QtWidgets.QWidget(MainWindow)
+        self.centralwidget.setAutoFillBackground(False)
+        self.centralwidget.setObjectName("centralwidget")
+        self.t1 = QtWidgets.QTableView(self.centralwidget)
+        self.t1.setGeometry(QtCore.QRect(190, 10, 732, 121))
+        self.t1.setAutoFillBackground(True)
+        self.t1.setFrameShape(QtWidgets.QFrame.NoFrame)
+        self.t1.setFrameShadow(QtWidgets.QFrame.Plain)
+        self.t1.setVerticalScrollBarPolicy(QtCore.Qt.ScrollBarAsNeeded)
+        self.t1.setSizeAdjustPolicy(QtWidgets.QAbstractScrollArea.AdjustToContents)
+        self.t1.setHorizontalScrollMode(QtWidgets.QAbstractItemView.ScrollPerItem)
+        self.t1.setShowGrid(True)
+        self.t1.setGridStyle(QtCore.Qt.DashLine)
+        self.t1.setObjectName("t1")
+        self.t1.horizontalHeader().setVisible(True)
+        self.t1.horizontalHeader().setCascadingSectionResizes(False)
+        self.t1.horizontalHeader().setHighlightSections(True)
+        self.t1.horizontalHeader().setMinimumSectionSize(45)
+        self.t1.horizontalHeader().setSortIndicatorShown(True)
+        self.t1.horizontalHeader().setStretchLastSection(False)
+        self.t1.verticalHeader().setVisible(True)
+        self.inputNewColumnCharge = QtWidgets.QLineEdit(self.centralwidget)
+        self.inputNewColumnCharge.setGeometry(QtCore.QRect(20, 550, 71, 31))
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        self.inputNewColumnCharge.setFont(font)
+        self.inputNewColumnCharge.setText("")
+        self.inputNewColumnCharge.setObjectName("inputNewColumnCharge")
+        self.btnCalculate = QtWidgets.QPushButton(self.centralwidget)
+        self.btnCalculate.setGeometry(QtCore.QRect(20, 20, 151, 41))
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(16)
+        font.setBold(True)
+        font.setWeight(75)
+        self.btnCalculate.setFont(font)
+        self.btnCalculate.setToolTip("")
+        self.btnCalculate.setStatusTip("")
+        self.btnCalculate.setWhatsThis("")
+        self.btnCalculate.setObjectName("btnCalculate")
+        self.lnMenu = QtWidgets.QFrame(self.centralwidget)
+        self.lnMenu.setGeometry(QtCore.QRect(10, 10, 171, 631))
+        self.lnMenu.setFrameShape(QtWidgets.QFrame.HLine)
+        self.lnMenu.setFrameShadow(QtWidgets.QFrame.Sunken)
+        self.lnMenu.setObjectName("lnMenu")
+        self.btnFindSearch = QtWidgets.QPushButton(self.centralwidget)
+        self.btnFindSearch.setGeometry(QtCore.QRect(100, 170, 71, 31))
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        self.btnFindSearch.setFont(font)
+        self.btnFindSearch.setObjectName("btnFindSearch")
+        self.btnClearSearch = QtWidgets.QPushButton(self.centralwidget)
+        self.btnClearSearch.setGeometry(QtCore.QRect(20, 170, 71, 31))
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        self.btnClearSearch.setFont(font)
+        self.btnClearSearch.setObjectName("btnClearSearch")
+        self.inputSearch = QtWidgets.QLineEdit(self.centralwidget)
+        self.inputSearch.setGeometry(QtCore.QRect(20, 120, 151, 31))
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        self.inputSearch.setFont(font)
+        self.inputSearch.setObjectName("inputSearch")
+        self.inputBuilderName = QtWidgets.QLineEdit(self.centralwidget)
+        self.inputBuilderName.setGeometry(QtCore.QRect(20, 260, 151, 31))
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        self.inputBuilderName.setFont(font)
+        self.inputBuilderName.setInputMask("")
+        self.inputBuilderName.setText("")
+        self.inputBuilderName.setObjectName("inputBuilderName")
+        self.btnAddBuilder = QtWidgets.QPushButton(self.centralwidget)
+        self.btnAddBuilder.setGeometry(QtCore.QRect(100, 360, 71, 31))
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        self.btnAddBuilder.setFont(font)
+        self.btnAddBuilder.setObjectName("btnAddBuilder")
+        self.btnClearBuilder = QtWidgets.QPushButton(self.centralwidget)
+        self.btnClearBuilder.setGeometry(QtCore.QRect(20, 360, 71, 31))
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        self.btnClearBuilder.setFont(font)
+        self.btnClearBuilder.setObjectName("btnClearBuilder")
+        self.lblBuilder = QtWidgets.QLabel(self.centralwidget)
+        self.lblBuilder.setGeometry(QtCore.QRect(20, 230, 161, 16))
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        self.lblBuilder.setFont(font)
+        self.lblBuilder.setObjectName("lblBuilder")
+        self.inputBuilderCalculation = QtWidgets.QLineEdit(self.centralwidget)
+        self.inputBuilderCalculation.setGeometry(QtCore.QRect(20, 310, 151, 31))
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        self.inputBuilderCalculation.setFont(font)
+        self.inputBuilderCalculation.setText("")
+        self.inputBuilderCalculation.setObjectName("inputBuilderCalculation")
+        self.lblNewColumn = QtWidgets.QLabel(self.centralwidget)
+        self.lblNewColumn.setGeometry(QtCore.QRect(20, 420, 111, 20))
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        self.lblNewColumn.setFont(font)
+        self.lblNewColumn.setObjectName("lblNewColumn")
+        self.btnClearColumn = QtWidgets.QPushButton(self.centralwidget)
+        self.btnClearColumn.setGeometry(QtCore.QRect(20, 600, 71, 31))
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        self.btnClearColumn.setFont(font)
+        self.btnClearColumn.setObjectName("btnClearColumn")
+        self.btnAddColumn = QtWidgets.QPushButton(self.centralwidget)
+        self.btnAddColumn.setGeometry(QtCore.QRect(100, 600, 71, 31))
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        self.btnAddColumn.setFont(font)
+        self.btnAddColumn.setObjectName("btnAddColumn")
+        self.inputNewColumnName = QtWidgets.QLineEdit(self.centralwidget)
+        self.inputNewColumnName.setGeometry(QtCore.QRect(20, 450, 151, 31))
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        self.inputNewColumnName.setFont(font)
+        self.inputNewColumnName.setObjectName("inputNewColumnName")
+        self.inputNewColumnModify = QtWidgets.QLineEdit(self.centralwidget)
+        self.inputNewColumnModify.setGeometry(QtCore.QRect(20, 500, 151, 31))
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        self.inputNewColumnModify.setFont(font)
+        self.inputNewColumnModify.setText("")
+        self.inputNewColumnModify.setObjectName("inputNewColumnModify")
+        self.inputNewColumnAdduct = QtWidgets.QLineEdit(self.centralwidget)
+        self.inputNewColumnAdduct.setGeometry(QtCore.QRect(100, 550, 71, 31))
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        self.inputNewColumnAdduct.setFont(font)
+        self.inputNewColumnAdduct.setText("")
+        self.inputNewColumnAdduct.setObjectName("inputNewColumnAdduct")
+        self.lblFind = QtWidgets.QLabel(self.centralwidget)
+        self.lblFind.setGeometry(QtCore.QRect(20, 90, 121, 16))
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        self.lblFind.setFont(font)
+        self.lblFind.setObjectName("lblFind")
+        self.progressBar = QtWidgets.QProgressBar(self.centralwidget)
+        self.progressBar.setGeometry(QtCore.QRect(10, 820, 181, 23))
+        self.progressBar.setProperty("value", 0)
+        self.progressBar.setObjectName("progressBar")
+        self.lnMenu.raise_()
+        self.t1.raise_()
+        self.inputNewColumnCharge.raise_()
+        self.btnCalculate.raise_()
+        self.btnFindSearch.raise_()
+        self.btnClearSearch.raise_()
+        self.inputSearch.raise_()
+        self.inputBuilderName.raise_()
+        self.btnAddBuilder.raise_()
+        self.btnClearBuilder.raise_()
+        self.lblBuilder.raise_()
+        self.inputBuilderCalculation.raise_()
+        self.lblNewColumn.raise_()
+        self.btnClearColumn.raise_()
+        self.btnAddColumn.raise_()
+        self.inputNewColumnName.raise_()
+        self.inputNewColumnModify.raise_()
+        self.inputNewColumnAdduct.raise_()
+        self.lblFind.raise_()
+        self.progressBar.raise_()
+        MainWindow.setCentralWidget(self.centralwidget)
+        self.menubar = QtWidgets.QMenuBar(MainWindow)
+        self.menubar.setGeometry(QtCore.QRect(0, 0, 1387, 21))
+        self.menubar.setObjectName("menubar")
+        self.menuFile = QtWidgets.QMenu(self.menubar)
+        self.menuFile.setObjectName("menuFile")
+        self.menuEdit = QtWidgets.QMenu(self.menubar)
+        self.menuEdit.setObjectName("menuEdit")
+        self.menuSettings = QtWidgets.QMenu(self.menubar)
+        self.menuSettings.setObjectName("menuSettings")
+        self.menuTools = QtWidgets.QMenu(self.menubar)
+        self.menuTools.setObjectName("menuTools")
+        self.menuAbout = QtWidgets.QMenu(self.menubar)
+        self.menuAbout.setObjectName("menuAbout")
+        MainWindow.setMenuBar(self.menubar)
+        self.statusbar = QtWidgets.QStatusBar(MainWindow)
+        self.statusbar.setObjectName("statusbar")
+        MainWindow.setStatusBar(self.statusbar)
+        self.actionSave_as = QtWidgets.QAction(MainWindow)
+        self.actionSave_as.setObjectName("actionSave_as")
+        self.actionOpen = QtWidgets.QAction(MainWindow)
+        self.actionOpen.setObjectName("actionOpen")
+        self.actionSave = QtWidgets.QAction(MainWindow)
+        self.actionSave.setObjectName("actionSave")
+        self.actionAdd_Row = QtWidgets.QAction(MainWindow)
+        self.actionAdd_Row.setObjectName("actionAdd_Row")
+        self.actionDelete_Row = QtWidgets.QAction(MainWindow)
+        self.actionDelete_Row.setObjectName("actionDelete_Row")
+        self.actionDelete = QtWidgets.QAction(MainWindow)
+        self.actionDelete.setObjectName("actionDelete")
+        self.actionDelete_Last_Row = QtWidgets.QAction(MainWindow)
+        self.actionDelete_Last_Row.setObjectName("actionDelete_Last_Row")
+        self.actionMass_Precision = QtWidgets.QAction(MainWindow)
+        self.actionMass_Precision.setObjectName("actionMass_Precision")
+        self.actionHelp = QtWidgets.QAction(MainWindow)
+        self.actionHelp.setObjectName("actionHelp")
+        self.actionElimination_Product = QtWidgets.QAction(MainWindow)
+        self.actionElimination_Product.setObjectName("actionElimination_Product")
+        self.actionUndo = QtWidgets.QAction(MainWindow)
+        self.actionUndo.setObjectName("actionUndo")
+        self.actionRedo = QtWidgets.QAction(MainWindow)
+        self.actionRedo.setObjectName("actionRedo")
+        self.actionExit = QtWidgets.QAction(MainWindow)
+        self.actionExit.setObjectName("actionExit")
+        self.actionNew_File = QtWidgets.QAction(MainWindow)
+        self.actionNew_File.setObjectName("actionNew_File")
+        self.actionShow_Formulas = QtWidgets.QAction(MainWindow)
+        self.actionShow_Formulas.setObjectName("actionShow_Formulas")
+        self.actionPrint_Undo = QtWidgets.QAction(MainWindow)
+        self.actionPrint_Undo.setObjectName("actionPrint_Undo")
+        self.actionPrint_Undo_2 = QtWidgets.QAction(MainWindow)
+        self.actionPrint_Undo_2.setObjectName("actionPrint_Undo_2")
+        self.actionAbout_Mass_Calculator = QtWidgets.QAction(MainWindow)
+        self.actionAbout_Mass_Calculator.setObjectName("actionAbout_Mass_Calculator")
+        self.actionCopy = QtWidgets.QAction(MainWindow)
+        self.actionCopy.setObjectName("actionCopy")
+        self.actionCut = QtWidgets.QAction(MainWindow)
+        self.actionCut.setObjectName("actionCut")
+        self.actionPaste = QtWidgets.QAction(MainWindow)
+        self.actionPaste.setObjectName("actionPaste")
+        self.actionMatch_Masses = QtWidgets.QAction(MainWindow)
+        self.actionMatch_Masses.setObjectName("actionMatch_Masses")
+        self.actionFind_Formula = QtWidgets.QAction(MainWindow)
+        self.actionFind_Formula.setObjectName("actionFind_Formula")
+        self.actionIsotope_Pattern = QtWidgets.QAction(MainWindow)
+        self.actionIsotope_Pattern.setObjectName("actionIsotope_Pattern")
+        self.actionParallel_Calculation = QtWidgets.QAction(MainWindow)
+        self.actionParallel_Calculation.setObjectName("actionParallel_Calculation")
+        self.actionOligomers = QtWidgets.QAction(MainWindow)
+        self.actionOligomers.setObjectName("actionOligomers")
+        self.actionProfiling = QtWidgets.QAction(MainWindow)
+        self.actionProfiling.setCheckable(True)
+        self.actionProfiling.setObjectName("actionProfiling")
+        self.actionExport_Profile = QtWidgets.QAction(MainWindow)
+        self.actionExport_Profile.setObjectName("actionExport_Profile")
+        self.actionAnnotate_Peaks = QtWidgets.QAction(MainWindow)
+        self.actionAnnotate_Peaks.setObjectName("actionAnnotate_Peaks")
+        self.actionAdd_Descriptor_Column = QtWidgets.QAction(MainWindow)
+        self.actionAdd_Descriptor_Column.setObjectName("actionAdd_Descriptor_Column")
+        self.menuFile.addAction(self.actionOpen)
+        self.menuFile.addAction(self.actionSave)
+        self.menuFile.addAction(self.actionSave_as)
+        self.menuEdit.addAction(self.actionUndo)
+        self.menuEdit.addAction(self.actionRedo)
+        self.menuEdit.addSeparator()
+        self.menuEdit.addAction(self.actionCopy)
+        self.menuEdit.addAction(self.actionCut)
+        self.menuEdit.addAction(self.actionPaste)
+        self.menuEdit.addSeparator()
+        self.menuEdit.addAction(self.actionAdd_Row)
+        self.menuEdit.addAction(self.actionDelete_Last_Row)
+        self.menuEdit.addSeparator()
+        self.menuEdit.addAction(self.actionDelete)
+        self.menuEdit.addSeparator()
+        self.menuSettings.addAction(self.actionMass_Precision)
+        self.menuSettings.addAction(self.actionElimination_Product)
+        self.menuSettings.addAction(self.actionParallel_Calculation)
+        self.menuSettings.addSeparator()
+        self.menuSettings.addAction(self.actionProfiling)
+        self.menuSettings.addAction(self.actionExport_Profile)
+        self.menuTools.addAction(self.actionMatch_Masses)
+        self.menuTools.addAction(self.actionFind_Formula)
+        self.menuTools.addAction(self.actionIsotope_Pattern)
+        self.menuTools.addAction(self.actionOligomers)
+        self.menuTools.addAction(self.actionAnnotate_Peaks)
+        self.menuTools.addAction(self.actionAdd_Descriptor_Column)
+        self.menuAbout.addAction(self.actionHelp)
+        self.menuAbout.addAction(self.actionAbout_Mass_Calculator)
+        self.menubar.addAction(self.menuFile.menuAction())
+        self.menubar.addAction(self.menuEdit.menuAction())
+        self.menubar.addAction(self.menuSettings.menuAction())
+        self.menubar.addAction(self.menuTools.menuAction())
+        self.menubar.addAction(self.menuAbout.menuAction())
+
+        self.retranslateUi(MainWindow)
+        QtCore.QMetaObject.connectSlotsByName(MainWindow)
+        MainWindow.setTabOrder(self.btnCalculate, self.inputSearch)
+        MainWindow.setTabOrder(self.inputSearch, self.btnClearSearch)
+        MainWindow.setTabOrder(self.btnClearSearch, self.btnFindSearch)
+        MainWindow.setTabOrder(self.btnFindSearch, self.inputBuilderName)
+        MainWindow.setTabOrder(self.inputBuilderName, self.inputBuilderCalculation)
+        MainWindow.setTabOrder(self.inputBuilderCalculation, self.btnClearBuilder)
+        MainWindow.setTabOrder(self.btnClearBuilder, self.btnAddBuilder)
+        MainWindow.setTabOrder(self.btnAddBuilder, self.inputNewColumnName)
+        MainWindow.setTabOrder(self.inputNewColumnName, self.inputNewColumnModify)
+        MainWindow.setTabOrder(self.inputNewColumnModify, self.inputNewColumnCharge)
+        MainWindow.setTabOrder(self.inputNewColumnCharge, self.inputNewColumnAdduct)
+        MainWindow.setTabOrder(self.inputNewColumnAdduct, self.btnClearColumn)
+        MainWindow.setTabOrder(self.btnClearColumn, self.btnAddColumn)
+        MainWindow.setTabOrder(self.btnAddColumn, self.t1)
+
+    def retranslateUi(self, MainWindow):
+        _translate = QtCore.QCoreApplication.translate
+        MainWindow.setWindowTitle(_translate("MainWindow", "MainWindow"))
+        self.inputNewColumnCharge.setPlaceholderText(_translate("MainWindow", "Charge"))
+        self.btnCalculate.setText(_translate("MainWindow", "Calculate"))
+        self.btnCalculate.setShortcut(_translate("MainWindow", "Ctrl+Return"))
+        self.btnFindSearch.setText(_translate("MainWindow", "Find"))
+        self.btnClearSearch.setText(_translate("MainWindow", "Clear"))
+        self.inputSearch.setToolTip(_translate("MainWindow", "Text, /regex/, m/z 301.1±5ppm, m/z 300-302, formula contains N2 or name contains text"))
+        self.inputSearch.setPlaceholderText(_translate("MainWindow", "Search"))
+        self.inputBuilderName.setPlaceholderText(_translate("MainWindow", "Name"))
+        self.btnAddBuilder.setText(_translate("MainWindow", "Add"))
+        self.btnClearBuilder.setText(_translate("MainWindow", "Clear"))
+        self.lblBuilder.setText(_translate("MainWindow", "Compound Builder"))
+        self.inputBuilderCalculation.setPlaceholderText(_translate("MainWindow", "Calculation"))
+        self.lblNewColumn.setText(_translate("MainWindow", "New Column"))
+        self.btnClearColumn.setText(_translate("MainWindow", "Clear"))
+        self.btnAddColumn.setText(_translate("MainWindow", "Add"))
+        self.inputNewColumnName.setPlaceholderText(_translate("MainWindow", "Name"))
+        self.inputNewColumnModify.setPlaceholderText(_translate("MainWindow", "Modify"))
+        self.inputNewColumnAdduct.setPlaceholderText(_translate("MainWindow", "Adduct"))
+        self.lblFind.setText(_translate("MainWindow", "Search Table"))
+        self.menuFile.setTitle(_translate("MainWindow", "File"))
+        self.menuEdit.setTitle(_translate("MainWindow", "Edit"))
+        self.menuSettings.setTitle(_translate("MainWindow", "Settings"))
+        self.menuTools.setTitle(_translate("MainWindow", "Tools"))
+        self.menuAbout.setTitle(_translate("MainWindow", "Help"))
+        self.actionSave_as.setText(_translate("MainWindow", "Save as"))
+        self.actionSave_as.setShortcut(_translate("MainWindow", "Ctrl+Alt+S"))
+        self.actionOpen.setText(_translate("MainWindow", "Open"))
+        self.actionOpen.setShortcut(_translate("MainWindow", "Ctrl+O"))
+        self.actionSave.setText(_translate("MainWindow", "Save"))
+        self.actionSave.setShortcut(_translate("MainWindow", "Ctrl+S"))
+        self.actionAdd_Row.setText(_translate("MainWindow", "Add Row"))
+        self.actionAdd_Row.setShortcut(_translate("MainWindow", "Ctrl+R"))
+        self.actionDelete_Row.setText(_translate("MainWindow", "Delete Row"))
+        self.actionDelete.setText(_translate("MainWindow", "Delete Selection"))
+        self.actionDelete.setShortcut(_translate("MainWindow", "Del"))
+        self.actionDelete_Last_Row.setText(_translate("MainWindow", "Delete Last Row"))
+        self.actionDelete_Last_Row.setShortcut(_translate("MainWindow", "Ctrl+Alt+R"))
+        self.actionMass_Precision.setText(_translate("MainWindow", "Mass Precision"))
+        self.actionMass_Precision.setShortcut(_translate("MainWindow", "Ctrl+M"))
+        self.actionHelp.setText(_translate("MainWindow", "Help"))
+        self.actionHelp.setShortcut(_translate("MainWindow", "Ctrl+H"))
+        self.actionElimination_Product.setText(_translate("MainWindow", "Elimination Product"))
+        self.actionElimination_Product.setShortcut(_translate("MainWindow", "Ctrl+E"))
+        self.actionUndo.setText(_translate("MainWindow", "Undo"))
+        self.actionUndo.setShortcut(_translate("MainWindow", "Ctrl+Z"))
+        self.actionRedo.setText(_translate("MainWindow", "Redo"))
+        self.actionRedo.setShortcut(_translate("MainWindow", "Ctrl+Y"))
+        self.actionExit.setText(_translate("MainWindow", "Exit"))
+        self.actionNew_File.setText(_translate("MainWindow", "New File"))
+        self.actionShow_Formulas.setText(_translate("MainWindow", "Show Formulas"))
+        self.actionShow_Formulas.setShortcut(_translate("MainWindow", "Ctrl+F"))
+        self.actionPrint_Undo.setText(_translate("MainWindow", "Print Undo"))
+        self.actionPrint_Undo.setShortcut(_translate("MainWindow", "Space"))
+        self.actionPrint_Undo_2.setText(_translate("MainWindow", "Print Undo"))
+        self.actionPrint_Undo_2.setShortcut(_translate("MainWindow", "Space"))
+        self.actionAbout_Mass_Calculator.setText(_translate("MainWindow", "About Mass Calculator"))
+        self.actionCopy.setText(_translate("MainWindow", "Copy"))
+        self.actionCopy.setShortcut(_translate("MainWindow", "Ctrl+C"))
+        self.actionCut.setText(_translate("MainWindow", "Cut"))
+        self.actionCut.setShortcut(_translate("MainWindow", "Ctrl+X"))
+        self.actionPaste.setText(_translate("MainWindow", "Paste"))
+        self.actionPaste.setShortcut(_translate("MainWindow", "Ctrl+V"))
+        self.actionMatch_Masses.setText(_translate("MainWindow", "Match m/z"))
+        self.actionMatch_Masses.setShortcut(_translate("MainWindow", "Ctrl+L"))
+        self.actionFind_Formula.setText(_translate("MainWindow", "Find Formula"))
+        self.actionFind_Formula.setShortcut(_translate("MainWindow", "Ctrl+Shift+F"))
+        self.actionIsotope_Pattern.setText(_translate("MainWindow", "Isotope Pattern"))
+        self.actionIsotope_Pattern.setShortcut(_translate("MainWindow", "Ctrl+I"))
+        self.actionParallel_Calculation.setText(_translate("MainWindow", "Parallel Calculation"))
+        self.actionOligomers.setText(_translate("MainWindow", "Oligomers"))
+        self.actionProfiling.setText(_translate("MainWindow", "Profiling"))
+        self.actionExport_Profile.setText(_translate("MainWindow", "Export Profile..."))
+        self.actionAnnotate_Peaks.setText(_translate("MainWindow", "Annotate Peak List"))
+        self.actionAdd_Descriptor_Column.setText(_translate("MainWindow", "Add Descriptor Column"))
+
+
+class Ui_mass_precision_dialog(object):
+    def setupUi(self, Dialog):
+        Dialog.setObjectName("Dialog")
+        Dialog.resize(182, 111)
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        Dialog.setFont(font)
+        self.buttonBox = QtWidgets.QDialogButtonBox(Dialog)
+        self.buttonBox.setGeometry(QtCore.QRect(-80, 50, 251, 61))
+        self.buttonBox.setOrientation(QtCore.Qt.Horizontal)
+        self.buttonBox.setStandardButtons(QtWidgets.QDialogButtonBox.Cancel|QtWidgets.QDialogButtonBox.Ok)
+        self.buttonBox.setObjectName("buttonBox")
+        self.lineEdit = QtWidgets.QLineEdit(Dialog)
+        self.lineEdit.setGeometry(QtCore.QRect(140, 20, 31, 31))
+        self.lineEdit.setObjectName("lineEdit")
+        self.label = QtWidgets.QLabel(Dialog)
+        self.label.setGeometry(QtCore.QRect(10, 30, 121, 16))
+        font = QtGui.QFont()
+        font.setBold(True)
+        font.setWeight(75)
+        self.label.setFont(font)
+        self.label.setObjectName("label")
+        self.line = QtWidgets.QFrame(Dialog)
+        self.line.setGeometry(QtCore.QRect(-40, -10, 281, 241))
+        self.line.setFrameShape(QtWidgets.QFrame.HLine)
+        self.line.setFrameShadow(QtWidgets.QFrame.Sunken)
+        self.line.setObjectName("line")
+        self.line.raise_()
+        self.buttonBox.raise_()
+        self.lineEdit.raise_()
+        self.label.raise_()
+
+        self.retranslateUi(Dialog)
+        self.buttonBox.accepted.connect(Dialog.accept) # type: ignore
+        self.buttonBox.rejected.connect(Dialog.reject) # type: ignore
+        QtCore.QMetaObject.connectSlotsByName(Dialog)
+
+    def retranslateUi(self, Dialog):
+        _translate = QtCore.QCoreApplication.translate
+        Dialog.setWindowTitle(_translate("Dialog", "Dialog"))
+        self.lineEdit.setText(_translate("Dialog", "4"))
+        self.label.setText(_translate("Dialog", "Mass Precision"))
+
+
+class Ui_match_dialog(object):
+    def setupUi(self, Dialog):
+        Dialog.setObjectName("Dialog")
+        Dialog.resize(760, 420)
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        Dialog.setFont(font)
+        self.line = QtWidgets.QFrame(Dialog)
+        self.line.setGeometry(QtCore.QRect(-40, -10, 841, 461))
+        self.line.setFrameShape(QtWidgets.QFrame.HLine)
+        self.line.setFrameShadow(QtWidgets.QFrame.Sunken)
+        self.line.setObjectName("line")
+        self.label = QtWidgets.QLabel(Dialog)
+        self.label.setGeometry(QtCore.QRect(10, 10, 161, 21))
+        self.label.setObjectName("label")
+        self.inputMasses = QtWidgets.QPlainTextEdit(Dialog)
+        self.inputMasses.setGeometry(QtCore.QRect(10, 40, 161, 251))
+        self.inputMasses.setObjectName("inputMasses")
+        self.label_2 = QtWidgets.QLabel(Dialog)
+        self.label_2.setGeometry(QtCore.QRect(10, 300, 161, 21))
+        self.label_2.setObjectName("label_2")
+        self.inputTolerance = QtWidgets.QLineEdit(Dialog)
+        self.inputTolerance.setGeometry(QtCore.QRect(10, 330, 161, 31))
+        self.inputTolerance.setObjectName("inputTolerance")
+        self.btnMatch = QtWidgets.QPushButton(Dialog)
+        self.btnMatch.setGeometry(QtCore.QRect(10, 375, 161, 31))
+        self.btnMatch.setObjectName("btnMatch")
+        self.tableHits = QtWidgets.QTableWidget(Dialog)
+        self.tableHits.setGeometry(QtCore.QRect(180, 10, 571, 401))
+        self.tableHits.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.tableHits.setObjectName("tableHits")
+        self.tableHits.setColumnCount(0)
+        self.tableHits.setRowCount(0)
+        self.line.raise_()
+        self.label.raise_()
+        self.inputMasses.raise_()
+        self.label_2.raise_()
+        self.inputTolerance.raise_()
+        self.btnMatch.raise_()
+        self.tableHits.raise_()
+
+        self.retranslateUi(Dialog)
+        QtCore.QMetaObject.connectSlotsByName(Dialog)
+
+    def retranslateUi(self, Dialog):
+        _translate = QtCore.QCoreApplication.translate
+        Dialog.setWindowTitle(_translate("Dialog", "Dialog"))
+        self.label.setText(_translate("Dialog", "Observed m/z"))
+        self.label_2.setText(_translate("Dialog", "Tolerance"))
+        self.inputTolerance.setText(_translate("Dialog", "5 ppm"))
+        self.btnMatch.setText(_translate("Dialog", "Match"))
+
+
+class Ui_oligomer_dialog(object):
+    def setupUi(self, Dialog):
+        Dialog.setObjectName("Dialog")
+        Dialog.resize(312, 191)
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        Dialog.setFont(font)
+        self.buttonBox = QtWidgets.QDialogButtonBox(Dialog)
+        self.buttonBox.setGeometry(QtCore.QRect(50, 130, 251, 61))
+        self.buttonBox.setOrientation(QtCore.Qt.Horizontal)
+        self.buttonBox.setStandardButtons(QtWidgets.QDialogButtonBox.Cancel|QtWidgets.QDialogButtonBox.Ok)
+        self.buttonBox.setObjectName("buttonBox")
+        self.lineEdit = QtWidgets.QLineEdit(Dialog)
+        self.lineEdit.setGeometry(QtCore.QRect(160, 20, 141, 31))
+        self.lineEdit.setObjectName("lineEdit")
+        self.lineEdit_2 = QtWidgets.QLineEdit(Dialog)
+        self.lineEdit_2.setGeometry(QtCore.QRect(160, 60, 61, 31))
+        self.lineEdit_2.setObjectName("lineEdit_2")
+        self.lineEdit_3 = QtWidgets.QLineEdit(Dialog)
+        self.lineEdit_3.setGeometry(QtCore.QRect(160, 100, 61, 31))
+        self.lineEdit_3.setObjectName("lineEdit_3")
+        self.label = QtWidgets.QLabel(Dialog)
+        self.label.setGeometry(QtCore.QRect(10, 30, 141, 16))
+        font = QtGui.QFont()
+        font.setBold(True)
+        font.setWeight(75)
+        self.label.setFont(font)
+        self.label.setObjectName("label")
+        self.label_2 = QtWidgets.QLabel(Dialog)
+        self.label_2.setGeometry(QtCore.QRect(10, 70, 141, 16))
+        font = QtGui.QFont()
+        font.setBold(True)
+        font.setWeight(75)
+        self.label_2.setFont(font)
+        self.label_2.setObjectName("label_2")
+        self.label_3 = QtWidgets.QLabel(Dialog)
+        self.label_3.setGeometry(QtCore.QRect(10, 110, 141, 16))
+        font = QtGui.QFont()
+        font.setBold(True)
+        font.setWeight(75)
+        self.label_3.setFont(font)
+        self.label_3.setObjectName("label_3")
+        self.line = QtWidgets.QFrame(Dialog)
+        self.line.setGeometry(QtCore.QRect(-40, -10, 411, 321))
+        self.line.setFrameShape(QtWidgets.QFrame.HLine)
+        self.line.setFrameShadow(QtWidgets.QFrame.Sunken)
+        self.line.setObjectName("line")
+        self.line.raise_()
+        self.buttonBox.raise_()
+        self.lineEdit.raise_()
+        self.lineEdit_2.raise_()
+        self.lineEdit_3.raise_()
+        self.label.raise_()
+        self.label_2.raise_()
+        self.label_3.raise_()
+
+        self.retranslateUi(Dialog)
+        self.buttonBox.accepted.connect(Dialog.accept) # type: ignore
+        self.buttonBox.rejected.connect(Dialog.reject) # type: ignore
+        QtCore.QMetaObject.connectSlotsByName(Dialog)
+
+    def retranslateUi(self, Dialog):
+        _translate = QtCore.QCoreApplication.translate
+        Dialog.setWindowTitle(_translate("Dialog", "Dialog"))
+        self.lineEdit.setToolTip(_translate("Dialog", "Row numbers like 1,2,5-7, the selected rows if empty"))
+        self.lineEdit_2.setText(_translate("Dialog", "1"))
+        self.lineEdit_3.setText(_translate("Dialog", "4"))
+        self.label.setText(_translate("Dialog", "Building Blocks"))
+        self.label_2.setText(_translate("Dialog", "Min. Units"))
+        self.label_3.setText(_translate("Dialog", "Max. Units"))
+
+
+class Ui_parallel_dialog(object):
+    def setupUi(self, Dialog):
+        Dialog.setObjectName("Dialog")
+        Dialog.resize(232, 151)
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        Dialog.setFont(font)
+        self.buttonBox = QtWidgets.QDialogButtonBox(Dialog)
+        self.buttonBox.setGeometry(QtCore.QRect(-30, 90, 251, 61))
+        self.buttonBox.setOrientation(QtCore.Qt.Horizontal)
+        self.buttonBox.setStandardButtons(QtWidgets.QDialogButtonBox.Cancel|QtWidgets.QDialogButtonBox.Ok)
+        self.buttonBox.setObjectName("buttonBox")
+        self.lineEdit = QtWidgets.QLineEdit(Dialog)
+        self.lineEdit.setGeometry(QtCore.QRect(160, 20, 61, 31))
+        self.lineEdit.setObjectName("lineEdit")
+        self.lineEdit_2 = QtWidgets.QLineEdit(Dialog)
+        self.lineEdit_2.setGeometry(QtCore.QRect(160, 60, 61, 31))
+        self.lineEdit_2.setObjectName("lineEdit_2")
+        self.label = QtWidgets.QLabel(Dialog)
+        self.label.setGeometry(QtCore.QRect(10, 30, 141, 16))
+        font = QtGui.QFont()
+        font.setBold(True)
+        font.setWeight(75)
+        self.label.setFont(font)
+        self.label.setObjectName("label")
+        self.label_2 = QtWidgets.QLabel(Dialog)
+        self.label_2.setGeometry(QtCore.QRect(10, 70, 141, 16))
+        font = QtGui.QFont()
+        font.setBold(True)
+        font.setWeight(75)
+        self.label_2.setFont(font)
+        self.label_2.setObjectName("label_2")
+        self.line = QtWidgets.QFrame(Dialog)
+        self.line.setGeometry(QtCore.QRect(-40, -10, 331, 281))
+        self.line.setFrameShape(QtWidgets.QFrame.HLine)
+        self.line.setFrameShadow(QtWidgets.QFrame.Sunken)
+        self.line.setObjectName("line")
+        self.line.raise_()
+        self.buttonBox.raise_()
+        self.lineEdit.raise_()
+        self.lineEdit_2.raise_()
+        self.label.raise_()
+        self.label_2.raise_()
+
+        self.retranslateUi(Dialog)
+        self.buttonBox.accepted.connect(Dialog.accept) # type: ignore
+        self.buttonBox.rejected.connect(Dialog.reject) # type: ignore
+        QtCore.QMetaObject.connectSlotsByName(Dialog)
+
+    def retranslateUi(self, Dialog):
+        _translate = QtCore.QCoreApplication.translate
+        Dialog.setWindowTitle(_translate("Dialog", "Dialog"))
+        self.lineEdit.setText(_translate("Dialog", "1"))
+        self.lineEdit_2.setText(_translate("Dialog", "20000"))
+        self.label.setText(_translate("Dialog", "Workers"))
+        self.label_2.setText(_translate("Dialog", "Chunk Size"))